@@ -0,0 +1,97 @@
+"""Requêtes concurrentielles: CompetitorIndex vs filtrage pandas
+
+Usage (depuis analysis/): python benchmarks/bench_competitors.py [--rows 50000] [--repeat 200]
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from competitor_index import CompetitorIndex, REGIONAL
+from synthetic import PRICING_TIERS, SERVICES, generate_market_data
+
+def best_time(func, repeat):
+    """Meilleur temps (s) sur `repeat` exécutions, et dernier résultat"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def pandas_top_k(df, country, service, tiers, k):
+    mask = (df['Services'] == service) & df['Pricing_Tier'].isin(tiers)
+    if country is not None:
+        mask &= df['Country'] == country
+    return df[mask].nlargest(k, 'Market_Share_Pct')
+
+def pandas_concentration(df, country, service):
+    cell = df[(df['Country'] == country) & (df['Services'] == service)]['Market_Share_Pct']
+    normalized = cell / cell.sum() * 100
+    top = normalized.sort_values(ascending=False)
+    return {'HHI': (normalized ** 2).sum(), 'CR3': top.head(3).sum(), 'CR5': top.head(5).sum()}
+
+def pandas_white_space(df, countries):
+    local = df[df['Country'] != REGIONAL].groupby(['Country', 'Services'], observed=True).size()
+    regional = df[df['Country'] == REGIONAL].groupby('Services', observed=True).size()
+    grid = local.unstack(fill_value=0).reindex(index=countries, columns=SERVICES, fill_value=0)
+    grid = grid + regional.reindex(SERVICES, fill_value=0)
+    stacked = grid.stack()
+    return stacked[stacked == 0]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50_000, help="Nombre d'acteurs")
+    parser.add_argument('--countries', type=int, default=5_000, help="Pays / régions")
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+    _, _, competitors = generate_market_data(args.countries, n_competitors=args.rows)
+    countries = sorted(set(competitors['Country']) - {REGIONAL})
+    country, service, tiers = countries[len(countries) // 2], SERVICES[0], PRICING_TIERS[:2]
+
+    start = time.perf_counter()
+    index = CompetitorIndex(competitors)
+    index.concentration()
+    print(f"\n   {args.rows} acteurs, {len(countries)} pays/régions "
+          f"(construction de l'index: {(time.perf_counter() - start) * 1000:.1f} ms)")
+
+    queries = [
+        ('top-k filtré (pays × service × prix)',
+         lambda: pandas_top_k(competitors, country, service, tiers, 5),
+         lambda: index.top_k(5, Country=country, Services=service, Pricing_Tier=tiers)),
+        ('top-k filtré (service × prix)',
+         lambda: pandas_top_k(competitors, None, service, tiers, 5),
+         lambda: index.top_k(5, Services=service, Pricing_Tier=tiers)),
+        ('concentration pays × service',
+         lambda: pandas_concentration(competitors, country, service),
+         lambda: index.concentration(country, service)),
+        ('white space (tous pays × services)',
+         lambda: pandas_white_space(competitors, countries),
+         lambda: index.white_space(countries, SERVICES)),
+    ]
+
+    print(f"\n   {'Requête':<40} {'pandas (ms)':>12} {'index (ms)':>12} {'Gain':>8}")
+    for label, with_pandas, with_index in queries:
+        pandas_seconds, expected = best_time(with_pandas, args.repeat)
+        index_seconds, result = best_time(with_index, args.repeat)
+        print(f"   {label:<40} {pandas_seconds * 1000:>12.3f} {index_seconds * 1000:>12.3f} "
+              f"{pandas_seconds / index_seconds:>7.1f}x")
+
+        # Mêmes réponses que pandas
+        if isinstance(expected, pd.DataFrame) and 'Company' in expected:
+            assert list(expected['Company']) == list(result['Company']), label
+        elif isinstance(expected, dict):
+            row = result.iloc[0] if len(result) else None
+            assert row is None or all(np.isclose(expected[key], row[key]) for key in expected), label
+        else:
+            assert len(expected) == len(result), label
+    print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""Mémoire des tables à l'échelle infranationale: inférence pandas par défaut vs schéma typé
+
+Usage (depuis analysis/): python benchmarks/bench_memory.py [--sizes 1000 100000 1000000]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from market_analysis import print_memory_report
+from synthetic import generate_market_data
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+    os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+    for n_rows in args.sizes:
+        market_data, regulations, competitors = generate_market_data(n_rows)
+        # Tables synthétiques = types inférés par read_csv (object, int64, float64)
+        print(f"\n   {n_rows} lignes", end='')
+        print_memory_report({
+            'market_data': market_data.astype({'Banks_Count': 'int64',
+                                               'Insurance_Companies': 'int64',
+                                               'SMEs_Count': 'int64'}),
+            'regulations': regulations,
+            'competitors': competitors
+        })
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Passage à l'échelle du modèle: de 6 à 100k lignes (pays / régions synthétiques)
+
+Usage (depuis analysis/): python benchmarks/bench_scale.py [--sizes 6 1000 100000]
+"""
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from extract_and_build import build_market_frame
+from market_analysis import MSSPMarketAnalysis
+from synthetic import generate_indicators, generate_market_data
+
+def timed(func, *args, **kwargs):
+    """Temps d'exécution (s) et résultat, sans les print() de l'analyse"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        return time.perf_counter() - start, result
+
+def report(n_rows, label, seconds):
+    print(f"   {n_rows:>8} {label:<24} {seconds:>10.4f} {seconds / n_rows * 1e6:>10.2f}")
+
+def run(sizes):
+    print(f"\n   {'Lignes':>8} {'Étape':<24} {'Temps (s)':>10} {'µs/ligne':>10}")
+    for n_rows in sizes:
+        indicators = generate_indicators(n_rows)
+        market_data, regulations, competitors = generate_market_data(n_rows)
+
+        seconds, _ = timed(build_market_frame, indicators)
+        report(n_rows, 'build_market_frame', seconds)
+
+        seconds, analysis = timed(MSSPMarketAnalysis, market_data=market_data,
+                                  regulations=regulations, competitors=competitors)
+        report(n_rows, 'métriques dérivées', seconds)
+
+        seconds, _ = timed(analysis.country_ranking)
+        report(n_rows, 'country_ranking', seconds)
+
+        seconds, _ = timed(analysis.segment_analysis)
+        report(n_rows, 'segment_analysis', seconds)
+    print()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[6, 100, 1_000, 10_000, 100_000])
+    args = parser.parse_args()
+    os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+    run(args.sizes)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Calcul partitionné par pays: passage à l'échelle de 1 à 32 processus
+
+Compare le chargement + métriques dérivées + classement + segments, en un seul
+processus (chemin historique) et par partitions (sharded.py), et vérifie que les
+résultats sont identiques. Le gain dépend du nombre de cœurs (os.cpu_count()).
+
+Usage (depuis analysis/): python benchmarks/bench_sharded.py [--rows 1000000] [--workers 1 2 4 8 16 32]
+"""
+import argparse
+import contextlib
+import os
+import sys
+import time
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from market_analysis import MSSPMarketAnalysis
+from synthetic import generate_market_data
+
+def timed_run(tables, workers):
+    """Temps (s) de l'analyse complète (métriques, classement, segments), sans les print()"""
+    market_data, regulations, competitors = tables
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        analysis = MSSPMarketAnalysis(market_data=market_data, regulations=regulations,
+                                      competitors=competitors, workers=workers)
+        ranking, segments = analysis._ranking(), analysis._segments()
+        return time.perf_counter() - start, (analysis.market_data, ranking, segments)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+    os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+    tables = generate_market_data(args.rows, n_competitors=6)
+    serial, expected = timed_run(tables, None)
+    print(f"\n   {args.rows} lignes, {os.cpu_count()} cœur(s)")
+    print(f"   {'Processus':>10} {'Temps (s)':>10} {'Accélération':>13}")
+    print(f"   {'séquentiel':>10} {serial:>10.3f} {1.0:>12.2f}x")
+
+    for workers in args.workers:
+        seconds, results = timed_run(tables, workers)
+        for got, want in zip(results, expected):
+            pd.testing.assert_frame_equal(got, want, check_exact=True)
+        print(f"   {workers:>10} {seconds:>10.3f} {serial / seconds:>12.2f}x")
+    print("   Résultats identiques au calcul séquentiel\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""Suite de benchmarks du pipeline analyse + visualisation (temps, pic RSS, octets écrits)
+
+Chaque taille (pays/segments synthétiques) est exécutée dans un espace de travail
+temporaire qui reproduit l'arborescence du dépôt: les chemins '../data' et
+'../images/charts' des scripts y pointent, les vraies données ne sont pas touchées.
+
+Usage (depuis analysis/):
+    python benchmarks/bench_suite.py [--sizes 6 1000 100000 1000000]
+    python benchmarks/bench_suite.py --save-baseline       # enregistre baseline.json
+    python benchmarks/bench_suite.py --fail-on-regression  # code 1 si régression
+"""
+import argparse
+import contextlib
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+ANALYSIS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ANALYSIS_DIR)
+
+from data_store import write_table
+from extract_and_build import extract_world_bank_data
+from market_analysis import MSSPMarketAnalysis
+from synthetic import generate_market_data, generate_world_bank_export
+from visualization import MSSPVisualizations
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_SIZES = [6, 1_000, 100_000, 1_000_000]
+
+# Tolérance avant de signaler une régression (ratio mesure / référence)
+TIME_TOLERANCE = 1.25
+RSS_TOLERANCE = 1.25
+MIN_TIME_DELTA = 0.05  # s, écarts plus petits = bruit de mesure
+SAMPLE_INTERVAL = 0.002  # s, échantillonnage du RSS
+
+# Étape ignorée aux tailles suivantes si sa durée extrapolée dépasse ce budget
+STEP_BUDGET = 120.0  # s
+# Une seule mesure n'est extrapolée que si elle n'est pas dominée par les coûts fixes
+MIN_EXTRAPOLATION_ROWS = 10_000
+
+class PeakRSS:
+    """Pic de mémoire résidente pendant un bloc (échantillonnage de /proc/self/statm)"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._page_size = os.sysconf('SC_PAGE_SIZE')
+
+    def _current(self):
+        try:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * self._page_size
+        except OSError:
+            # Hors Linux: plus haut niveau du processus (Ko sous Linux, octets sous macOS)
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self._current())
+
+    def __enter__(self):
+        self.peak = self._current()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._current())
+
+def tree_bytes(root):
+    """Taille totale (octets) des fichiers sous root, par chemin"""
+    sizes = {}
+    for directory, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(directory, name)
+            with contextlib.suppress(OSError):
+                sizes[path] = os.path.getsize(path)
+    return sizes
+
+def bytes_written(before, after):
+    """Octets des fichiers créés ou modifiés entre deux relevés"""
+    return sum(size for path, size in after.items() if before.get(path) != size)
+
+def measure(workspace, func, *args, **kwargs):
+    """Exécute une étape: temps, pic RSS et octets écrits, sans les print() de l'analyse"""
+    before = tree_bytes(workspace)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        with PeakRSS() as rss:
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            seconds = time.perf_counter() - start
+    return {
+        'seconds': round(seconds, 6),
+        'peak_rss_mb': round(rss.peak / 2**20, 1),
+        'bytes_written': bytes_written(before, tree_bytes(workspace))
+    }, result
+
+def make_workspace(root):
+    """Arborescence data/ + images/charts/ + analysis/ (répertoire courant des scripts)"""
+    for directory in ('analysis', 'data', os.path.join('images', 'charts')):
+        os.makedirs(os.path.join(root, directory), exist_ok=True)
+    shutil.copy(os.path.join(ANALYSIS_DIR, '..', 'data', 'country_registry.csv'),
+                os.path.join(root, 'data'))
+    return os.path.join(root, 'analysis')
+
+def warm_up_charts(charts_dir=os.path.join('..', 'images', 'charts')):
+    """Coûts fixes des graphiques, hors mesure: import de plotly, premier rendu et copie
+    de plotly.min.js (3,5 Mo) dans le dossier, sinon imputés au premier graphique"""
+    import plotly.express as px
+    path = os.path.join(charts_dir, '_warm_up.html')
+    px.scatter(x=[0, 1], y=[0, 1]).write_html(path, include_plotlyjs='directory')
+    os.remove(path)
+
+def run_size(n_rows, root, skip=()):
+    """Toutes les étapes pour une taille; renvoie {étape: mesures} (None si ignorée)"""
+    results = {}
+
+    def step(name, func, *args, **kwargs):
+        if name in skip:
+            results[name] = None
+            return None
+        results[name], result = measure(root, func, *args, **kwargs)
+        return result
+
+    market_data, regulations, competitors = generate_market_data(n_rows)
+
+    export_path = os.path.join(root, 'world_bank_export.csv')
+    countries = generate_world_bank_export(export_path, n_rows)
+    step('extract_world_bank_data', extract_world_bank_data, export_path, countries=countries)
+    os.remove(export_path)
+
+    analysis = MSSPMarketAnalysis(market_data=market_data, regulations=regulations,
+                                  competitors=competitors)
+    step('_calculate_derived_metrics', analysis._calculate_derived_metrics)
+    # Le classement sert aussi à l'export et aux graphiques: toujours calculé
+    results['country_ranking'], ranking = measure(root, analysis.country_ranking)
+    step('segment_analysis', analysis.segment_analysis)
+    step('export_insights_to_csv', analysis.export_insights_to_csv, ranking)
+
+    # Les graphiques relisent les tables depuis le store de l'espace de travail
+    write_table('market_data', analysis.market_data)
+    write_table('regulations', regulations)
+    write_table('competitors', competitors)
+    write_table('country_ranking', ranking)
+    viz = MSSPVisualizations(output_mode='shared')
+    warm_up_charts()
+    for name in MSSPVisualizations.CHARTS:
+        step(name, getattr(viz, name))
+    return results
+
+def predicted_seconds(points, n_rows):
+    """Durée extrapolée à n_rows lignes depuis les mesures [(taille, secondes)]: droite
+    coût fixe + coût par ligne sur les deux dernières; une seule mesure n'est extrapolée
+    (proportionnellement) qu'à partir de MIN_EXTRAPOLATION_ROWS lignes, None sinon"""
+    if len(points) >= 2:
+        (size_a, seconds_a), (size_b, seconds_b) = points[-2:]
+        per_row = max(seconds_b - seconds_a, 0) / (size_b - size_a)
+        return seconds_b + per_row * (n_rows - size_b)
+    size, seconds = points[-1]
+    return seconds * n_rows / size if size >= MIN_EXTRAPOLATION_ROWS else None
+
+def run(sizes, workdir=None, budget=STEP_BUDGET):
+    """Exécute la suite; renvoie {taille: {étape: mesures}}"""
+    results = {}
+    measured = {}  # étape -> [(taille, secondes)] des mesures précédentes
+    cwd = os.getcwd()
+    for n_rows in sorted(sizes):
+        predictions = {name: predicted_seconds(points, n_rows) for name, points in measured.items()}
+        skip = {name for name, seconds in predictions.items() if seconds is not None and seconds > budget}
+        root = tempfile.mkdtemp(prefix=f'mssp_bench_{n_rows}_', dir=workdir)
+        try:
+            workspace = make_workspace(root)
+            os.chdir(workspace)
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                results[str(n_rows)] = run_size(n_rows, root, skip)
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(root, ignore_errors=True)
+        for name, values in results[str(n_rows)].items():
+            if values is not None:
+                measured.setdefault(name, []).append((n_rows, values['seconds']))
+        print_size(n_rows, results[str(n_rows)])
+    return results
+
+def print_size(n_rows, steps):
+    print(f"\n   {n_rows} lignes")
+    print(f"   {'Étape':<40} {'Temps (s)':>10} {'RSS (Mo)':>10} {'Octets':>12}")
+    for step, values in steps.items():
+        if values is None:
+            print(f"   {step:<40} {'ignorée (budget dépassé)':>34}")
+            continue
+        print(f"   {step:<40} {values['seconds']:>10.4f} {values['peak_rss_mb']:>10.1f} "
+              f"{values['bytes_written']:>12}")
+
+def compare(results, baseline):
+    """Compare à la référence; renvoie la liste des régressions"""
+    regressions = []
+    print(f"\n   Comparaison avec la référence ({os.path.basename(BASELINE_PATH)})")
+    print(f"   {'Lignes':>8} {'Étape':<40} {'Temps':>8} {'RSS':>8}")
+    for size, steps in results.items():
+        for step, values in steps.items():
+            reference = baseline.get(size, {}).get(step)
+            if values is None or reference is None:
+                continue
+            time_ratio = values['seconds'] / max(reference['seconds'], 1e-6)
+            rss_ratio = values['peak_rss_mb'] / max(reference['peak_rss_mb'], 1e-6)
+            flag = ''
+            slower = (time_ratio > TIME_TOLERANCE
+                      and values['seconds'] - reference['seconds'] > MIN_TIME_DELTA)
+            if slower or rss_ratio > RSS_TOLERANCE:
+                regressions.append((size, step, time_ratio, rss_ratio))
+                flag = '  ← régression'
+            print(f"   {size:>8} {step:<40} {time_ratio:>7.2f}x {rss_ratio:>7.2f}x{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--workdir', default=None,
+                        help="Dossier des espaces de travail temporaires (défaut: tmp système)")
+    parser.add_argument('--step-budget', type=float, default=STEP_BUDGET,
+                        help="Ignore une étape si sa durée extrapolée dépasse ce budget (s)")
+    parser.add_argument('--output', default=None, help="Écrit les mesures dans ce fichier JSON")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Enregistre les mesures comme nouvelle référence")
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help="Code de sortie 1 si une étape dépasse la tolérance")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.workdir, args.step_budget)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"\n   Référence enregistrée: {BASELINE_PATH}\n")
+        return
+
+    if not os.path.exists(BASELINE_PATH):
+        print("\n   Pas de référence: lancez avec --save-baseline\n")
+        return
+    with open(BASELINE_PATH) as f:
+        regressions = compare(results, json.load(f))
+    print(f"\n   {len(regressions)} régression(s)\n")
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
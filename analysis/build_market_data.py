@@ -1,8 +1,12 @@
 
 
+import argparse
 import pandas as pd
 import os
+from extract_and_build import build_market_frame
+from instrumentation import traced
 
+@traced
 def create_market_data():
 
     
@@ -11,79 +15,50 @@ def create_market_data():
             'population_m': 17.2,     
             'gdp_b_usd': 27.6,         
             'internet_pct': 58.2,     
-            'mobile_pct': 115.5,       
-            'banks': 29,               
-            'insurance': 30            
+            'mobile_pct': 115.5
         },
         'Cote_Ivoire': {
             'population_m': 27.5,      
             'gdp_b_usd': 70.0,        
             'internet_pct': 47.0,      
-            'mobile_pct': 142.3,      
-            'banks': 29,               
-            'insurance': 32           
+            'mobile_pct': 142.3
         },
         'Cameroon': {
             'population_m': 27.9,       
             'gdp_b_usd': 44.9,       
             'internet_pct': 38.5,      
-            'mobile_pct': 89.7,
-            'banks': 19,          
-            'insurance': 30           
+            'mobile_pct': 89.7
         },
         'Morocco': {
             'population_m': 37.5, 
             'gdp_b_usd': 134.2,       
             'internet_pct': 84.1,     
-            'mobile_pct': 130.2,       
-            'banks': 32,          
-            'insurance': 26           
+            'mobile_pct': 130.2
         },
         'Tunisia': {
             'population_m': 12.0,    
             'gdp_b_usd': 46.8,         
             'internet_pct': 71.5,      
-            'mobile_pct': 128.9,       
-            'banks': 26,               
-            'insurance': 22            
+            'mobile_pct': 128.9
         },
         'Burkina_Faso': {
             'population_m': 22.1,      
             'gdp_b_usd': 19.7,        
             'internet_pct': 22.0,    
-            'mobile_pct': 106.8,       
-            'banks': 16,              
-            'insurance': 17            
+            'mobile_pct': 106.8
         }
     }
     
 
     
-    rows = []
-    
-    for country, values in data.items():
-        # Calculs standards industrie
-        it_market_m = values['gdp_b_usd'] * 0.025 * 1000  # 2.5% du PIB
-        cyber_spending_m = it_market_m * 0.03  # 3% du marché IT
-        smes_count = int(values['population_m'] * 4000)  # 4 PME / 1000 habitants
-        
-        row = {
-            'Country': country,
-            'Population_M': values['population_m'],
-            'GDP_B_USD': values['gdp_b_usd'],
-            'IT_Market_M_USD': round(it_market_m, 1),
-            'Cybersecurity_Spending_M_USD': round(cyber_spending_m, 1),
-            'Banks_Count': values['banks'],
-            'Insurance_Companies': values['insurance'],
-            'SMEs_Count': smes_count,
-            'Internet_Penetration_Pct': values['internet_pct'],
-            'Mobile_Penetration_Pct': values['mobile_pct']
-        }
-        
-        rows.append(row)
-    
-    # Créer DataFrame
-    df = pd.DataFrame(rows)
+    # Comptages banques/assurances: référentiel des pays (data/country_registry.csv)
+    base = pd.DataFrame.from_dict(data, orient='index').rename(columns={
+        'population_m': 'Population_M',
+        'gdp_b_usd': 'GDP_B_USD',
+        'internet_pct': 'Internet_Penetration_Pct',
+        'mobile_pct': 'Mobile_Penetration_Pct'
+    })
+    df = build_market_frame(base)
     
     # Sauvegarder
     output_path = '../data/market_data.csv'
@@ -121,7 +96,7 @@ def show_instructions():
     
     print("\n   ÉTAPE 2: Édite ce fichier (build_market_data.py)")
     print("   Remplace les valeurs dans le dictionnaire 'data'")
-    print("      NE touche PAS aux chiffres banks/insurance (déjà corrects!)")
+    print("      Les chiffres banks/insurance sont dans data/country_registry.csv")
     
     print("\n   ÉTAPE 3: Exécute ce script")
     print("   python build_market_data.py")
@@ -132,13 +107,20 @@ def show_instructions():
 def main():
     """Fonction principale"""
     
-    print("\n   CRÉATION DE TON FICHIER market_data.csv PERSONNALISÉ\n")
+    parser = argparse.ArgumentParser(description="Création de market_data.csv")
+    parser.add_argument('--yes', action='store_true',
+                        help="Données déjà remplies: ne pas poser la question (mode batch)")
+    args = parser.parse_args()
     
-    # Demander confirmation
-    print("   As-tu déjà rempli les données de la Banque Mondiale dans ce script?")
-    print("   (Édite les valeurs dans le dictionnaire 'data' avant de continuer)")
+    print("\n   CRÉATION DE TON FICHIER market_data.csv PERSONNALISÉ\n")
     
-    response = input("\n   Données remplies? (o/n): ").lower().strip()
+    # Demander confirmation (sauf en mode batch)
+    if args.yes:
+        response = 'o'
+    else:
+        print("   As-tu déjà rempli les données de la Banque Mondiale dans ce script?")
+        print("   (Édite les valeurs dans le dictionnaire 'data' avant de continuer)")
+        response = input("\n   Données remplies? (o/n): ").lower().strip()
     
     if response != 'o':
         show_instructions()
@@ -0,0 +1,120 @@
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import time
+import pandas as pd
+
+class ChartCache:
+    """Cache adressé par contenu des graphiques HTML (clé = données + spécification)"""
+
+    def __init__(self, cache_dir, max_age_days=30, max_bytes=200_000_000):
+        self.cache_dir = cache_dir
+        self.max_age_days = max_age_days
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, 'index.json')
+
+        os.makedirs(cache_dir, exist_ok=True)
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                self.index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.index = {}
+        self.index.setdefault('blobs', {})
+        self.index.setdefault('published', {})
+
+    @staticmethod
+    def key(inputs, params, func=None):
+        """Empreinte des colonnes d'entrée, des paramètres et du code du graphique"""
+        digest = hashlib.sha256()
+        for name in sorted(inputs):
+            df = inputs[name]
+            digest.update(name.encode())
+            if df is None:
+                digest.update(b'<absent>')
+                continue
+            digest.update(repr([(col, str(df[col].dtype)) for col in df.columns]).encode())
+            digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+        if func is not None:
+            digest.update(inspect.getsource(func).encode())
+        return digest.hexdigest()
+
+    def _blob_path(self, key, suffix):
+        return os.path.join(self.cache_dir, f'{key}{suffix}')
+
+    def is_published(self, path, key, requires=()):
+        """Vrai si `path` contient déjà le rendu de `key` (rien à faire)"""
+        return (self.index['published'].get(path) == key
+                and os.path.exists(path)
+                and all(os.path.exists(p) for p in requires))
+
+    def lookup(self, key, suffix='.html'):
+        """Chemin du rendu en cache pour `key`, ou None"""
+        path = self._blob_path(key, suffix)
+        if key in self.index['blobs'] and os.path.exists(path):
+            self.index['blobs'][key]['last_used'] = time.time()
+            return path
+        return None
+
+    def store_file(self, key, source_path, suffix='.html'):
+        """Copie un rendu publié dans le cache"""
+        path = self._blob_path(key, suffix)
+        shutil.copyfile(source_path, path)
+        self._register(key, path)
+        return path
+
+    def store_text(self, key, text, suffix='.html'):
+        """Met un fragment HTML en cache"""
+        path = self._blob_path(key, suffix)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        self._register(key, path)
+        return path
+
+    def _register(self, key, path):
+        now = time.time()
+        self.index['blobs'][key] = {
+            'file': os.path.basename(path),
+            'bytes': os.path.getsize(path),
+            'created': now,
+            'last_used': now
+        }
+
+    def publish(self, key, blob_path, path):
+        """Recopie un rendu du cache vers sa destination"""
+        shutil.copyfile(blob_path, path)
+        self.mark_published(path, key)
+
+    def mark_published(self, path, key):
+        self.index['published'][path] = key
+
+    def evict(self):
+        """Supprime les entrées trop vieilles, puis les moins utilisées au-delà de max_bytes"""
+        now = time.time()
+        blobs = self.index['blobs']
+        expired = [key for key, entry in blobs.items()
+                   if now - entry['last_used'] > self.max_age_days * 86400]
+
+        total = sum(entry['bytes'] for key, entry in blobs.items() if key not in expired)
+        for key, entry in sorted(blobs.items(), key=lambda item: item[1]['last_used']):
+            if total <= self.max_bytes:
+                break
+            if key not in expired:
+                expired.append(key)
+                total -= entry['bytes']
+
+        for key in expired:
+            entry = blobs.pop(key)
+            try:
+                os.remove(os.path.join(self.cache_dir, entry['file']))
+            except FileNotFoundError:
+                pass
+        return len(expired)
+
+    def save(self):
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=1)
+        os.replace(tmp_path, self.index_path)
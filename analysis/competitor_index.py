@@ -0,0 +1,198 @@
+import numpy as np
+import pandas as pd
+
+# Attributs indexés
+INDEXED_ATTRIBUTES = ['Country', 'Services', 'Pricing_Tier']
+
+# Au-delà de ce nombre de valeurs, index trié (listes de lignes) au lieu de bitmaps
+BITMAP_MAX_VALUES = 64
+
+# Acteurs présents dans plusieurs pays (comptés dans chaque pays si include_regional)
+REGIONAL = 'Regional'
+
+class CompetitorIndex:
+    """Index en mémoire de la table competitors: par Country / Services / Pricing_Tier,
+    bitmaps (peu de valeurs) ou index trié (listes de lignes par valeur), ordre par
+    part de marché et concentration pays × service précalculée"""
+
+    def __init__(self, competitors):
+        self.competitors = competitors
+        self.n_rows = len(competitors)
+        self.shares = competitors['Market_Share_Pct'].values.astype(float)
+
+        self.codes, self.labels, self.postings, self.offsets, self.bitmaps = {}, {}, {}, {}, {}
+        for attr in INDEXED_ATTRIBUTES:
+            codes, labels = pd.factorize(competitors[attr].astype(str), sort=True)
+            self.codes[attr] = codes.astype(np.int32)
+            self.labels[attr] = pd.Index(labels)
+
+            # Index trié: lignes groupées par valeur (ordre des lignes conservé)
+            self.postings[attr] = np.argsort(codes, kind='stable')
+            self.offsets[attr] = np.searchsorted(codes[self.postings[attr]],
+                                                 np.arange(len(labels) + 1))
+
+            # Bitmaps compressés (1 bit par ligne) pour les attributs à peu de valeurs
+            if len(labels) <= BITMAP_MAX_VALUES:
+                bitmaps = np.zeros((len(labels), (self.n_rows + 7) // 8), dtype=np.uint8)
+                rows = np.arange(self.n_rows)
+                np.bitwise_or.at(bitmaps, (codes, rows >> 3),
+                                 (1 << (7 - (rows & 7))).astype(np.uint8))
+                self.bitmaps[attr] = bitmaps
+
+        # Rang de chaque ligne par part de marché décroissante (ordre stable = nlargest)
+        self.order = np.argsort(-self.shares, kind='stable')
+        self.rank = np.empty(self.n_rows, dtype=np.int64)
+        self.rank[self.order] = np.arange(self.n_rows)
+
+        self._cells = None
+        self._coverage = None
+
+    def _positions(self, attr, values):
+        """Codes des valeurs demandées (valeurs inconnues ignorées)"""
+        if attr not in self.codes:
+            raise KeyError(f"Attribut non indexé: {attr} (choix: {INDEXED_ATTRIBUTES})")
+        if isinstance(values, str):
+            values = [values]
+        positions = self.labels[attr].get_indexer(list(values))
+        return positions[positions >= 0]
+
+    def _rows(self, attr, positions):
+        """Lignes (triées) ayant l'une des valeurs: listes de l'index trié fusionnées"""
+        offsets, postings = self.offsets[attr], self.postings[attr]
+        parts = [postings[offsets[p]:offsets[p + 1]] for p in positions]
+        if len(parts) == 1:
+            return parts[0]
+        return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+    def select(self, **filters):
+        """Lignes (positions) correspondant aux filtres, ex.: select(Country='Morocco',
+        Pricing_Tier=['Mid', 'Budget']); ET entre attributs, OU entre valeurs"""
+        bitmap, row_sets = None, []
+        for attr, values in filters.items():
+            if values is None:
+                continue
+            positions = self._positions(attr, values)
+            if attr in self.bitmaps:
+                current = np.bitwise_or.reduce(self.bitmaps[attr][positions], axis=0) \
+                    if len(positions) else np.zeros(self.bitmaps[attr].shape[1], dtype=np.uint8)
+                bitmap = current if bitmap is None else bitmap & current
+            else:
+                row_sets.append(self._rows(attr, positions))
+
+        if not row_sets:
+            if bitmap is None:
+                return np.arange(self.n_rows)
+            return np.flatnonzero(np.unpackbits(bitmap, count=self.n_rows))
+
+        # Index trié: partir de la plus petite liste, puis tester les bits / autres listes
+        row_sets.sort(key=len)
+        rows = row_sets[0]
+        for other in row_sets[1:]:
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        if bitmap is not None:
+            rows = rows[(bitmap[rows >> 3] >> (7 - (rows & 7))) & 1 == 1]
+        return rows
+
+    def count(self, **filters):
+        """Nombre de lignes correspondant aux filtres"""
+        return len(self.select(**filters))
+
+    def top_k(self, k=5, **filters):
+        """k premiers acteurs par part de marché parmi les lignes filtrées (même ordre que nlargest)"""
+        rows = self.select(**filters)
+        ranks = self.rank[rows]
+        if len(rows) > k:
+            ranks = ranks[np.argpartition(ranks, k)[:k]]
+        return self.competitors.iloc[self.order[np.sort(ranks)]]
+
+    def _concentration_cells(self):
+        """HHI, CR3, CR5 et nombre d'acteurs pour chaque cellule pays × service (une passe)"""
+        if self._cells is not None:
+            return self._cells
+        n_services = len(self.labels['Services'])
+        group = self.codes['Country'].astype(np.int64) * n_services + self.codes['Services']
+
+        # Tri par cellule puis part décroissante: rang dans la cellule par différence d'index
+        order = np.lexsort((-self.shares, group))
+        group_sorted, shares_sorted = group[order], self.shares[order]
+        cells, starts, counts = np.unique(group_sorted, return_index=True, return_counts=True)
+        position = np.arange(len(order)) - np.repeat(starts, counts)
+
+        self._cell_ids = cells
+        totals = np.add.reduceat(shares_sorted, starts)
+        normalized = shares_sorted / np.repeat(np.where(totals > 0, totals, 1), counts) * 100
+        self._cells = pd.DataFrame({
+            'Country': self.labels['Country'][cells // n_services],
+            'Services': self.labels['Services'][cells % n_services],
+            'Providers': counts,
+            'Total_Share_Pct': totals,
+            'HHI': np.add.reduceat(normalized ** 2, starts),
+            'CR3': np.add.reduceat(np.where(position < 3, normalized, 0), starts),
+            'CR5': np.add.reduceat(np.where(position < 5, normalized, 0), starts)
+        })
+        return self._cells
+
+    def concentration(self, country=None, service=None):
+        """Concentration par cellule pays × service (parts normalisées dans la cellule):
+        HHI (0-10000), CR3 et CR5 (%)"""
+        cells = self._concentration_cells()
+        if country is None:
+            if service is None:
+                return cells
+            return cells[cells['Services'].values == service].reset_index(drop=True)
+
+        # Cellules triées par code pays × service: plage contiguë par pays (recherche binaire)
+        n_services = len(self.labels['Services'])
+        code = self.labels['Country'].get_indexer([country])[0]
+        if code < 0:
+            return cells.iloc[:0]
+        if service is None:
+            bounds = (code * n_services, (code + 1) * n_services)
+        else:
+            service_code = self.labels['Services'].get_indexer([service])[0]
+            if service_code < 0:
+                return cells.iloc[:0]
+            bounds = (code * n_services + service_code, code * n_services + service_code + 1)
+        start, stop = np.searchsorted(self._cell_ids, bounds)
+        return cells.iloc[start:stop].reset_index(drop=True)
+
+    def market_concentration(self):
+        """HHI, CR3 et CR5 sur l'ensemble du marché (parts telles que saisies, en %)"""
+        top = self.shares[self.order]
+        return {'HHI': float((top ** 2).sum()), 'CR3': float(top[:3].sum()),
+                'CR5': float(top[:5].sum())}
+
+    def white_space(self, countries=None, services=None, max_providers=0, include_regional=True):
+        """Cellules pays × service peu ou pas couvertes (au plus max_providers acteurs)"""
+        labels = self.labels['Country']
+        if countries is None:
+            countries = [c for c in labels if c != REGIONAL]
+        if services is None:
+            services = list(self.labels['Services'])
+        countries, services = pd.Index(countries), pd.Index(services)
+
+        # Matrice pays × service du nombre d'acteurs (bincount sur les codes, calculée une fois)
+        if self._coverage is None:
+            n_countries, n_services = len(labels), len(self.labels['Services'])
+            self._coverage = np.bincount(
+                self.codes['Country'].astype(np.int64) * n_services + self.codes['Services'],
+                minlength=n_countries * n_services
+            ).reshape(n_countries, n_services)
+        counts = self._coverage
+
+        country_pos = labels.get_indexer(countries)
+        service_pos = self.labels['Services'].get_indexer(services)
+        grid = np.zeros((len(countries), len(services)), dtype=np.int64)
+        known = (country_pos >= 0)[:, None] & (service_pos >= 0)[None, :]
+        grid[known] = counts[np.ix_(np.maximum(country_pos, 0), np.maximum(service_pos, 0))][known]
+
+        if include_regional and REGIONAL in labels:
+            regional = counts[labels.get_loc(REGIONAL)]
+            grid += np.where(service_pos >= 0, regional[np.maximum(service_pos, 0)], 0)[None, :]
+
+        rows, cols = np.nonzero(grid <= max_providers)
+        return pd.DataFrame({
+            'Country': countries.values[rows],
+            'Services': services.values[cols],
+            'Providers': grid[rows, cols]
+        })
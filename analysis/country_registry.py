@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+REGISTRY_PATH = '../data/country_registry.csv'
+
+# Colonne optionnelle des tables: pays parent (nom ou ISO3) d'une ligne infranationale
+PARENT_COLUMN = 'Parent_Country'
+
+def load_registry(path=REGISTRY_PATH, francophone_only=False):
+    """Référentiel des pays africains (ISO3, noms, sous-région, comptages), indexé par Country"""
+    registry = pd.read_csv(
+        path,
+        dtype={
+            'ISO3': 'string',
+            'Country': 'string',
+            'World_Bank_Name': 'string',
+            'Subregion': 'category',
+            'Francophone': 'bool',
+            'Banks_Count': 'Int32',
+            'Insurance_Companies': 'Int32'
+        },
+        keep_default_na=False,
+        na_values={'Banks_Count': [''], 'Insurance_Companies': ['']}
+    )
+    if francophone_only:
+        registry = registry[registry['Francophone']]
+    return registry.set_index('Country')
+
+def world_bank_names(registry=None, with_counts_only=True):
+    """Nom Banque Mondiale -> nom interne, pour les pays du référentiel"""
+    if registry is None:
+        registry = load_registry()
+    if with_counts_only:
+        # Seuls les pays dont les comptages banques/assurances sont renseignés
+        registry = registry[registry['Banks_Count'].notna() & registry['Insurance_Companies'].notna()]
+    return dict(zip(registry['World_Bank_Name'], registry.index))
+
+def iso3_codes(registry=None):
+    """Nom interne -> code ISO3"""
+    if registry is None:
+        registry = load_registry()
+    return registry['ISO3'].to_dict()
+
+def parent_countries(countries, parents=None, registry=None):
+    """Pays du référentiel (nom) de chaque ligne, None si inconnu.
+
+    `parents`: colonne explicite (PARENT_COLUMN: nom ou ISO3 du pays parent, vide pour
+    une ligne pays). Sans elle, chaque libellé est cherché dans le référentiel: nom de
+    pays, code ISO3, ou code ISO3 du référentiel suivi de '_' (région 'SEN_Dakar').
+    """
+    if registry is None:
+        registry = load_registry()
+    keys = pd.Series(countries, dtype=object).astype(str).reset_index(drop=True)
+    if parents is not None:
+        explicit = pd.Series(parents, dtype=object).reset_index(drop=True)
+        given = explicit.notna() & (explicit.astype(str) != '')
+        keys = keys.where(~given, explicit.astype(str))
+
+    names = registry.index.astype(str)
+    iso3 = registry['ISO3'].astype(str)
+    positions = pd.Index(names).get_indexer(keys)
+    missing = positions < 0
+    if missing.any():
+        positions[missing] = pd.Index(iso3).get_indexer(keys[missing])
+        missing = positions < 0
+    if missing.any():
+        prefixes = np.asarray(keys[missing].values, dtype=str).astype('U4')
+        positions[missing] = pd.Index(iso3 + '_').get_indexer(prefixes)
+    # Position -1 (inconnu): dernier élément None
+    return np.append(np.asarray(names, dtype=object), None)[positions]
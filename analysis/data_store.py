@@ -0,0 +1,166 @@
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+DATA_DIR = '../data'
+STORE_DIR = '../data/store'
+
+# Tables saisies à la main (CSV) -> ré-importées quand le CSV est plus récent
+SOURCE_TABLES = ['market_data', 'regulations', 'competitors']
+
+# Niveaux de maturité réglementaire (catégories fixes: codes stables d'un fichier à l'autre)
+MATURITY_TYPE = pd.CategoricalDtype(['Low', 'Basic', 'Medium', 'Developing', 'High', 'Advanced'])
+
+# Schéma typé commun à toutes les tables (appliqué aux colonnes présentes).
+# Entiers: type minimal, élargi (int32, int64) si les valeurs observées n'y tiennent pas.
+# Pas de float32: toutes les colonnes décimales du store entrent dans un calcul ou un
+# export (TAM/SAM, scores, sommes de parts de marché, CSV Power BI) et restent en float64.
+COLUMN_TYPES = {
+    'Country': 'category',
+    'Compliance_Maturity': MATURITY_TYPE,
+    'Banking_Regulation': 'category',
+    'Cybersecurity_Framework': 'category',
+    'Services': 'category',
+    'Pricing_Tier': 'category',
+    'Banks_Count': 'int16',
+    'Insurance_Companies': 'int16',
+    'SMEs_Count': 'int32',
+    'Clients_Estimate': 'int16',
+    'Maturity_Score': 'int8',
+    'Penalties_Max_USD': 'int32'
+}
+
+# Types entiers du plus étroit au plus large
+INTEGER_TYPES = ['int8', 'int16', 'int32', 'int64']
+
+# 'category' seulement si les valeurs se répètent assez (une région par ligne: catégories
+# plus coûteuses que les chaînes)
+MAX_CATEGORY_RATIO = 0.5
+
+def _integer_type(values, dtype):
+    """Plus petit type entier, au moins `dtype`, qui contient le min et le max observés"""
+    if not len(values) or not pd.api.types.is_numeric_dtype(values):
+        return dtype
+    low, high = values.min(), values.max()
+    for candidate in INTEGER_TYPES[INTEGER_TYPES.index(dtype):]:
+        limits = np.iinfo(candidate)
+        if limits.min <= low and high <= limits.max:
+            return candidate
+    raise ValueError(f"{values.name}: valeurs hors de la plage de int64")
+
+def _check_conversion(df, col, dtype):
+    """Refuse une conversion qui perdrait des valeurs (libellé inconnu)"""
+    values = df[col]
+    if dtype == 'category' and getattr(dtype, 'categories', None) is not None:
+        unknown = set(values.dropna().unique()) - set(dtype.categories)
+        if unknown:
+            raise ValueError(f"{col}: valeurs inconnues {sorted(map(str, unknown))}")
+
+def apply_schema(df):
+    """Convertit les colonnes connues vers leur type du schéma"""
+    types = {}
+    for col, dtype in COLUMN_TYPES.items():
+        if col not in df.columns:
+            continue
+        if (isinstance(dtype, str) and dtype == 'category' and df[col].dtype != 'category'
+                and df[col].nunique() > MAX_CATEGORY_RATIO * len(df)):
+            continue
+        if isinstance(dtype, str) and dtype in INTEGER_TYPES:
+            dtype = _integer_type(df[col], dtype)
+        _check_conversion(df, col, dtype)
+        types[col] = dtype
+    return df.astype(types)
+
+def category_lookup(values, mapping):
+    """Valeurs de `mapping` pour chaque ligne: une recherche par catégorie puis
+    indexation du tableau par les codes (au lieu d'un .map() ligne à ligne)"""
+    values = values.astype('category') if values.dtype != 'category' else values
+    categories = values.cat.categories
+    unknown = [label for label in categories if label not in mapping]
+    codes = values.cat.codes.values
+    if unknown or (codes < 0).any():
+        raise ValueError(f"Valeurs sans correspondance: {unknown or 'manquantes'}")
+    return np.array([mapping[label] for label in categories])[codes]
+
+def memory_usage(df):
+    """Mémoire occupée par une table (octets, chaînes comprises)"""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+def memory_report(frames):
+    """Mémoire avant/après schéma typé pour des tables lues avec l'inférence par défaut"""
+    rows = []
+    for name, df in frames.items():
+        before, after = memory_usage(df), memory_usage(apply_schema(df))
+        rows.append({'Table': name, 'Rows': len(df), 'Before_Bytes': before,
+                     'After_Bytes': after, 'Ratio': round(before / max(after, 1), 2)})
+    return pd.DataFrame(rows)
+
+def index_by_country(df):
+    """Table indexée par Country: jointures par index au lieu de merge(on='Country')"""
+    return df.set_index(df['Country'].astype(str)).drop(columns='Country')
+
+def table_path(name, store_dir=STORE_DIR):
+    """Chemin du fichier Arrow IPC d'une table"""
+    return os.path.join(store_dir, f'{name}.arrow')
+
+def write_table(name, df, store_dir=STORE_DIR):
+    """Écrit une table dans le store (Arrow IPC non compressé, donc mappable)"""
+    os.makedirs(store_dir, exist_ok=True)
+    table = pa.Table.from_pandas(apply_schema(df), preserve_index=False)
+
+    # Écriture atomique: un lecteur ne voit jamais un fichier à moitié écrit
+    path = table_path(name, store_dir)
+    tmp_path = path + '.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return path
+
+def read_table(name, store_dir=STORE_DIR):
+    """Lit une table par memory-map (les colonnes numériques ne sont pas copiées)"""
+    source = pa.memory_map(table_path(name, store_dir), 'r')
+    table = ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
+
+def prune_tables(prefix, keep, store_dir=STORE_DIR):
+    """Supprime les tables `prefix*` du store, sauf `keep` (versions périmées)"""
+    removed = []
+    if not os.path.isdir(store_dir):
+        return removed
+    for filename in sorted(os.listdir(store_dir)):
+        name, extension = os.path.splitext(filename)
+        if extension == '.arrow' and name.startswith(prefix) and name != keep:
+            os.remove(os.path.join(store_dir, filename))
+            removed.append(name)
+    return removed
+
+def import_csv(name, data_dir=DATA_DIR, store_dir=STORE_DIR):
+    """Importe un CSV dans le store avec le schéma typé"""
+    df = apply_schema(pd.read_csv(os.path.join(data_dir, f'{name}.csv')))
+    write_table(name, df, store_dir)
+    return df
+
+def load_table(name, data_dir=DATA_DIR, store_dir=STORE_DIR):
+    """Charge une table depuis le store, en (ré)important le CSV si nécessaire"""
+    csv_path = os.path.join(data_dir, f'{name}.csv')
+    path = table_path(name, store_dir)
+
+    if not os.path.exists(path):
+        if not os.path.exists(csv_path):
+            raise FileNotFoundError(f"Table '{name}' absente du store et de {data_dir}")
+        import_csv(name, data_dir, store_dir)
+    elif (name in SOURCE_TABLES and os.path.exists(csv_path)
+          and os.path.getmtime(csv_path) > os.path.getmtime(path)):
+        # Le CSV source a été modifié depuis le dernier import
+        import_csv(name, data_dir, store_dir)
+
+    return read_table(name, store_dir)
+
+def export_csv(df, name, data_dir=DATA_DIR):
+    """Export CSV optionnel (pour Power BI), hors du format d'échange"""
+    path = os.path.join(data_dir, f'{name}.csv')
+    df.to_csv(path, index=False)
+    return path
@@ -0,0 +1,144 @@
+"""Séquencement optimal de l'entrée sur les marchés (programmation dynamique exacte)
+
+Choisit les marchés à ouvrir et leur phase (1 phase = 12 mois) sous trois contraintes:
+budget d'investissement total (capex), capacité SOC (marchés ouverts par phase) et
+maturité réglementaire minimale. Objectif: valeur actualisée nette sur l'horizon,
+SOM × années d'exploitation actualisées − capex d'entrée.
+
+Les poids de phase décroissent: parmi les marchés retenus, les SOM les plus élevés
+entrent en premier (réarrangement). En parcourant les marchés par SOM décroissant,
+le k-ième marché retenu entre donc en phase k // capacité, et le problème devient un
+sac à dos à deux dimensions (budget × nombre de marchés retenus), résolu exactement.
+Taille de la table: (budget / pas + 1) × (capacité × phases + 1) par marché.
+
+    python entry_planner.py --budget 2.0 --capacity 1 --phases 3 --min-maturity 7
+"""
+import argparse
+import numpy as np
+import pandas as pd
+from data_store import load_table
+
+# Coût d'entrée d'un marché (M USD): point de présence SOC + équipe commerciale
+ENTRY_COSTS = {
+    'fixed_m_usd': 0.25,   # installation fixe par pays
+    'sam_share': 0.10      # montée en charge: 10% du SAM
+}
+
+DISCOUNT_RATE = 0.10       # taux d'actualisation annuel
+HORIZON_YEARS = 5          # horizon du plan d'affaires
+BUDGET_STEP_M_USD = 0.01   # pas de discrétisation du budget (coûts arrondis au pas supérieur)
+
+# Paramètres par défaut du plan
+PLAN_DEFAULTS = {'budget_m_usd': 2.0, 'capacity': 1, 'phases': 3, 'min_maturity': 7}
+
+def entry_capex(ranking, costs=ENTRY_COSTS):
+    """Capex d'entrée par marché (M USD)"""
+    return costs['fixed_m_usd'] + ranking['SAM_M_USD'].values * costs['sam_share']
+
+def phase_weights(phases, horizon=HORIZON_YEARS, rate=DISCOUNT_RATE):
+    """Années d'exploitation actualisées restant sur l'horizon pour une entrée en phase p"""
+    if horizon < phases:
+        raise ValueError(f"Horizon ({horizon} ans) plus court que le nombre de phases ({phases})")
+    discount = (1 + rate) ** -np.arange(horizon)
+    return np.cumsum(discount[::-1])[::-1][:phases]
+
+def solve(values, capex, units, weights, capacity, budget):
+    """Sac à dos budget × nombre retenu, marchés triés par valeur décroissante.
+
+    `values`: SOM (décroissant), `capex`: coût d'entrée (M USD), `units`: ce coût en
+    unités entières de budget, `weights`: poids de chaque phase (décroissants).
+    Renvoie (indices retenus dans l'ordre d'entrée, valeur optimale).
+    """
+    n_slots = capacity * len(weights)
+    slot_weights = np.repeat(weights, capacity)  # poids du k-ième marché retenu
+
+    # best[b, k]: meilleure valeur avec au plus b unités de budget et k marchés retenus
+    best = np.full((budget + 1, n_slots + 1), -np.inf)
+    best[:, 0] = 0.0
+    # Choix de chaque marché, 1 bit par cellule (bitmaps sur l'axe budget)
+    taken = np.zeros((len(values), (budget + 8) // 8, n_slots + 1), dtype=np.uint8)
+
+    for i in range(len(values)):
+        cost = int(units[i])
+        if cost > budget:
+            continue
+        gain = slot_weights * values[i] - capex[i]
+        candidate = np.full_like(best, -np.inf)
+        candidate[cost:, 1:] = best[:budget + 1 - cost, :-1] + gain
+        taken[i] = np.packbits(candidate > best, axis=0)
+        np.maximum(best, candidate, out=best)
+
+    b, k = np.unravel_index(np.argmax(best), best.shape)
+    total = float(best[b, k])
+    selected = []
+    for i in range(len(values) - 1, -1, -1):
+        if k > 0 and (taken[i, b >> 3, k] >> (7 - (b & 7))) & 1:
+            selected.append(i)
+            b -= int(units[i])
+            k -= 1
+    return selected[::-1], total
+
+def plan_entry(ranking, budget_m_usd=PLAN_DEFAULTS['budget_m_usd'],
+               capacity=PLAN_DEFAULTS['capacity'], phases=PLAN_DEFAULTS['phases'],
+               min_maturity=PLAN_DEFAULTS['min_maturity'], costs=ENTRY_COSTS,
+               horizon=HORIZON_YEARS, rate=DISCOUNT_RATE, budget_step=BUDGET_STEP_M_USD):
+    """Plan d'entrée optimal: Country, Phase, SOM, Capex et valeur actualisée par marché"""
+    eligible = ranking[ranking['Maturity_Score'].values >= min_maturity]
+    # Tri par SOM décroissant (ordre stable: à SOM égal, ordre du classement)
+    eligible = eligible.iloc[np.argsort(-eligible['SOM_M_USD'].values, kind='stable')]
+
+    som = eligible['SOM_M_USD'].values.astype(float)
+    capex = entry_capex(eligible, costs)
+    weights = phase_weights(phases, horizon, rate)
+    budget = int(np.floor(budget_m_usd / budget_step + 1e-9))
+    units = np.ceil(capex / budget_step - 1e-9).astype(np.int64)
+
+    selected, _ = solve(som, capex, units, weights, capacity, budget)
+    phase = np.arange(len(selected)) // capacity
+    value = weights[phase] * som[selected] - capex[selected]
+    return pd.DataFrame({
+        'Country': eligible['Country'].astype(str).values[selected],
+        'Phase': phase + 1,
+        'SOM_M_USD': som[selected],
+        'Capex_M_USD': capex[selected],
+        'NPV_M_USD': value
+    })
+
+def print_plan(plan, budget_m_usd, capacity, phases):
+    """Affiche le plan par phase"""
+    print(f"\n   Budget: ${budget_m_usd:.2f}M | Capacité SOC: {capacity} marché(s)/phase | "
+          f"{phases} phases de 12 mois")
+    if plan.empty:
+        print("   Aucun marché rentable dans ce budget.")
+        return
+    for phase, group in plan.groupby('Phase', sort=True):
+        start = (phase - 1) * 12
+        markets = ', '.join(group['Country'])
+        print(f"   Phase {phase} ({start}-{start + 12} mois): {markets}")
+    print(f"   Capex engagé: ${plan['Capex_M_USD'].sum():.2f}M | "
+          f"VAN sur l'horizon: ${plan['NPV_M_USD'].sum():.2f}M")
+
+def parse_args(argv=None):
+    """Options de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Plan d'entrée optimal sur les marchés MSSP")
+    parser.add_argument('--budget', type=float, default=PLAN_DEFAULTS['budget_m_usd'],
+                        help="Budget d'investissement total (M USD)")
+    parser.add_argument('--capacity', type=int, default=PLAN_DEFAULTS['capacity'],
+                        help="Marchés ouverts par phase (capacité SOC)")
+    parser.add_argument('--phases', type=int, default=PLAN_DEFAULTS['phases'],
+                        help="Nombre de phases de 12 mois")
+    parser.add_argument('--min-maturity', type=int, default=PLAN_DEFAULTS['min_maturity'],
+                        help="Score de maturité réglementaire minimal (4, 7 ou 10)")
+    parser.add_argument('--horizon', type=int, default=HORIZON_YEARS,
+                        help="Horizon du plan d'affaires (années)")
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    ranking = load_table('country_ranking')
+    plan = plan_entry(ranking, args.budget, args.capacity, args.phases, args.min_maturity,
+                      horizon=args.horizon)
+    print_plan(plan, args.budget, args.capacity, args.phases)
+
+if __name__ == "__main__":
+    main()
@@ -1,140 +1,240 @@
 
+import argparse
+import contextlib
+import numpy as np
 import pandas as pd
+import io
 import os
+import re
+import zipfile
+from country_registry import load_registry, world_bank_names
+from instrumentation import traced
+from market_model import HYPOTHESES
 
-def extract_world_bank_data(csv_path):
+# Indicateurs Banque Mondiale retenus -> clé interne
+WORLD_BANK_INDICATORS = {
+    'GDP (current US$)': 'gdp',
+    'Population, total': 'population',
+    'Individuals using the Internet (% of population)': 'internet',
+    'Mobile cellular subscriptions (per 100 people)': 'mobile'
+}
 
-    print(" Lecture du fichier Banque Mondiale...")
+# Instantané 2024 des indicateurs (pays du référentiel avec comptages)
+WORLD_BANK_SNAPSHOT = '../data/world_bank_snapshot.csv'
+
+@traced
+def load_world_bank_frame(csv_path, year_column='2024 [YR2024]', countries=None):
+    """Charge l'export Banque Mondiale en tableau pays × indicateur (vectorisé)"""
+    # Pays du référentiel (nom Banque Mondiale -> nom interne)
+    if countries is None:
+        countries = world_bank_names()
     
-    # Lire le CSV
-    df = pd.read_csv(csv_path)
+    # Ne lire que les 3 colonnes utiles : le reste de l'export n'est jamais chargé
+    df = pd.read_csv(
+        csv_path,
+        usecols=['Country Name', 'Series Name', year_column],
+        dtype={'Country Name': 'category', 'Series Name': 'category'},
+        na_values=['..']
+    )
     
-    # Filtrer juste les 4 indicateurs qui nous intéressent
-    indicators = {
-        'GDP (current US$)': 'gdp',
-        'Population, total': 'population',
-        'Individuals using the Internet (% of population)': 'internet',
-        'Mobile cellular subscriptions (per 100 people)': 'mobile'
-    }
+    # Filtrer les indicateurs d'un seul coup (isin) au lieu d'une boucle par ligne
+    df = df[df['Series Name'].isin(WORLD_BANK_INDICATORS.keys())
+            & df['Country Name'].isin(countries.keys())]
     
-    # Créer un dictionnaire pour stocker les données par pays
-    countries_data = {}
-    
-    for _, row in df.iterrows():
-        country = row['Country Name']
-        series = row['Series Name']
-        value = row['2024 [YR2024]']
-        
-        # Ignorer les lignes vides
-        if pd.isna(country) or country == '':
-            continue
-        
-        # Initialiser le pays s'il n'existe pas
-        if country not in countries_data:
-            countries_data[country] = {}
-        
-        # Stocker la valeur selon l'indicateur
-        for indicator_name, key in indicators.items():
-            if series == indicator_name:
-                countries_data[country][key] = value
-    
-    return countries_data
-
-def create_market_data_with_real_data():
- 
+    df = df.assign(
+        Country=df['Country Name'].astype(str).map(countries),
+        Indicator=df['Series Name'].astype(str).map(WORLD_BANK_INDICATORS),
+        Value=pd.to_numeric(df[year_column], errors='coerce')
+    )
     
-    print("\n" + " "*35)
-    print("   CRÉATION DE market_data.csv AVEC MES VRAIES DONNÉES")
-    print(" "*35 + "\n")
+    # Pivot en une seule étape : une ligne par pays, une colonne par indicateur
+    wide = df.pivot_table(
+        index='Country', columns='Indicator', values='Value',
+        aggfunc='last', dropna=False
+    )
+    wide.columns.name = None
     
+    return wide.reindex(columns=list(WORLD_BANK_INDICATORS.values()))
 
+# Colonnes année: '2024 [YR2024]' (DataBank) ou '2024' (export WDI en masse)
+YEAR_COLUMN = re.compile(r'^(\d{4})(?: \[YR\d{4}\])?$')
+
+@contextlib.contextmanager
+def _open_world_bank_file(path, member=None):
+    """Ouvre le CSV en texte, directement dans le ZIP si besoin (pas d'extraction).
+    L'archive reste ouverte pendant le bloc `with` et est fermée avec le fichier."""
+    if not str(path).lower().endswith('.zip'):
+        with open(path, encoding='utf-8-sig') as handle:
+            yield handle
+        return
     
-    world_bank_data = {
-        'Senegal': {
-            'gdp': 32267254425.052,     
-            'population': 18501984,     
-            'internet': 58.2,             
-            'mobile': 115.5               
-        },
-        'Cote_Ivoire': {
-            'gdp': 86538413923.3943,  
-            'population': 31934230,  
-            'internet': 47.0,          
-            'mobile': 142.3               
-        },
-        'Cameroon': {
-            'gdp': 51326764684.8595,     
-            'population': 29123744,          
-            'internet': 38.5,                
-            'mobile': 89.7                   
-        },
-        'Morocco': {
-            'gdp': 154430996472.752,        
-            'population': 38081173,          
-            'internet': 88.1,                
-            'mobile': 132.8                  
-        },
-        'Tunisia': {
-            'gdp': 53409988744.5968,        
-            'population': 12277109,          
-            'internet': 74.3,                
-            'mobile': 130.2                  
-        },
-        'Burkina_Faso': {
-            'gdp': 23250214909.5391,        
-            'population': 23548781,          
-            'internet': 24.5,                
-            'mobile': 110.8                  
-        }
-    }
+    with zipfile.ZipFile(path) as archive:
+        if member is None:
+            # WDIData.csv dans le téléchargement en masse, sinon le premier CSV de données
+            names = [n for n in archive.namelist() if n.lower().endswith('.csv')]
+            data_names = [n for n in names if 'metadata' not in n.lower()]
+            preferred = [n for n in data_names if os.path.basename(n).lower() == 'wdidata.csv']
+            member = (preferred or data_names or names)[0]
+        with io.TextIOWrapper(archive.open(member), encoding='utf-8-sig') as handle:
+            yield handle
+
+@traced
+def stream_world_bank_long(path, years=None, countries=None,
+                           indicators=WORLD_BANK_INDICATORS, chunksize=50_000, member=None):
+    """Lit l'export Banque Mondiale par morceaux et renvoie un tableau long compact
+    (Country, Indicator, Year, Value) limité aux pays et indicateurs configurés"""
+    if countries is None:
+        countries = world_bank_names()
+    
+    # 1. En-tête seul pour repérer les colonnes (DataBank ou WDI)
+    with _open_world_bank_file(path, member) as handle:
+        header = pd.read_csv(handle, nrows=0).columns
+    
+    series_column = 'Series Name' if 'Series Name' in header else 'Indicator Name'
+    year_columns = {}
+    for column in header:
+        match = YEAR_COLUMN.match(str(column).strip())
+        if match and (years is None or int(match.group(1)) in years):
+            year_columns[column] = int(match.group(1))
+    
+    if not year_columns:
+        raise ValueError(f"Aucune colonne année trouvée pour {years} dans {path}")
+    
+    country_type = pd.CategoricalDtype(sorted(set(countries.values())))
+    indicator_type = pd.CategoricalDtype(list(indicators.values()))
+    
+    # 2. Lecture par morceaux: seules les lignes retenues survivent à chaque morceau
+    parts = []
+    with _open_world_bank_file(path, member) as handle:
+        reader = pd.read_csv(
+            handle,
+            usecols=['Country Name', series_column] + list(year_columns),
+            na_values=['..'],
+            chunksize=chunksize
+        )
+        for chunk in reader:
+            chunk = chunk[chunk[series_column].isin(indicators.keys())
+                          & chunk['Country Name'].isin(countries.keys())]
+            if chunk.empty:
+                continue
+            
+            long = chunk.melt(
+                id_vars=['Country Name', series_column],
+                value_vars=list(year_columns),
+                var_name='Year', value_name='Value'
+            ).dropna(subset=['Value'])
+            
+            parts.append(pd.DataFrame({
+                'Country': long['Country Name'].map(countries).astype(country_type),
+                'Indicator': long[series_column].map(indicators).astype(indicator_type),
+                'Year': long['Year'].map(year_columns).astype('int16'),
+                'Value': pd.to_numeric(long['Value'], errors='coerce')
+            }))
     
+    if not parts:
+        return pd.DataFrame({
+            'Country': pd.Series(dtype=country_type),
+            'Indicator': pd.Series(dtype=indicator_type),
+            'Year': pd.Series(dtype='int16'),
+            'Value': pd.Series(dtype='float64')
+        })
+    
+    return pd.concat(parts, ignore_index=True)
+
+@traced
+def extract_world_bank_data(csv_path, year_column='2024 [YR2024]', countries=None,
+                            chunksize=None):
 
+    print(" Lecture du fichier Banque Mondiale...")
+    
+    if chunksize or str(csv_path).lower().endswith('.zip'):
+        # Mode streaming: gros exports / ZIP en masse, mémoire bornée
+        year = int(YEAR_COLUMN.match(year_column).group(1))
+        long = stream_world_bank_long(csv_path, years=[year], countries=countries,
+                                      chunksize=chunksize or 50_000)
+        wide = long.pivot_table(index='Country', columns='Indicator', values='Value',
+                                aggfunc='last', observed=True)
+        wide.columns = wide.columns.astype(str)
+        wide.index = wide.index.astype(str)
+        wide = wide.reindex(columns=list(WORLD_BANK_INDICATORS.values()))
+    else:
+        wide = load_world_bank_frame(csv_path, year_column, countries)
     
-    wikipedia_counts = {
-        'Senegal': {'banks': 29, 'insurance': 30},
-        'Cote_Ivoire': {'banks': 29, 'insurance': 32},
-        'Cameroon': {'banks': 19, 'insurance': 30},
-        'Morocco': {'banks': 32, 'insurance': 26},
-        'Tunisia': {'banks': 26, 'insurance': 22},
-        'Burkina_Faso': {'banks': 16, 'insurance': 17}
+    # Même forme qu'avant : {pays: {indicateur: valeur}} sans les valeurs manquantes
+    return {
+        country: {key: value for key, value in values.items() if pd.notna(value)}
+        for country, values in wide.to_dict('index').items()
     }
+
+def indicators_to_model_units(indicators):
+    """Indicateurs Banque Mondiale bruts (gdp, population...) -> unités du modèle"""
+    return pd.DataFrame({
+        'Population_M': indicators['population'] / 1_000_000,  # population en millions
+        'GDP_B_USD': indicators['gdp'] / 1_000_000_000,  # PIB en milliards
+        'Internet_Penetration_Pct': indicators['internet'],
+        'Mobile_Penetration_Pct': indicators['mobile']
+    }, index=indicators.index)
+
+@traced
+def build_market_frame(base, registry=None):
+    """Construit les lignes de market_data en une passe vectorisée.
+    
+    `base` est indexé par Country (pays ou région) avec Population_M, GDP_B_USD,
+    Internet_Penetration_Pct et Mobile_Penetration_Pct; les comptages
+    banques/assurances viennent du référentiel s'ils ne sont pas fournis.
+    """
+    base = base.copy()
+    if 'Banks_Count' not in base.columns or 'Insurance_Companies' not in base.columns:
+        if registry is None:
+            registry = load_registry()
+        # Jointure sur l'index (Country) au lieu d'une recherche dict par pays
+        base = base.join(registry[['Banks_Count', 'Insurance_Companies']], how='left')
+    
+    # Ignorer les lignes sans comptages ou avec un indicateur manquant
+    required = ['Population_M', 'GDP_B_USD', 'Internet_Penetration_Pct',
+                'Mobile_Penetration_Pct', 'Banks_Count', 'Insurance_Companies']
+    complete = base[required].notna().all(axis=1)
+    if not complete.all():
+        print(f"   Ignoré (données incomplètes): {', '.join(map(str, base.index[~complete]))}")
+        base = base[complete]
     
+    # Calculs standards industrie
+    it_market_m = base['GDP_B_USD'] * HYPOTHESES['it_share_gdp'] * 1000  # 2.5% du PIB
+    cyber_spending_m = it_market_m * HYPOTHESES['cyber_share_it']  # 3% du marché IT
+    smes_count = np.floor(base['Population_M'] * 4000)  # 4 PME / 1000 habitants
+    
+    return pd.DataFrame({
+        'Country': base.index.astype(str),
+        'Population_M': base['Population_M'].round(1).values,
+        'GDP_B_USD': base['GDP_B_USD'].round(1).values,
+        'IT_Market_M_USD': it_market_m.round(1).values,
+        'Cybersecurity_Spending_M_USD': cyber_spending_m.round(1).values,
+        'Banks_Count': base['Banks_Count'].astype('int64').values,
+        'Insurance_Companies': base['Insurance_Companies'].astype('int64').values,
+        'SMEs_Count': smes_count.astype('int64').values,
+        'Internet_Penetration_Pct': base['Internet_Penetration_Pct'].values,
+        'Mobile_Penetration_Pct': base['Mobile_Penetration_Pct'].values
+    })
 
+@traced
+def create_market_data_with_real_data(world_bank_data=None):
+ 
+    
+    print("\n" + " "*35)
+    print("   CRÉATION DE market_data.csv AVEC MES VRAIES DONNÉES")
+    print(" "*35 + "\n")
     
-    rows = []
-    
-    for country in world_bank_data.keys():
-        data = world_bank_data[country]
-        counts = wikipedia_counts[country]
-        
-        # Convertir GDP en milliards
-        gdp_billions = data['gdp'] / 1_000_000_000
-        
-        # Convertir population en millions
-        population_millions = data['population'] / 1_000_000
-        
-        # Calculs standards industrie
-        it_market_m = gdp_billions * 0.025 * 1000  # 2.5% du PIB
-        cyber_spending_m = it_market_m * 0.03      # 3% du marché IT
-        smes_count = int(population_millions * 4000)  # 4 PME / 1000 habitants
-        
-        row = {
-            'Country': country,
-            'Population_M': round(population_millions, 1),
-            'GDP_B_USD': round(gdp_billions, 1),
-            'IT_Market_M_USD': round(it_market_m, 1),
-            'Cybersecurity_Spending_M_USD': round(cyber_spending_m, 1),
-            'Banks_Count': counts['banks'],
-            'Insurance_Companies': counts['insurance'],
-            'SMEs_Count': smes_count,
-            'Internet_Penetration_Pct': data['internet'],
-            'Mobile_Penetration_Pct': data['mobile']
-        }
-        
-        rows.append(row)
-    
-    # Créer DataFrame
-    df = pd.DataFrame(rows)
+    # Indicateurs: export fourni (dict ou DataFrame) ou instantané 2024 versionné
+    if world_bank_data is None:
+        indicators = pd.read_csv(WORLD_BANK_SNAPSHOT, index_col='Country')
+    elif isinstance(world_bank_data, dict):
+        indicators = pd.DataFrame.from_dict(world_bank_data, orient='index')
+    else:
+        indicators = world_bank_data
+    indicators = indicators.reindex(columns=list(WORLD_BANK_INDICATORS.values()))
+    
+    # Comptages banques/assurances: référentiel des pays (data/country_registry.csv)
+    df = build_market_frame(indicators_to_model_units(indicators))
     
     # Sauvegarder
     output_path = '../data/market_data.csv'
@@ -168,6 +268,7 @@ def create_market_data_with_real_data():
     print("2. Change l'année de 2024 → 2023")
     print("3. Télécharge à nouveau")
     print("4. Relance ce script")
+    print("   (ou: python extract_and_build.py --api --year 2024, dernière valeur connue)")
     print("="*70 + "\n")
     
     print("  PROCHAINES ÉTAPES:")
@@ -181,11 +282,38 @@ def create_market_data_with_real_data():
 def main():
     """Fonction principale"""
     
+    parser = argparse.ArgumentParser(description="Construit market_data.csv depuis la Banque Mondiale")
+    parser.add_argument('export', nargs='?', default=None,
+                        help="Export DataBank (CSV ou ZIP); défaut: instantané 2024 versionné")
+    parser.add_argument('--api', action='store_true',
+                        help="Télécharge les indicateurs via l'API Banque Mondiale")
+    parser.add_argument('--year', type=int, default=2024,
+                        help="Avec --api: année cible (dernière valeur connue jusqu'à cette année)")
+    parser.add_argument('--concurrency', type=int, default=8, help="Avec --api: requêtes simultanées")
+    parser.add_argument('--base-url', default=None, help="Avec --api: autre serveur (ex.: stub local)")
+    parser.add_argument('--fixtures', default=None,
+                        help="Avec --api: rejoue les réponses enregistrées de ce dossier (hors ligne)")
+    parser.add_argument('--record', default=None,
+                        help="Avec --api: enregistre les réponses dans ce dossier (fixtures)")
+    args = parser.parse_args()
+    
     print("\n   EXTRACTION ET CRÉATION AUTOMATIQUE\n")
     
-   
+    # Export DataBank optionnel: python extract_and_build.py export.csv
+    world_bank_data = None
+    if args.api:
+        from world_bank_api import API_URL, WorldBankClient, fetch_world_bank_long, latest_indicators
+        client = WorldBankClient(base_url=args.base_url or API_URL, concurrency=args.concurrency,
+                                 fixtures_dir=args.fixtures, record_dir=args.record)
+        print("   Téléchargement des indicateurs (API Banque Mondiale)...")
+        long = fetch_world_bank_long(years=range(args.year - 5, args.year + 1), client=client)
+        print(f"   {client.stats['requests']} requêtes, {client.stats['cache']} réponses en cache, "
+              f"{client.stats['revalidated']} revalidées, {client.stats['retries']} reprises")
+        world_bank_data = latest_indicators(long, args.year)
+    elif args.export:
+        world_bank_data = extract_world_bank_data(args.export)
     
-    df = create_market_data_with_real_data()
+    df = create_market_data_with_real_data(world_bank_data)
     
     print("   TERMINÉ! Tes données sont prêtes!   \n")
 
@@ -0,0 +1,210 @@
+"""Traces d'exécution (spans JSON lines) des étapes de l'analyse
+
+Activées par la variable d'environnement MSSP_TRACE:
+    MSSP_TRACE=../reports/trace.jsonl python market_analysis.py   # fichier (ajout)
+    MSSP_TRACE=1 python pipeline.py                                # stderr
+MSSP_TRACE_MEMORY=0 désactive la mesure du pic d'allocation (tracemalloc ralentit
+les allocations Python). Le pic tracemalloc est global au processus: quand des spans
+sont ouverts sur plusieurs threads en même temps (étapes parallèles du pipeline), leur
+pic n'est pas attribuable et peak_alloc_bytes vaut null (champ 'concurrent': true).
+output_bytes: taille des fichiers déclarés par le span (span(nom, outputs=[...]), ex. les
+sorties d'une étape du pipeline) écrits pendant le span, null sans fichiers déclarés.
+process_write_bytes: toutes les écritures du processus pendant le span (Linux, wchar de
+/proc/self/io): fichiers, mais aussi stdout/stderr, lignes de trace et autres threads.
+Sans MSSP_TRACE, les décorateurs renvoient les fonctions telles quelles: aucun coût
+à l'exécution.
+"""
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+TRACE_ENV = 'MSSP_TRACE'
+MEMORY_ENV = 'MSSP_TRACE_MEMORY'
+
+ENABLED = os.environ.get(TRACE_ENV, '') not in ('', '0')
+TRACE_MEMORY = ENABLED and os.environ.get(MEMORY_ENV, '1') != '0'
+
+_local = threading.local()
+_lock = threading.Lock()
+_sink = None
+
+# Threads ayant un span ouvert, et nombre de chevauchements entre threads depuis le début
+_open_threads = 0
+_overlaps = 0
+
+def _write(record):
+    """Écrit un span (une ligne JSON); fichier partagé par threads et processus"""
+    global _sink
+    line = json.dumps(record, ensure_ascii=False, default=str) + '\n'
+    with _lock:
+        if _sink is None:
+            target = os.environ[TRACE_ENV]
+            if target in ('1', 'stderr'):
+                _sink = sys.stderr
+            else:
+                os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+                _sink = open(target, 'a', encoding='utf-8', buffering=1)
+        _sink.write(line)
+
+def _bytes_written():
+    """Octets écrits par le processus, tous descripteurs confondus (Linux: wchar de
+    /proc/self/io), sinon None"""
+    try:
+        with open('/proc/self/io') as f:
+            for line in f:
+                if line.startswith('wchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+
+def _file_states(paths):
+    """(date de modification, taille) de chaque fichier existant"""
+    states = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        states[path] = (stat.st_mtime_ns, stat.st_size)
+    return states
+
+def _files_written(before, after):
+    """Octets des fichiers créés ou modifiés entre deux relevés de _file_states"""
+    return sum(size for path, (mtime, size) in after.items() if before.get(path) != (mtime, size))
+
+def _count_rows(result, args):
+    """Lignes traitées: taille du résultat, sinon de market_data de l'objet appelé"""
+    if hasattr(result, '__len__') and not isinstance(result, (str, bytes)):
+        return len(result)
+    if args and hasattr(args[0], 'market_data'):
+        return len(args[0].market_data)
+    return None
+
+class Span:
+    """Mesure d'une étape: durée, lignes, pic d'allocation et octets écrits.
+    `outputs`: fichiers produits par l'étape (output_bytes)"""
+
+    def __init__(self, name, outputs=None, **fields):
+        self.name = name
+        self.outputs = list(outputs) if outputs is not None else None
+        self.fields = fields
+        self.rows = None
+        self.peak = 0
+
+    def __enter__(self):
+        global _open_threads, _overlaps
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        self.parent = stack[-1].name if stack else None
+        with _lock:
+            if not stack:
+                _open_threads += 1
+                if _open_threads > 1:
+                    _overlaps += 1
+            self._concurrent = _open_threads > 1
+            self._overlaps = _overlaps
+        if TRACE_MEMORY:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                # Le pic du parent inclut ce qu'il a alloué avant ce span
+                stack[-1].peak = max(stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            self._base = current
+        stack.append(self)
+        self._written = _bytes_written()
+        self._files = None if self.outputs is None else _file_states(self.outputs)
+        self._wall = time.time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _open_threads
+        duration = time.perf_counter() - self._start
+        written = _bytes_written()
+        stack = _local.stack
+        stack.pop()
+        with _lock:
+            # Un autre thread a ouvert un span pendant celui-ci: pic partagé
+            concurrent = self._concurrent or _overlaps != self._overlaps
+            if not stack:
+                _open_threads -= 1
+        record = {
+            'span': self.name,
+            'parent': self.parent,
+            'start': round(self._wall, 6),
+            'duration_s': round(duration, 6),
+            'rows': self.rows,
+            'peak_alloc_bytes': None,
+            'output_bytes': None if self.outputs is None else _files_written(
+                self._files, _file_states(self.outputs)),
+            'process_write_bytes': None if written is None else written - self._written,
+            'pid': os.getpid(),
+            'thread': threading.current_thread().name
+        }
+        if TRACE_MEMORY:
+            import tracemalloc
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            if concurrent:
+                record['concurrent'] = True
+            else:
+                record['peak_alloc_bytes'] = max(self.peak - self._base, 0)
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, self.peak)
+        if exc_type is not None:
+            record['error'] = f"{exc_type.__name__}: {exc}"
+        record.update(self.fields)
+        _write(record)
+        return False
+
+class _NoSpan:
+    """Span inactif (MSSP_TRACE absent)"""
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NO_SPAN = _NoSpan()
+
+def span(name, outputs=None, **fields):
+    """Contexte de mesure d'un bloc; `with span('étape', outputs=[...]) as s: s.rows = n`"""
+    return Span(name, outputs, **fields) if ENABLED else _NO_SPAN
+
+def traced(func=None, name=None):
+    """Décorateur: un span par appel (fonction inchangée si les traces sont désactivées)"""
+    if func is None:
+        return functools.partial(traced, name=name)
+    if not ENABLED:
+        return func
+    label = name or func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with Span(label) as current:
+            result = func(*args, **kwargs)
+            current.rows = _count_rows(result, args)
+            return result
+    return wrapper
+
+def trace_methods(cls=None, include=()):
+    """Décorateur de classe: trace toutes les méthodes publiques (+ `include`).
+    Les staticmethod/classmethod ne sont pas tracées (descripteurs laissés intacts)."""
+    if cls is None:
+        return functools.partial(trace_methods, include=include)
+    if not ENABLED:
+        return cls
+    for attr, value in list(vars(cls).items()):
+        if isinstance(value, (staticmethod, classmethod)):
+            continue
+        if callable(value) and (not attr.startswith('_') or attr in include):
+            setattr(cls, attr, traced(value, name=f'{cls.__name__}.{attr}'))
+    return cls
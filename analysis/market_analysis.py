@@ -1,59 +1,237 @@
+import argparse
+import hashlib
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import sys
 import warnings
+from instrumentation import trace_methods
+from market_model import DERIVED_METRICS, HYPOTHESES, RANKING_WEIGHTS, _attractiveness
+from startup_profile import check_startup
+from data_store import (DATA_DIR, SOURCE_TABLES, load_table, read_table, write_table, prune_tables, export_csv,
+                        index_by_country, category_lookup, memory_report)
+from competitor_index import CompetitorIndex
+from entry_planner import PLAN_DEFAULTS, plan_entry, print_plan
+from powerbi_export import EXPORT_FORMATS, IncrementalExporter, print_delta
+from revenue_cube import REFERENCE_YEAR, RevenueCube
+from run_store import RunStore
+from trendlines import TRENDLINE_TABLE, trendline_fit
+from views import CountryViews
 warnings.filterwarnings('ignore')
 
-# Configuration de style
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
+# Distributions par défaut du mode simulation: (loi, paramètres...)
+SIMULATION_DISTRIBUTIONS = {
+    'arpu_bank': ('triangular', 35000, 50000, 70000),
+    'arpu_insurance': ('triangular', 20000, 30000, 45000),
+    'arpu_sme': ('triangular', 3000, 5000, 8000),
+    'sme_addressable': ('uniform', 0.01, 0.03),
+    'sam_ratio': ('uniform', 0.3, 0.5),
+    'som_ratio': ('uniform', 0.10, 0.20),
+    'it_share_gdp': ('triangular', 0.018, 0.025, 0.032),
+    'cyber_share_it': ('triangular', 0.02, 0.03, 0.045)
+}
 
-class MSSPMarketAnalysis:
+# Score de maturité réglementaire
+MATURITY_SCORE = {'High': 10, 'Medium': 7, 'Low': 4, 'Basic': 4, 'Developing': 7, 'Advanced': 10}
+
+# Lignes détaillées au plus dans les rapports texte (panels régionaux: milliers de lignes)
+REPORT_MAX_ROWS = 20
+
+def _formulas_fingerprint():
+    """Empreinte des formules: un snapshot n'est réutilisable qu'avec les mêmes"""
+    parts = [
+        (name, inputs, func.__code__.co_code, func.__code__.co_consts)
+        for name, inputs, func in DERIVED_METRICS
+    ]
+    parts.append(sorted(HYPOTHESES.items()))
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:12]
+
+def _sample(rng, spec, size):
+    """Tire `size` valeurs selon une spécification (loi, paramètres...)"""
+    kind, *params = spec
+    if kind == 'fixed':
+        return np.full(size, float(params[0]))
+    if kind == 'uniform':
+        return rng.uniform(params[0], params[1], size)
+    if kind == 'triangular':
+        return rng.triangular(params[0], params[1], params[2], size)
+    if kind == 'normal':
+        return rng.normal(params[0], params[1], size)
+    if kind == 'lognormal':
+        return rng.lognormal(params[0], params[1], size)
+    raise ValueError(f"Loi inconnue: {kind}")
+
+def _widen_histograms(histograms, lows, widths, low, high):
+    """Élargit des histogrammes (pays × bins) pour couvrir [low, high] sans perte.
+
+    La nouvelle largeur est un multiple entier de l'ancienne et les bornes restent
+    alignées: chaque ancien bin tombe entièrement dans un nouveau (rebinning exact).
+    """
+    n_countries, bins = histograms.shape
+    top = lows + bins * widths
+    span = np.maximum(high, top) - np.minimum(low, lows)
+    below = np.maximum(lows - low, 0)
+    above = np.maximum(high - top, 0)
+    # Marge de 50% de la plage du côté dépassé: moins d'élargissements aux lots suivants
+    shift = np.ceil((below + (below > 0) * span * 0.5) / widths).astype(np.int64)
+    extra = np.ceil((above + (above > 0) * span * 0.5) / widths).astype(np.int64)
+    factor = -(-(shift + bins + extra) // bins)
+    
+    new_index = (np.arange(bins)[None, :] + shift[:, None]) // factor[:, None]
+    offsets = np.arange(n_countries)[:, None] * bins
+    widened = np.bincount((new_index + offsets).ravel(), weights=histograms.ravel(),
+                          minlength=n_countries * bins)
+    return (widened.reshape(n_countries, bins).astype(np.int64),
+            lows - shift * widths, widths * factor)
+
+def weight_grid(step=5, total=100):
+    """Toutes les combinaisons de poids (marché, croissance, maturité, connectivité)
+    multiples de `step` dont la somme vaut `total`"""
+    values = np.arange(0, total + step, step)
+    a, b, c = np.meshgrid(values, values, values, indexing='ij')
+    d = total - a - b - c
+    keep = d >= 0
+    return np.column_stack([a[keep], b[keep], c[keep], d[keep]]).astype(float)
+
+@trace_methods(include=('__init__', '_calculate_derived_metrics'))
+class MSSPMarketAnalysis(CountryViews):
     """Analyse complète du marché MSSP en Afrique Francophone"""
     
-    def __init__(self):
-        """Initialise l'analyse avec chargement des données"""
+    def __init__(self, incremental=False, market_data=None, regulations=None, competitors=None,
+                 workers=None):
+        """Initialise l'analyse avec chargement des données (ou tables fournies).
+
+        `workers`: calcul partitionné par pays sur ce nombre de processus (sharded.py).
+        """
         print("  Chargement des données...")
-        self.market_data = pd.read_csv('../data/market_data.csv')
-        self.regulations = pd.read_csv('../data/regulations.csv')
-        self.competitors = pd.read_csv('../data/competitors.csv')
+        self.market_data = load_table('market_data') if market_data is None else market_data.copy()
+        self.regulations = load_table('regulations') if regulations is None else regulations
+        self.competitors = load_table('competitors') if competitors is None else competitors
+        self.workers = workers
+        self._sharded = None
         
         # Calculs dérivés
-        self._calculate_derived_metrics()
+        self._calculate_derived_metrics(incremental)
         print("   Données chargées avec succès!\n")
     
-    def _calculate_derived_metrics(self):
+    def _calculate_derived_metrics(self, incremental=False):
         """Calcule les métriques dérivées importantes"""
-        # TAM (Total Addressable Market)
-        self.market_data['TAM_M_USD'] = (
-            self.market_data['Banks_Count'] * 50000 +  # 50k USD/an par banque
-            self.market_data['Insurance_Companies'] * 30000 +  # 30k USD/an par assurance
-            self.market_data['SMEs_Count'] * 0.02 * 5000  # 2% des PME × 5k USD/an
-        ) / 1000000  # Conversion en millions
-        
-        # SAM (Serviceable Addressable Market) - 40% du TAM
-        self.market_data['SAM_M_USD'] = self.market_data['TAM_M_USD'] * 0.4
-        
-        # SOM (Serviceable Obtainable Market) - 15% du SAM
-        self.market_data['SOM_M_USD'] = self.market_data['SAM_M_USD'] * 0.15
-        
-        # Potential revenue per capita
-        self.market_data['Revenue_Per_Capita'] = (
-            self.market_data['Cybersecurity_Spending_M_USD'] / 
-            self.market_data['Population_M']
-        )
-        
-        # Growth potential score (0-100)
-        self.market_data['Growth_Score'] = (
-            (self.market_data['Internet_Penetration_Pct'] * 0.3) +
-            (self.market_data['Mobile_Penetration_Pct'] * 0.2) +
-            (self.market_data['Revenue_Per_Capita'] * 10) +
-            (self.market_data['Banks_Count'] * 0.5)
-        )
+        sharded = None
+        if incremental:
+            self._update_derived_metrics()
+        elif self.workers:
+            sharded = self._run_sharded()
+        else:
+            for name, inputs, func in DERIVED_METRICS:
+                self.market_data[name] = func(self.market_data)
+        
+        # Valeurs modifiées en place: les vues construites sur market_data sont périmées
+        self.invalidate('market_data')
+        if sharded is not None:
+            # Scores et segments valables tant que les tables et les poids sont inchangés
+            self._sharded = (self._token(('market_data', 'regulations')),
+                             tuple(RANKING_WEIGHTS.items())) + sharded
+    
+    def _run_sharded(self):
+        """Métriques dérivées, scores et comptages par segment calculés par partitions
+        de pays dans des processus (entrées et résultats en mémoire partagée)"""
+        from sharded import run_sharded  # import différé: processus et mémoire partagée
+        maturity = self._maturity_scores().reindex(self.market_data['Country'].astype(str)).values
+        results, segment_counts = run_sharded(self.market_data, maturity, self.workers)
+        for name, _, _ in DERIVED_METRICS:
+            self.market_data[name] = results[name].values
+        print(f"   Calcul partitionné: {len(self.market_data)} lignes, {self.workers} processus")
+        # Scores des lignes classées (pays avec réglementation), indexés par pays
+        ranked = ~np.isnan(maturity)
+        scores = pd.Series(results['Attractiveness_Score'].values[ranked],
+                           index=self.market_data['Country'].astype(str).values[ranked])
+        return scores, segment_counts
+    
+    def _sharded_result(self):
+        """(scores d'attractivité par pays, comptages par segment) du calcul partitionné, ou None
+        si les tables ou les poids ont changé depuis"""
+        if self._sharded is None:
+            return None
+        token, weights, scores, segment_counts = self._sharded
+        if token != self._token(('market_data', 'regulations')) or weights != tuple(RANKING_WEIGHTS.items()):
+            return None
+        return scores, segment_counts
+    
+    def _update_derived_metrics(self):
+        """Recalcule seulement les lignes/colonnes dont les entrées ont changé"""
+        derived_names = [name for name, _, _ in DERIVED_METRICS]
+        raw_inputs = sorted({
+            col for _, inputs, _ in DERIVED_METRICS for col in inputs
+            if col not in derived_names
+        })
+        snapshot_prefix = 'derived_snapshot_'
+        snapshot_name = f'{snapshot_prefix}{_formulas_fingerprint()}'
+        
+        # Empreinte de chaque entrée, ligne par ligne
+        hashes = {
+            col: pd.util.hash_pandas_object(self.market_data[col], index=False).values
+            for col in raw_inputs
+        }
+        
+        n_rows = len(self.market_data)
+        try:
+            snapshot = read_table(snapshot_name)
+        except FileNotFoundError:
+            snapshot = None
+        if snapshot is not None and 'Occurrence' not in snapshot.columns:
+            snapshot = None  # ancien format, clé = pays seul
+        
+        # Clé de ligne unique: pays + rang d'apparition (un pays peut avoir plusieurs lignes)
+        countries = self.market_data['Country'].astype(str).values
+        occurrence = pd.Series(countries).groupby(countries, sort=False).cumcount().values
+        
+        # Position de chaque ligne dans le snapshot précédent (-1 = nouvelle ligne)
+        if snapshot is None:
+            positions = np.full(n_rows, -1)
+        else:
+            previous_keys = pd.MultiIndex.from_arrays([snapshot['Country'].astype(str).values,
+                                                       snapshot['Occurrence'].values])
+            positions = previous_keys.get_indexer(pd.MultiIndex.from_arrays([countries, occurrence]))
+        known = positions >= 0
+        taken = np.where(known, positions, 0)
+        
+        dirty = {}
+        for col in raw_inputs:
+            if snapshot is None:
+                dirty[col] = np.ones(n_rows, dtype=bool)
+            else:
+                previous = snapshot[f'{col}__hash'].values[taken]
+                dirty[col] = ~known | (previous != hashes[col])
+        
+        recomputed = []
+        for name, inputs, func in DERIVED_METRICS:
+            mask = np.logical_or.reduce([dirty[col] for col in inputs])
+            dirty[name] = mask
+            
+            # Lignes intactes: reprises telles quelles du snapshot
+            values = np.full(n_rows, np.nan)
+            if snapshot is not None:
+                values[known] = snapshot[name].values[positions[known]]
+            self.market_data[name] = values
+            
+            if mask.any():
+                rows = self.market_data.loc[mask]
+                self.market_data.loc[mask, name] = func(rows).values
+                recomputed.append(name)
+        
+        changed_rows = int(np.logical_or.reduce([dirty[col] for col in raw_inputs]).sum())
+        print(f"   Recalcul incrémental: {changed_rows}/{n_rows} lignes, "
+              f"colonnes: {', '.join(recomputed) or 'aucune'}")
+        
+        # Nouveau snapshot: empreintes des entrées + résultats dérivés
+        snapshot = pd.DataFrame({'Country': self.market_data['Country'].values,
+                                 'Occurrence': occurrence.astype(np.int32)})
+        for col in raw_inputs:
+            snapshot[f'{col}__hash'] = hashes[col]
+        for name in derived_names:
+            snapshot[name] = self.market_data[name].values
+        write_table(snapshot_name, snapshot)
+        # Snapshots des anciennes formules: plus jamais relus
+        prune_tables(snapshot_prefix, keep=snapshot_name)
     
     def market_overview(self):
         """Affiche un aperçu général du marché"""
@@ -85,6 +263,15 @@ class MSSPMarketAnalysis:
         
         print("\n" + "=" * 70 + "\n")
     
+    def _segments(self):
+        """Potentiel par segment: tranche agrégée du cube de revenu (comptages réduits
+        entre partitions en mode partitionné)"""
+        sharded = self._sharded_result()
+        if sharded is not None:
+            counts = sharded[1][None, :, None]
+            return RevenueCube(['All'], [REFERENCE_YEAR], counts, HYPOTHESES).segment_table()
+        return self.revenue_cube().segment_table()
+    
     def segment_analysis(self):
         """Analyse par segment de clients"""
         print("=" * 70)
@@ -92,22 +279,7 @@ class MSSPMarketAnalysis:
         print("=" * 70)
         
         # Calcul du potentiel par segment
-        segments = pd.DataFrame({
-            'Segment': ['Banques', 'Assurances', 'PME'],
-            'Total_Clients': [
-                self.market_data['Banks_Count'].sum(),
-                self.market_data['Insurance_Companies'].sum(),
-                (self.market_data['SMEs_Count'].sum() * 0.02)  # 2% des PME adressables
-            ],
-            'ARPU_USD': [50000, 30000, 5000],  # Average Revenue Per User
-        })
-        
-        segments['Revenue_Potential_M_USD'] = (
-            segments['Total_Clients'] * segments['ARPU_USD'] / 1000000
-        )
-        segments['Market_Share_Pct'] = (
-            segments['Revenue_Potential_M_USD'] / segments['Revenue_Potential_M_USD'].sum() * 100
-        )
+        segments = self._segments().copy()
         
         print("\n  Potentiel par Segment:")
         for idx, row in segments.iterrows():
@@ -117,6 +289,13 @@ class MSSPMarketAnalysis:
             print(f"      • Revenu potentiel: ${row['Revenue_Potential_M_USD']:.1f}M")
             print(f"      • Part du marché: {row['Market_Share_Pct']:.1f}%")
         
+        # Agrégat par sous-région: lu dans le cube (pas de groupby)
+        regions = self.revenue_cube().region_table()
+        totals = regions.sum(axis=1).sort_values(ascending=False)
+        print("\n  Revenu potentiel par sous-région:")
+        for region, total in totals.head(REPORT_MAX_ROWS).items():
+            print(f"   • {region}: ${total:.1f}M")
+        
         print("\n   Recommandation Stratégique:")
         top_segment = segments.loc[segments['Revenue_Potential_M_USD'].idxmax(), 'Segment']
         print(f"   Prioriser le segment '{top_segment}' pour un déploiement initial.")
@@ -130,44 +309,53 @@ class MSSPMarketAnalysis:
         print("   PAYSAGE RÉGLEMENTAIRE")
         print("=" * 70)
         
-        # Merge avec données de marché
-        reg_analysis = self.market_data.merge(
-            self.regulations, 
-            on='Country'
-        )[['Country', 'Compliance_Maturity', 'Cybersecurity_Framework', 
+        # Vue market_data ⋈ regulations partagée
+        reg_analysis = self.market_regulations()[['Country', 'Compliance_Maturity', 'Cybersecurity_Framework', 
            'Penalties_Max_USD', 'SAM_M_USD']]
         
         print("\n   Maturité Réglementaire par Pays:")
-        for idx, row in reg_analysis.iterrows():
+        for idx, row in reg_analysis.head(REPORT_MAX_ROWS).iterrows():
             print(f"\n   {row['Country']}:")
             print(f"      • Maturité: {row['Compliance_Maturity']}")
             print(f"      • Framework: {row['Cybersecurity_Framework']}")
             print(f"      • Pénalités max: ${row['Penalties_Max_USD']:,.0f}")
             print(f"      • Potentiel marché: ${row['SAM_M_USD']:.1f}M")
+        if len(reg_analysis) > REPORT_MAX_ROWS:
+            print(f"\n   ... et {len(reg_analysis) - REPORT_MAX_ROWS} autres")
         
         print("\n   Insight Réglementaire:")
         high_maturity = reg_analysis[reg_analysis['Compliance_Maturity'] == 'High']['Country'].tolist()
-        print(f"   Marchés à haute maturité (meilleure sensibilisation): {', '.join(high_maturity)}")
+        shown = ', '.join(high_maturity[:REPORT_MAX_ROWS])
+        if len(high_maturity) > REPORT_MAX_ROWS:
+            shown += f" ... (+{len(high_maturity) - REPORT_MAX_ROWS})"
+        print(f"   Marchés à haute maturité (meilleure sensibilisation): {shown}")
         print("   → Clients plus enclins à investir dans la cybersécurité")
         
         print("\n" + "=" * 70 + "\n")
     
+    def competitor_index(self):
+        """Index des concurrents (filtres, top-k, concentration, white space), mis en cache"""
+        return self.memoized('competitor_index', ('competitors',),
+                             lambda: CompetitorIndex(self.competitors))
+    
     def competitive_analysis(self):
         """Analyse concurrentielle"""
         print("=" * 70)
         print("   ANALYSE CONCURRENTIELLE")
         print("=" * 70)
         
+        index = self.competitor_index()
         total_market_share = self.competitors['Market_Share_Pct'].sum()
-        market_concentration = self.competitors.nlargest(3, 'Market_Share_Pct')['Market_Share_Pct'].sum()
+        concentration = index.market_concentration()
         
         print(f"\n  Structure du Marché:")
         print(f"   • Part de marché couverte: {total_market_share:.0f}%")
-        print(f"   • Concentration (Top 3): {market_concentration:.0f}%")
+        print(f"   • Concentration (Top 3): {concentration['CR3']:.0f}%")
+        print(f"   • Concentration (Top 5): {concentration['CR5']:.0f}% | HHI: {concentration['HHI']:.0f}")
         print(f"   • Nombre d'acteurs: {len(self.competitors)}")
         
         print(f"\n Top 5 Concurrents:")
-        top_competitors = self.competitors.nlargest(5, 'Market_Share_Pct')
+        top_competitors = index.top_k(5)
         for idx, row in top_competitors.iterrows():
             print(f"   {idx+1}. {row['Company']} ({row['Country']})")
             print(f"      • Services: {row['Services']}")
@@ -180,39 +368,64 @@ class MSSPMarketAnalysis:
         print(f"   {uncovered_market:.0f}% du marché reste non couvert par les acteurs majeurs")
         print("   → Opportunité pour un nouvel entrant avec une proposition différenciée")
         
+        # Pays × service sans aucun acteur (acteurs régionaux comptés partout)
+        white_space = index.white_space(countries=self.market_data['Country'].astype(str).tolist())
+        if len(white_space):
+            print(f"\n   White space: {len(white_space)} couples pays × service sans concurrent, ex.:")
+            for _, row in white_space.head(5).iterrows():
+                print(f"   • {row['Country']} - {row['Services']}")
+        
         print("\n" + "=" * 70 + "\n")
     
+    def _ranking(self):
+        """Classement trié par score d'attractivité (étape pure, mise en cache)"""
+        def build():
+            # Créer un score composite (colonnes de market_data + maturité), copie de la
+            # sélection: la vue partagée n'est jamais modifiée
+            ranking = self.market_regulations()[list(self.market_data.columns) + ['Compliance_Maturity']].copy()
+            
+            # Système de scoring
+            ranking['Maturity_Score'] = category_lookup(ranking['Compliance_Maturity'], MATURITY_SCORE)
+            
+            # Score final (0-100), déjà calculé par partitions en mode partitionné
+            sharded = self._sharded_result()
+            scores = None if sharded is None else sharded[0]
+            if scores is not None and not scores.index.equals(ranking.index):
+                # Autre ordre: alignement par pays, si les libellés sont uniques et que les
+                # deux côtés classent les mêmes pays (maxima calculés sur ces lignes)
+                same_countries = (scores.index.isin(ranking.index).all()
+                                  and ranking.index.isin(scores.index).all())
+                scores = scores.reindex(ranking.index) if scores.index.is_unique and same_countries else None
+            if scores is not None:
+                ranking['Attractiveness_Score'] = scores.values
+            else:
+                ranking['Attractiveness_Score'] = _attractiveness(
+                    ranking, ranking['SAM_M_USD'].max(), ranking['Growth_Score'].max()
+                )
+            
+            return ranking.sort_values('Attractiveness_Score', ascending=False)
+        
+        return self.memoized('ranking', ('market_data', 'regulations'), build,
+                             extra=tuple(RANKING_WEIGHTS.items()))
+    
     def country_ranking(self):
         """Classement des pays par attractivité"""
         print("=" * 70)
         print("  CLASSEMENT DES PAYS PAR ATTRACTIVITÉ")
         print("=" * 70)
         
-        # Créer un score composite
-        ranking = self.market_data.copy()
-        ranking = ranking.merge(self.regulations[['Country', 'Compliance_Maturity']], on='Country')
-        
-        # Système de scoring
-        maturity_score = {'High': 10, 'Medium': 7, 'Low': 4, 'Basic': 4, 'Developing': 7, 'Advanced': 10}
-        ranking['Maturity_Score'] = ranking['Compliance_Maturity'].map(maturity_score)
-        
-        # Score final (0-100)
-        ranking['Attractiveness_Score'] = (
-            (ranking['SAM_M_USD'] / ranking['SAM_M_USD'].max() * 30) +  # 30% poids marché
-            (ranking['Growth_Score'] / ranking['Growth_Score'].max() * 30) +  # 30% poids croissance
-            (ranking['Maturity_Score'] / 10 * 20) +  # 20% poids maturité
-            (ranking['Internet_Penetration_Pct'] / 100 * 20)  # 20% poids connectivité
-        )
-        
-        ranking_sorted = ranking.sort_values('Attractiveness_Score', ascending=False)
+        # Score composite (mis en cache sur market_data, regulations et RANKING_WEIGHTS)
+        ranking_sorted = self._ranking().copy()
         
         print("\n Classement Final:")
-        for idx, (i, row) in enumerate(ranking_sorted.iterrows(), 1):
+        for idx, (i, row) in enumerate(ranking_sorted.head(REPORT_MAX_ROWS).iterrows(), 1):
             print(f"\n   {idx}. {row['Country']} - Score: {row['Attractiveness_Score']:.1f}/100")
             print(f"      • Marché potentiel (SAM): ${row['SAM_M_USD']:.1f}M")
             print(f"      • Maturité réglementaire: {row['Compliance_Maturity']}")
             print(f"      • Pénétration internet: {row['Internet_Penetration_Pct']:.1f}%")
             print(f"      • Banques: {row['Banks_Count']} | Assurances: {row['Insurance_Companies']}")
+        if len(ranking_sorted) > REPORT_MAX_ROWS:
+            print(f"\n   ... et {len(ranking_sorted) - REPORT_MAX_ROWS} autres (voir country_ranking)")
         
         print("\n   Recommandation de Déploiement:")
         top_3 = ranking_sorted.head(3)['Country'].tolist()
@@ -224,47 +437,341 @@ class MSSPMarketAnalysis:
         
         return ranking_sorted
     
-    def export_insights_to_csv(self, ranking_df):
-        """Export les insights pour Power BI"""
-        print("   Export des données pour Power BI...")
+    def entry_plan(self, budget_m_usd=PLAN_DEFAULTS['budget_m_usd'], capacity=PLAN_DEFAULTS['capacity'],
+                   phases=PLAN_DEFAULTS['phases'], min_maturity=PLAN_DEFAULTS['min_maturity']):
+        """Plan d'entrée optimal (SOM, capex, capacité SOC, maturité minimale)"""
+        print("=" * 70)
+        print("   PLAN D'ENTRÉE OPTIMISÉ")
+        print("=" * 70)
+        
+        plan = plan_entry(self._ranking(), budget_m_usd, capacity, phases, min_maturity)
+        print_plan(plan, budget_m_usd, capacity, phases)
+        
+        print("\n" + "=" * 70 + "\n")
         
-        # Export ranking
-        ranking_df.to_csv('../data/country_ranking.csv', index=False)
+        return plan
+    
+    def simulate(self, n_draws=1_000_000, distributions=None, batch_size=50_000,
+                 percentiles=(5, 50, 95), seed=None, bins=2048):
+        """Simulation Monte Carlo des hypothèses: intervalles de TAM/SAM/SOM et score"""
+        print("=" * 70)
+        print("   SIMULATION MONTE CARLO DES HYPOTHÈSES")
+        print("=" * 70)
         
-        # Export segment analysis
-        segments = self.segment_analysis()
-        segments.to_csv('../data/segment_analysis.csv', index=False)
+        specs = dict(SIMULATION_DISTRIBUTIONS)
+        specs.update(distributions or {})
+        rng = np.random.default_rng(seed)
+        
+        # Comme country_ranking: pays sans réglementation (maturité NaN) exclus avant
+        # les maxima de normalisation et les tirages
+        data = self.market_data
+        maturity = self._maturity_scores().reindex(data['Country'].astype(str)).values
+        keep = ~np.isnan(maturity)
+        if not keep.any():
+            raise ValueError("Aucun pays classé (réglementation manquante pour tous les pays)")
+        data, maturity = data[keep], maturity[keep]
+        
+        # Entrées par pays (vecteurs de taille N, diffusés contre les tirages)
+        countries = data['Country'].astype(str).tolist()
+        banks = data['Banks_Count'].values.astype(float)
+        insurance = data['Insurance_Companies'].values.astype(float)
+        smes = data['SMEs_Count'].values.astype(float)
+        gdp = data['GDP_B_USD'].values.astype(float)
+        population = data['Population_M'].values.astype(float)
+        internet = data['Internet_Penetration_Pct'].values.astype(float)
+        mobile = data['Mobile_Penetration_Pct'].values.astype(float)
+        
+        def evaluate(size):
+            """Métriques (tirages × pays) pour un lot de tirages"""
+            p = {name: _sample(rng, spec, size)[:, None] for name, spec in specs.items()}
+            tam = (banks * p['arpu_bank'] + insurance * p['arpu_insurance']
+                   + smes * p['sme_addressable'] * p['arpu_sme']) / 1000000
+            sam = tam * p['sam_ratio']
+            som = sam * p['som_ratio']
+            cyber = gdp * p['it_share_gdp'] * 1000 * p['cyber_share_it']
+            growth = internet * 0.3 + mobile * 0.2 + cyber / population * 10 + banks * 0.5
+            score = (
+                sam / sam.max(axis=1, keepdims=True) * RANKING_WEIGHTS['market'] +
+                growth / growth.max(axis=1, keepdims=True) * RANKING_WEIGHTS['growth'] +
+                maturity / 10 * RANKING_WEIGHTS['maturity'] +
+                internet / 100 * RANKING_WEIGHTS['connectivity']
+            )
+            return {'TAM_M_USD': tam, 'SAM_M_USD': sam, 'SOM_M_USD': som,
+                    'Attractiveness_Score': score}
+        
+        n_countries = len(countries)
+        offsets = np.arange(n_countries) * bins
+        histograms, sums, lows, widths, widened = {}, {}, {}, {}, {}
+        
+        done = 0
+        while done < n_draws:
+            size = min(batch_size, n_draws - done)
+            metrics = evaluate(size)
+            
+            for name, values in metrics.items():
+                if name not in histograms:
+                    # Le premier lot fixe la plage des histogrammes (élargie de 50%)
+                    low, high = values.min(axis=0), values.max(axis=0)
+                    margin = (high - low) * 0.5
+                    lows[name] = low - margin
+                    widths[name] = np.maximum((high - low + 2 * margin) / bins,
+                                              np.abs(low) * 1e-12 + 1e-12)
+                    histograms[name] = np.zeros((n_countries, bins), dtype=np.int64)
+                    sums[name] = np.zeros(n_countries)
+                    widened[name] = 0
+                
+                # Tirages hors plage (queues lourdes): élargissement au lieu d'écrêter
+                low, high = values.min(axis=0), values.max(axis=0)
+                if ((low < lows[name]) | (high >= lows[name] + bins * widths[name])).any():
+                    histograms[name], lows[name], widths[name] = _widen_histograms(
+                        histograms[name], lows[name], widths[name], low, high)
+                    widened[name] += 1
+                
+                # Histogramme par pays en une seule passe (bincount sur index aplati)
+                index = ((values - lows[name]) / widths[name]).astype(np.int64)
+                np.clip(index, 0, bins - 1, out=index)  # arrondi flottant au bord
+                histograms[name] += np.bincount((index + offsets).ravel(),
+                                                minlength=n_countries * bins).reshape(n_countries, bins)
+                sums[name] += values.sum(axis=0)
+            done += size
+        
+        # Percentiles par interpolation dans l'histogramme cumulé
+        rows = []
+        for name, histogram in histograms.items():
+            cdf = np.cumsum(histogram, axis=1) / n_draws
+            for i, country in enumerate(countries):
+                row = {'Country': country, 'Metric': name, 'Mean': sums[name][i] / n_draws}
+                for q in percentiles:
+                    k = int(np.searchsorted(cdf[i], q / 100))
+                    before = cdf[i][k - 1] if k > 0 else 0.0
+                    inside = (q / 100 - before) / max(cdf[i][k] - before, 1e-12)
+                    row[f'P{q}'] = lows[name][i] + (k + inside) * widths[name][i]
+                rows.append(row)
+        results = pd.DataFrame(rows)
+        
+        low_q, high_q = f'P{min(percentiles)}', f'P{max(percentiles)}'
+        print(f"\n   {n_draws:,} tirages × {n_countries} pays (lots de {batch_size:,})")
+        if not keep.all():
+            print(f"   • {int((~keep).sum())} pays sans réglementation exclus (hors classement)")
+        for name, count in widened.items():
+            if count:
+                print(f"   • {name}: plage des histogrammes élargie {count} fois "
+                      f"(tirages hors de la plage du premier lot)")
+        print(f"\n   SOM par pays (M USD, intervalle {low_q}-{high_q}):")
+        for _, row in results[results['Metric'] == 'SOM_M_USD'].iterrows():
+            print(f"   • {row['Country']}: {row['Mean']:.2f} [{row[low_q]:.2f} - {row[high_q]:.2f}]")
         
-        print("   Fichiers exportés dans /data/")
-        print("   • country_ranking.csv")
-        print("   • segment_analysis.csv\n")
+        print("\n" + "=" * 70 + "\n")
+        
+        return results
+    
+    def _maturity_scores(self):
+        """Score de maturité par pays (codes de catégorie -> tableau de scores), mis en cache"""
+        def build():
+            regulations = index_by_country(self.regulations)
+            scores = category_lookup(regulations['Compliance_Maturity'], MATURITY_SCORE)
+            return pd.Series(scores.astype(float), index=regulations.index)
+        
+        return self.memoized('maturity_scores', ('regulations',), build)
+    
+    def _ranking_components(self):
+        """Composantes normalisées du score (pays × [marché, croissance, maturité, connectivité])"""
+        data = self.market_data
+        countries = data['Country'].astype(str)
+        maturity = self._maturity_scores().reindex(countries).values
+        # Comme la jointure de country_ranking: pays sans réglementation exclus avant
+        # de calculer les maxima de normalisation
+        keep = ~np.isnan(maturity)
+        sam = data['SAM_M_USD'].values[keep]
+        growth = data['Growth_Score'].values[keep]
+        components = np.column_stack([
+            sam / sam.max(),
+            growth / growth.max(),
+            maturity[keep] / 10,
+            data['Internet_Penetration_Pct'].values[keep] / 100
+        ])
+        return countries.values[keep], components
+    
+    def ranking_scenarios(self, weights, top_n=3, batch_size=100_000):
+        """Classements pour une matrice de poids (scénarios × 4) en une passe vectorisée"""
+        print("=" * 70)
+        print("   STABILITÉ DU CLASSEMENT SELON LES POIDS")
+        print("=" * 70)
+        
+        if isinstance(weights, pd.DataFrame):
+            weights = weights[list(RANKING_WEIGHTS)].values
+        weights = np.atleast_2d(np.asarray(weights, dtype=float))
+        
+        countries, components = self._ranking_components()
+        n_scenarios, n_countries = len(weights), len(countries)
+        top_n = min(top_n, n_countries)
+        
+        # position_counts[i, j] = nombre de scénarios où le pays i est classé j+1
+        position_counts = np.zeros((n_countries, n_countries), dtype=np.int64)
+        rank_sum = np.zeros(n_countries)
+        rank_sq_sum = np.zeros(n_countries)
+        orders = {}
+        
+        for start in range(0, n_scenarios, batch_size):
+            scores = weights[start:start + batch_size] @ components.T  # scénarios × pays
+            order = np.argsort(-scores, axis=1, kind='stable')
+            ranks = np.empty_like(order)
+            np.put_along_axis(ranks, order, np.arange(1, n_countries + 1)[None, :], axis=1)
+            
+            position_counts += np.bincount(
+                (np.arange(n_countries)[None, :] * n_countries + ranks - 1).ravel(),
+                minlength=n_countries * n_countries
+            ).reshape(n_countries, n_countries)
+            rank_sum += ranks.sum(axis=0)
+            rank_sq_sum += (ranks.astype(float) ** 2).sum(axis=0)
+            
+            # Ordres de déploiement (Phase 1, 2, 3...) distincts et leur fréquence
+            sequences, counts = np.unique(order[:, :top_n], axis=0, return_counts=True)
+            for sequence, count in zip(map(tuple, sequences), counts):
+                orders[sequence] = orders.get(sequence, 0) + int(count)
+        
+        mean_rank = rank_sum / n_scenarios
+        stability = pd.DataFrame({
+            'Country': countries,
+            'Mean_Rank': mean_rank,
+            'Rank_Std': np.sqrt(np.maximum(rank_sq_sum / n_scenarios - mean_rank ** 2, 0)),
+            'Best_Rank': (position_counts > 0).argmax(axis=1) + 1,
+            'Worst_Rank': n_countries - (position_counts[:, ::-1] > 0).argmax(axis=1),
+            'Top1_Pct': position_counts[:, 0] / n_scenarios * 100,
+            f'Top{top_n}_Pct': position_counts[:, :top_n].sum(axis=1) / n_scenarios * 100
+        })
+        for phase in range(top_n):
+            stability[f'Phase{phase + 1}_Pct'] = position_counts[:, phase] / n_scenarios * 100
+        stability = stability.sort_values('Mean_Rank').reset_index(drop=True)
+        
+        phase_orders = pd.DataFrame(
+            [[countries[i] for i in sequence] + [count / n_scenarios * 100]
+             for sequence, count in sorted(orders.items(), key=lambda item: -item[1])],
+            columns=[f'Phase{phase + 1}' for phase in range(top_n)] + ['Scenarios_Pct']
+        )
+        
+        print(f"\n   {n_scenarios:,} scénarios de poids évalués")
+        print(f"\n   Fréquence dans le Top {top_n}:")
+        for _, row in stability.iterrows():
+            print(f"   • {row['Country']}: {row[f'Top{top_n}_Pct']:.1f}% "
+                  f"(rang moyen {row['Mean_Rank']:.2f} ± {row['Rank_Std']:.2f})")
+        
+        print("\n   Ordres de déploiement les plus fréquents:")
+        for _, row in phase_orders.head(3).iterrows():
+            sequence = ' → '.join(row[f'Phase{phase + 1}'] for phase in range(top_n))
+            print(f"   • {sequence}: {row['Scenarios_Pct']:.1f}%")
+        
+        print("\n" + "=" * 70 + "\n")
+        
+        return stability, phase_orders
+    
+    def export_insights_to_csv(self, ranking_df, powerbi_csv=True, incremental_format=None):
+        """Export les insights (store Arrow + CSV optionnels pour Power BI, ou export
+        incrémental partitionné si `incremental_format` est donné)"""
+        print("   Export des données...")
+        
+        # Segments déjà calculés (et affichés) par segment_analysis: pas de recalcul
+        segments = self._segments()
+        
+        # Droite de tendance internet vs dépenses cyber (table trendline_fit du store)
+        trendline = trendline_fit(self.market_data)
+        
+        # Format d'échange: store Arrow relu par visualization.py
+        write_table('country_ranking', ranking_df)
+        write_table('segment_analysis', segments)
+        print("   Tables écrites dans /data/store/")
+        
+        # Historique: snapshot binaire du run (data/runs/), relu par run_store.py
+        # (un échec d'archivage n'interrompt pas l'export)
+        try:
+            run_id = RunStore().append(ranking_df, segments)
+            print(f"   Run {run_id} archivé dans /data/runs/")
+        except (OSError, ValueError) as exc:
+            print(f"   Run non archivé: {exc}")
+        
+        if powerbi_csv:
+            export_csv(ranking_df, 'country_ranking')
+            export_csv(segments, 'segment_analysis')
+            export_csv(trendline.drop(columns='Fingerprint'), TRENDLINE_TABLE)
+            print("   Fichiers Power BI exportés dans /data/")
+            print("   • country_ranking.csv")
+            print("   • segment_analysis.csv")
+            print(f"   • {TRENDLINE_TABLE}.csv")
+        if incremental_format:
+            # Seules les lignes modifiées depuis le dernier export (data/powerbi/)
+            exporter = IncrementalExporter(fmt=incremental_format)
+            print_delta(exporter.export({'country_ranking': ranking_df, 'segment_analysis': segments}))
+        print()
+
+def parse_args(argv=None):
+    """Options de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Analyse de marché MSSP - Afrique Francophone")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="Affiche le temps d'import par module puis quitte")
+    parser.add_argument('--startup-budget-ms', type=float, default=None,
+                        help="Avec --profile-startup: échoue si l'import dépasse ce budget")
+    parser.add_argument('--pause', action='store_true',
+                        help="Attend Entrée entre les étapes (mode présentation)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Recalcule seulement les métriques dont les entrées ont changé")
+    parser.add_argument('--incremental-export', choices=list(EXPORT_FORMATS), default=None,
+                        help="Export Power BI incrémental partitionné (lignes modifiées seulement)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Calcul partitionné par pays sur N processus (mémoire partagée)")
+    parser.add_argument('--memory-report', action='store_true',
+                        help="Affiche la mémoire des tables avant/après schéma typé puis quitte")
+    return parser.parse_args(argv)
+
+def print_memory_report(frames):
+    """Affiche la mémoire des tables (inférence pandas par défaut -> schéma typé)"""
+    report = memory_report(frames)
+    print(f"\n   {'Table':<20} {'Lignes':>10} {'Avant (Ko)':>12} {'Après (Ko)':>12} {'Gain':>7}")
+    for _, row in report.iterrows():
+        print(f"   {row['Table']:<20} {row['Rows']:>10} {row['Before_Bytes'] / 1024:>12.1f} "
+              f"{row['After_Bytes'] / 1024:>12.1f} {row['Ratio']:>6.1f}x")
+    print()
+    return report
 
 def main():
     """Fonction principale"""
+    args = parse_args()
+    if args.profile_startup:
+        sys.exit(check_startup('market_analysis', args.startup_budget_ms))
+    if args.memory_report:
+        print_memory_report({name: pd.read_csv(f'{DATA_DIR}/{name}.csv') for name in SOURCE_TABLES})
+        return
+    
     print("\n" + "  " * 35)
     print("   ANALYSE DE MARCHÉ MSSP - AFRIQUE FRANCOPHONE")
     print("  " * 35 + "\n")
     
+    def pause():
+        if args.pause:
+            input("Appuyer sur Entrée pour continuer...")
+    
     # Initialiser l'analyse
-    analysis = MSSPMarketAnalysis()
+    analysis = MSSPMarketAnalysis(incremental=args.incremental, workers=args.workers)
     
     # Exécuter toutes les analyses
     analysis.market_overview()
-    input("Appuyer sur Entrée pour continuer...")
+    pause()
     
     analysis.segment_analysis()
-    input("Appuyer sur Entrée pour continuer...")
+    pause()
     
     analysis.regulatory_landscape()
-    input("Appuyer sur Entrée pour continuer...")
+    pause()
     
     analysis.competitive_analysis()
-    input("Appuyer sur Entrée pour continuer...")
+    pause()
     
     ranking = analysis.country_ranking()
+    pause()
+    
+    analysis.entry_plan()
     
     # Export pour Power BI
-    analysis.export_insights_to_csv(ranking)
+    analysis.export_insights_to_csv(ranking, incremental_format=args.incremental_export)
     
     print("   Analyse terminée avec succès!   \n")
     print("  Prochaine étape: Ouvrir Power BI et créer les visualisations")
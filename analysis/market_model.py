@@ -0,0 +1,68 @@
+"""Hypothèses et formules du modèle de marché, partagées par la construction des
+données, l'analyse (séquentielle ou partitionnée) et les graphiques (module sans
+dépendance: importable par chaque couche)"""
+
+# Hypothèses du modèle de marché (valeurs centrales)
+HYPOTHESES = {
+    'arpu_bank': 50000,        # USD/an par banque
+    'arpu_insurance': 30000,   # USD/an par assurance
+    'arpu_sme': 5000,          # USD/an par PME
+    'sme_addressable': 0.02,   # 2% des PME adressables
+    'sam_ratio': 0.4,          # SAM = 40% du TAM
+    'som_ratio': 0.15,         # SOM = 15% du SAM
+    'it_share_gdp': 0.025,     # Marché IT = 2.5% du PIB
+    'cyber_share_it': 0.03     # Dépenses cyber = 3% du marché IT
+}
+
+# Poids du score d'attractivité
+RANKING_WEIGHTS = {'market': 30, 'growth': 30, 'maturity': 20, 'connectivity': 20}
+
+def _tam(d):
+    """TAM (Total Addressable Market)"""
+    # Comptages stockés en int16: produits en flottant (un ARPU entier déborderait)
+    return (
+        d['Banks_Count'] * float(HYPOTHESES['arpu_bank']) +
+        d['Insurance_Companies'] * float(HYPOTHESES['arpu_insurance']) +
+        d['SMEs_Count'] * HYPOTHESES['sme_addressable'] * HYPOTHESES['arpu_sme']
+    ) / 1000000  # Conversion en millions
+
+def _sam(d):
+    """SAM (Serviceable Addressable Market) - 40% du TAM"""
+    return d['TAM_M_USD'] * HYPOTHESES['sam_ratio']
+
+def _som(d):
+    """SOM (Serviceable Obtainable Market) - 15% du SAM"""
+    return d['SAM_M_USD'] * HYPOTHESES['som_ratio']
+
+def _revenue_per_capita(d):
+    """Potential revenue per capita"""
+    return d['Cybersecurity_Spending_M_USD'] / d['Population_M']
+
+def _growth_score(d):
+    """Growth potential score (0-100)"""
+    return (
+        (d['Internet_Penetration_Pct'] * 0.3) +
+        (d['Mobile_Penetration_Pct'] * 0.2) +
+        (d['Revenue_Per_Capita'] * 10) +
+        (d['Banks_Count'] * 0.5)
+    )
+
+def _attractiveness(d, max_sam, max_growth):
+    """Score d'attractivité (0-100): maxima du classement fournis par l'appelant
+    (calculés sur toutes les lignes, ou réduits entre partitions)"""
+    return (
+        (d['SAM_M_USD'] / max_sam * RANKING_WEIGHTS['market']) +
+        (d['Growth_Score'] / max_growth * RANKING_WEIGHTS['growth']) +
+        (d['Maturity_Score'] / 10 * RANKING_WEIGHTS['maturity']) +
+        (d['Internet_Penetration_Pct'] / 100 * RANKING_WEIGHTS['connectivity'])
+    )
+
+# Métriques dérivées dans l'ordre de dépendance: (colonne, entrées, calcul)
+DERIVED_METRICS = [
+    ('TAM_M_USD', ['Banks_Count', 'Insurance_Companies', 'SMEs_Count'], _tam),
+    ('SAM_M_USD', ['TAM_M_USD'], _sam),
+    ('SOM_M_USD', ['SAM_M_USD'], _som),
+    ('Revenue_Per_Capita', ['Cybersecurity_Spending_M_USD', 'Population_M'], _revenue_per_capita),
+    ('Growth_Score', ['Internet_Penetration_Pct', 'Mobile_Penetration_Pct',
+                      'Revenue_Per_Capita', 'Banks_Count'], _growth_score),
+]
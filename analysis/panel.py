@@ -0,0 +1,230 @@
+import argparse
+import numpy as np
+import pandas as pd
+from country_registry import load_registry
+from data_store import read_table, write_table
+from extract_and_build import WORLD_BANK_INDICATORS, stream_world_bank_long
+from market_model import DERIVED_METRICS, HYPOTHESES
+
+INDICATORS = list(WORLD_BANK_INDICATORS.values())
+PANEL_METRICS = [name for name, _, _ in DERIVED_METRICS]
+
+def _forward_fill(values):
+    """Reporte la dernière valeur connue le long de l'axe des années (dernier axe)"""
+    valid = ~np.isnan(values)
+    index = np.where(valid, np.arange(values.shape[-1]), 0)
+    np.maximum.accumulate(index, axis=-1, out=index)
+    filled = np.take_along_axis(values, index, axis=-1)
+    # Avant la première valeur connue: reste manquant
+    filled[~np.maximum.accumulate(valid, axis=-1)] = np.nan
+    return filled
+
+def derive_metrics(raw, banks, insurance):
+    """Métriques dérivées pour un bloc (pays × années) en une passe vectorisée.
+
+    `raw` : dict indicateur -> tableau (pays × années) en unités Banque Mondiale;
+    `banks`, `insurance` : comptages par pays (diffusés sur les années).
+    """
+    population_m = raw['population'] / 1_000_000
+    gdp_b = raw['gdp'] / 1_000_000_000
+    data = {
+        'Population_M': population_m,
+        'GDP_B_USD': gdp_b,
+        'Cybersecurity_Spending_M_USD': (
+            gdp_b * HYPOTHESES['it_share_gdp'] * 1000 * HYPOTHESES['cyber_share_it']
+        ),
+        'SMEs_Count': np.floor(population_m * 4000),  # 4 PME / 1000 habitants
+        'Internet_Penetration_Pct': raw['internet'],
+        'Mobile_Penetration_Pct': raw['mobile'],
+        'Banks_Count': banks[:, None],
+        'Insurance_Companies': insurance[:, None]
+    }
+    for name, _, func in DERIVED_METRICS:
+        data[name] = func(data)
+    return {name: data[name] for name in PANEL_METRICS}
+
+class MarketPanel:
+    """Panel (pays × année): indicateurs, TAM/SAM/SOM/Growth_Score par année et projections CAGR"""
+
+    def __init__(self, countries, years, raw, banks, insurance, fill_forward=True):
+        self.countries = pd.Index(countries, name='Country')
+        self.years = np.asarray(years, dtype=np.int16)
+        self.raw = raw  # indicateur -> (pays × années)
+        self.banks = np.asarray(banks, dtype=float)
+        self.insurance = np.asarray(insurance, dtype=float)
+        self.fill_forward = fill_forward
+        self.metrics = derive_metrics(self._inputs(self.raw), self.banks, self.insurance)
+
+    def _inputs(self, raw):
+        # Ex.: pénétration internet publiée avec un an de retard -> dernière valeur connue
+        return {k: _forward_fill(v) for k, v in raw.items()} if self.fill_forward else raw
+
+    @staticmethod
+    def _to_arrays(long, countries, years):
+        """Tableau long (Country, Indicator, Year, Value) -> indicateur -> (pays × années)"""
+        country_pos = countries.get_indexer(long['Country'].astype(str))
+        year_pos = pd.Index(years).get_indexer(long['Year'].astype(int))
+        indicator = long['Indicator'].astype(str).values
+        keep = (country_pos >= 0) & (year_pos >= 0)
+
+        raw = {}
+        for key in INDICATORS:
+            values = np.full((len(countries), len(years)), np.nan)
+            mask = keep & (indicator == key)
+            values[country_pos[mask], year_pos[mask]] = long['Value'].values[mask]
+            raw[key] = values
+        return raw
+
+    @classmethod
+    def from_long(cls, long, registry=None, fill_forward=True):
+        """Construit le panel à partir du tableau long de stream_world_bank_long"""
+        if registry is None:
+            registry = load_registry()
+        countries = pd.Index(sorted(long['Country'].astype(str).unique()), name='Country')
+        counts = registry.reindex(countries)
+        years = np.arange(int(long['Year'].min()), int(long['Year'].max()) + 1)
+        raw = cls._to_arrays(long, countries, years)
+        return cls(countries, years, raw,
+                   counts['Banks_Count'].astype('float64').values,
+                   counts['Insurance_Companies'].astype('float64').values,
+                   fill_forward)
+
+    @classmethod
+    def from_export(cls, path, years=None, registry=None, fill_forward=True, chunksize=50_000):
+        """Lit toutes les années d'un export Banque Mondiale (CSV ou ZIP) en streaming"""
+        long = stream_world_bank_long(path, years=years, chunksize=chunksize)
+        return cls.from_long(long, registry, fill_forward)
+
+    def add_year(self, long):
+        """Ajoute une nouvelle année: seule la tranche de cette année est calculée.
+
+        Les années manquantes entre la dernière année du panel et la nouvelle sont
+        ajoutées vides, comme le ferait une reconstruction complète (from_long).
+        """
+        year = int(long['Year'].max())
+        last = int(self.years[-1])
+        if year <= last:
+            raise ValueError(f"L'année {year} n'est pas postérieure à la dernière année du panel ({last})")
+        years = np.arange(last + 1, year + 1)
+        new_raw = self._to_arrays(long[long['Year'] > last], self.countries, years)
+
+        inputs = new_raw
+        if self.fill_forward:
+            # Dernière valeur connue sur tout l'historique (self.raw reste non rempli)
+            inputs = {}
+            for k, v in new_raw.items():
+                known = _forward_fill(self.raw[k])[:, -1:]
+                inputs[k] = _forward_fill(np.concatenate([known, v], axis=1))[:, 1:]
+        new_metrics = derive_metrics(inputs, self.banks, self.insurance)
+
+        self.years = np.append(self.years, years.astype(np.int16))
+        self.raw = {k: np.concatenate([self.raw[k], new_raw[k]], axis=1) for k in INDICATORS}
+        self.metrics = {k: np.concatenate([self.metrics[k], new_metrics[k]], axis=1)
+                        for k in PANEL_METRICS}
+        return self
+
+    def cagr(self, metric='TAM_M_USD', window=None):
+        """Taux de croissance annuel composé par pays entre la 1re et la dernière année connues"""
+        values = self.metrics[metric]
+        if window is not None:
+            values = values[:, -window:]
+        years = self.years[-values.shape[1]:].astype(float)
+        valid = ~np.isnan(values)
+
+        first = valid.argmax(axis=1)
+        last = values.shape[1] - 1 - valid[:, ::-1].argmax(axis=1)
+        rows = np.arange(len(values))
+        span = years[last] - years[first]
+        start, end = values[rows, first], values[rows, last]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = np.where((span > 0) & (start > 0) & valid.any(axis=1),
+                            (end / start) ** (1 / np.where(span > 0, span, 1)) - 1, np.nan)
+        return pd.Series(rate, index=self.countries, name=f'{metric}_CAGR')
+
+    def project(self, metric='TAM_M_USD', horizon=5, window=None):
+        """Projection CAGR sur `horizon` années après la dernière année du panel"""
+        rate = self.cagr(metric, window).values
+        values = self.metrics[metric]
+        valid = ~np.isnan(values)
+        last = values.shape[1] - 1 - valid[:, ::-1].argmax(axis=1)
+        base = values[np.arange(len(values)), last]
+        base_year = self.years[last].astype(int)
+
+        future = np.arange(int(self.years[-1]) + 1, int(self.years[-1]) + horizon + 1)
+        steps = future[None, :] - base_year[:, None]
+        projected = base[:, None] * (1 + rate[:, None]) ** steps
+        return pd.DataFrame(projected, index=self.countries, columns=future)
+
+    def to_frame(self):
+        """Tableau long (Country, Year, métriques) pour export / store"""
+        n_countries, n_years = len(self.countries), len(self.years)
+        frame = pd.DataFrame({
+            'Country': np.repeat(self.countries.values, n_years),
+            'Year': np.tile(self.years, n_countries)
+        })
+        for key in INDICATORS:
+            frame[key] = self.raw[key].ravel()
+        for name in PANEL_METRICS:
+            frame[name] = self.metrics[name].ravel()
+        frame['Banks_Count'] = np.repeat(self.banks, n_years)
+        frame['Insurance_Companies'] = np.repeat(self.insurance, n_years)
+        return frame
+
+    @classmethod
+    def from_frame(cls, frame, fill_forward=True):
+        """Recharge un panel sauvegardé (sans recalculer l'historique)"""
+        countries = pd.Index(pd.unique(frame['Country'].astype(str)), name='Country')
+        years = np.sort(pd.unique(frame['Year'])).astype(np.int16)
+        shape = (len(countries), len(years))
+        frame = frame.set_index([frame['Country'].astype(str), 'Year']).reindex(
+            pd.MultiIndex.from_product([countries, years])
+        )
+
+        panel = cls.__new__(cls)
+        panel.countries = countries
+        panel.years = years
+        panel.fill_forward = fill_forward
+        panel.raw = {k: frame[k].values.reshape(shape) for k in INDICATORS}
+        panel.metrics = {k: frame[k].values.reshape(shape) for k in PANEL_METRICS}
+        panel.banks = frame['Banks_Count'].values.reshape(shape)[:, 0].astype(float)
+        panel.insurance = frame['Insurance_Companies'].values.reshape(shape)[:, 0].astype(float)
+        return panel
+
+    def save(self, name='market_panel'):
+        write_table(name, self.to_frame())
+
+    @classmethod
+    def load(cls, name='market_panel', fill_forward=True):
+        return cls.from_frame(read_table(name), fill_forward)
+
+def main():
+    """Construit le panel multi-années depuis un export Banque Mondiale"""
+    parser = argparse.ArgumentParser(description="Panel pays × année et projections CAGR")
+    parser.add_argument('export', help="Export Banque Mondiale (CSV DataBank ou ZIP WDI)")
+    parser.add_argument('--horizon', type=int, default=5, help="Années de projection")
+    parser.add_argument('--add-year', type=int, default=None,
+                        help="Ajoute seulement cette année au panel sauvegardé")
+    args = parser.parse_args()
+
+    if args.add_year is not None:
+        print(f"\n   Ajout de l'année {args.add_year} au panel...")
+        long = stream_world_bank_long(args.export, years=[args.add_year])
+        panel = MarketPanel.load().add_year(long)
+    else:
+        print("\n   Construction du panel pays × année...")
+        panel = MarketPanel.from_export(args.export)
+    panel.save()
+    print(f"   {len(panel.countries)} pays × {len(panel.years)} années "
+          f"({panel.years[0]}-{panel.years[-1]})")
+
+    print("\n   Croissance et projection du TAM (M USD):")
+    projection = panel.project('TAM_M_USD', args.horizon)
+    rate = panel.cagr('TAM_M_USD')
+    for country in panel.countries:
+        print(f"   • {country}: CAGR {rate[country] * 100:.1f}% → "
+              f"{projection.columns[-1]}: ${projection.loc[country].iloc[-1]:.1f}M")
+    print()
+
+if __name__ == "__main__":
+    main()
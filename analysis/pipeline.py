@@ -0,0 +1,296 @@
+import argparse
+import io
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from instrumentation import span
+
+REPORTS_DIR = '../reports'
+SUMMARY_PATH = '../data/pipeline_summary.json'
+
+class Stage:
+    """Étape du pipeline: entrées/sorties fichiers explicites et dépendances"""
+
+    def __init__(self, name, func, inputs=(), outputs=(), after=()):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.after = list(after)
+
+class _StageOutput:
+    """Redirige print() vers le journal de l'étape exécutée par le thread courant"""
+
+    def __init__(self, default):
+        self.default = default
+        self.local = threading.local()
+
+    def write(self, text):
+        return (getattr(self.local, 'stream', None) or self.default).write(text)
+
+    def flush(self):
+        (getattr(self.local, 'stream', None) or self.default).flush()
+
+# --- Étapes -----------------------------------------------------------------
+
+def _build(ctx):
+    """Construit market_data.csv (sans question interactive)"""
+    from extract_and_build import create_market_data_with_real_data, extract_world_bank_data
+    world_bank_data = None
+    if ctx['world_bank_export']:
+        world_bank_data = extract_world_bank_data(ctx['world_bank_export'])
+    df = create_market_data_with_real_data(world_bank_data)
+    return {'rows': len(df)}
+
+def _analysis(ctx):
+    """Charge les données et calcule les métriques dérivées"""
+    from market_analysis import MSSPMarketAnalysis
+    ctx['analysis'] = MSSPMarketAnalysis(incremental=ctx['incremental'],
+                                         workers=ctx.get('shard_workers'))
+    return {'rows': len(ctx['analysis'].market_data)}
+
+def _report(method):
+    """Étape de rapport: exécute une méthode d'analyse, le texte va dans reports/"""
+    def run(ctx):
+        result = getattr(ctx['analysis'], method)()
+        return {'rows': len(result)} if result is not None else {}
+    run.__doc__ = f"Rapport {method}"
+    return run
+
+def _export(ctx):
+    """Classement des pays et export (store Arrow + CSV Power BI)"""
+    analysis = ctx['analysis']
+    ranking = analysis.country_ranking()
+    analysis.export_insights_to_csv(ranking, powerbi_csv=ctx['powerbi_csv'],
+                                    incremental_format=ctx.get('incremental_export'))
+    return {'rows': len(ranking)}
+
+def _visualization(ctx):
+    """Génère les graphiques HTML"""
+    from visualization import MSSPVisualizations
+    viz = MSSPVisualizations(ctx['output_mode'])
+    report = viz.generate_all_charts(workers=ctx['workers'])
+    return {
+        'charts': {
+            row['Chart']: {'status': row['Status'], 'seconds': round(row['Seconds'], 3)}
+            for _, row in report.iterrows()
+        }
+    }
+
+SOURCES = ['../data/market_data.csv', '../data/regulations.csv', '../data/competitors.csv']
+
+# Référentiel des pays: comptages banques/assurances (build), sous-régions et pays
+# parents des régions (segments, droites de tendance, partitions d'export, graphiques)
+REGISTRY = '../data/country_registry.csv'
+
+def default_stages(powerbi_csv=True, incremental_export=None, world_bank_export=None):
+    """DAG build → analyse → rapports/export → visualisation"""
+    charts = '../images/charts'
+    chart_files = [
+        'market_size_comparison.html', 'country_attractiveness.html',
+        'segment_revenue_potential.html', 'competitive_landscape.html',
+        'regulatory_maturity.html', 'internet_vs_spending.html', 'dashboard_overview.html'
+    ]
+    export_outputs = ['../data/store/country_ranking.arrow', '../data/store/segment_analysis.arrow',
+                      '../data/store/trendline_fit.arrow', '../data/runs/index.json']
+    if powerbi_csv:
+        export_outputs += ['../data/country_ranking.csv', '../data/segment_analysis.csv',
+                           '../data/trendline_fit.csv']
+    if incremental_export:
+        export_outputs += ['../data/powerbi/manifest.json']
+
+    # Hypothèses partagées (market_model.py): entrée de toutes les étapes de calcul
+    analysis_modules = ['market_analysis.py', 'market_model.py']
+    # Instantané versionné, ou nouvel export Banque Mondiale: market_data.csv périmé
+    world_bank = world_bank_export or '../data/world_bank_snapshot.csv'
+    build_inputs = ['extract_and_build.py', 'market_model.py', REGISTRY, world_bank]
+    stages = [
+        Stage('build', _build,
+              inputs=build_inputs, outputs=['../data/market_data.csv']),
+        # Étape en mémoire (sans sortie fichier): exécutée seulement si une suivante l'est
+        Stage('analysis', _analysis,
+              inputs=SOURCES + analysis_modules + [REGISTRY], after=['build'])
+    ]
+    report_modules = {'entry_plan': ['entry_planner.py'], 'segment_analysis': [REGISTRY]}
+    for method in ['market_overview', 'segment_analysis', 'regulatory_landscape', 'competitive_analysis',
+                   'entry_plan']:
+        stages.append(Stage(method, _report(method),
+                            inputs=SOURCES + analysis_modules + report_modules.get(method, []),
+                            outputs=[os.path.join(REPORTS_DIR, f'{method}.txt')],
+                            after=['analysis']))
+    stages += [
+        Stage('export', _export,
+              inputs=SOURCES + analysis_modules + [REGISTRY],
+              outputs=export_outputs + [os.path.join(REPORTS_DIR, 'export.txt')],
+              after=['analysis']),
+        Stage('visualization', _visualization,
+              inputs=SOURCES + export_outputs[:1] + ['visualization.py', 'market_model.py', REGISTRY],
+              outputs=[os.path.join(charts, f) for f in chart_files],
+              after=['export'])
+    ]
+    return stages
+
+# --- Exécution ----------------------------------------------------------------
+
+def _is_fresh(stage):
+    """Vrai si toutes les sorties existent et sont plus récentes que les entrées"""
+    if not stage.outputs or not all(os.path.exists(p) for p in stage.outputs):
+        return False
+    newest_input = max((os.path.getmtime(p) for p in stage.inputs if os.path.exists(p)), default=0)
+    return min(os.path.getmtime(p) for p in stage.outputs) >= newest_input
+
+def plan(stages, force=False):
+    """Étapes à exécuter: périmées, en aval d'une étape exécutée, ou requises par elles"""
+    by_name = {stage.name: stage for stage in stages}
+    to_run = set()
+
+    # Une étape périmée ou dont un amont sera ré-exécuté tourne (à travers les étapes
+    # en mémoire: build -> analysis -> rapports)
+    for stage in stages:
+        upstream_runs = any(d in to_run for d in stage.after)
+        if force or upstream_runs or (stage.outputs and not _is_fresh(stage)):
+            to_run.add(stage.name)
+
+    # Les étapes en mémoire sont exécutées si une étape aval en a besoin
+    for stage in reversed(stages):
+        if stage.name in to_run:
+            stack = list(stage.after)
+            while stack:
+                name = stack.pop()
+                if not by_name[name].outputs and name not in to_run:
+                    to_run.add(name)
+                    stack.extend(by_name[name].after)
+    return to_run
+
+def run_pipeline(stages=None, force=False, max_workers=4, **options):
+    """Exécute le DAG (étapes indépendantes en parallèle) et renvoie le résumé"""
+    stages = stages or default_stages(options.get('powerbi_csv', True),
+                                      options.get('incremental_export'),
+                                      options.get('world_bank_export'))
+    by_name = {stage.name: stage for stage in stages}
+    to_run = plan(stages, force)
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+
+    ctx = dict(options)
+    records = {
+        stage.name: {'stage': stage.name, 'status': 'pending' if stage.name in to_run else 'skipped',
+                     'seconds': 0.0, 'inputs': stage.inputs, 'outputs': stage.outputs}
+        for stage in stages
+    }
+
+    output = _StageOutput(sys.stdout)
+
+    def execute(stage):
+        buffer = io.StringIO()
+        output.local.stream = buffer
+        start = time.perf_counter()
+        try:
+            with span(f'stage.{stage.name}', outputs=stage.outputs):
+                details = stage.func(ctx) or {}
+            status, error = 'ok', None
+        except Exception:
+            details, status, error = {}, 'failed', traceback.format_exc()
+        finally:
+            output.local.stream = None
+        seconds = time.perf_counter() - start
+
+        # Un échec ne doit pas laisser un rapport « à jour » derrière lui
+        log_path = os.path.join(REPORTS_DIR, f'{stage.name}.txt')
+        if status != 'ok':
+            if os.path.exists(log_path):
+                os.remove(log_path)
+            log_path = os.path.join(REPORTS_DIR, f'{stage.name}.failed.txt')
+        with open(log_path, 'w', encoding='utf-8') as f:
+            f.write(buffer.getvalue())
+        return stage.name, status, seconds, details, error, log_path
+
+    started = datetime.now()
+    pending = [stage for stage in stages if stage.name in to_run]
+    done = {name for name, record in records.items() if record['status'] == 'skipped'}
+    failed = set()
+    running = {}
+
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while pending or running:
+                for stage in list(pending):
+                    if any(d in failed for d in stage.after):
+                        records[stage.name]['status'] = 'blocked'
+                        failed.add(stage.name)
+                        pending.remove(stage)
+                    elif all(d in done for d in stage.after):
+                        running[pool.submit(execute, stage)] = stage.name
+                        pending.remove(stage)
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    del running[future]
+                    name, status, seconds, details, error, log_path = future.result()
+                    records[name].update(status=status, seconds=round(seconds, 3),
+                                         log=log_path, **details)
+                    if error:
+                        records[name]['error'] = error
+                    (done if status == 'ok' else failed).add(name)
+    finally:
+        sys.stdout = output.default
+
+    finished_at = datetime.now()
+    return {
+        'started': started.isoformat(timespec='seconds'),
+        'finished': finished_at.isoformat(timespec='seconds'),
+        'seconds': round((finished_at - started).total_seconds(), 3),
+        'status': 'failed' if failed else 'ok',
+        'stages': [records[stage.name] for stage in stages]
+    }
+
+def main():
+    """Pipeline batch non interactif: build → analyse → export → visualisation"""
+    # Les chemins du projet sont relatifs au dossier analysis/
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    from powerbi_export import EXPORT_FORMATS
+
+    parser = argparse.ArgumentParser(description="Pipeline batch de l'étude de marché MSSP")
+    parser.add_argument('--force', action='store_true',
+                        help="Ré-exécute toutes les étapes même si leurs sorties sont à jour")
+    parser.add_argument('--world-bank-export', default=None,
+                        help="Export Banque Mondiale (CSV ou ZIP) pour l'étape build")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Recalcul incrémental des métriques dérivées")
+    parser.add_argument('--no-powerbi-csv', action='store_true',
+                        help="N'écrit pas les CSV Power BI (store Arrow seulement)")
+    parser.add_argument('--incremental-export', default=None, choices=list(EXPORT_FORMATS),
+                        help="Export Power BI incrémental partitionné (data/powerbi/)")
+    parser.add_argument('--output-mode', default='shared', help="Mode de sortie des graphiques")
+    parser.add_argument('--workers', type=int, default=None, help="Processus de rendu des graphiques")
+    parser.add_argument('--shard-workers', type=int, default=None,
+                        help="Processus du calcul partitionné par pays (étape analysis)")
+    parser.add_argument('--max-parallel', type=int, default=4, help="Étapes exécutées en parallèle")
+    parser.add_argument('--summary', default=SUMMARY_PATH, help="Fichier JSON du résumé")
+    args = parser.parse_args()
+
+    summary = run_pipeline(
+        force=args.force,
+        max_workers=args.max_parallel,
+        world_bank_export=args.world_bank_export,
+        incremental=args.incremental,
+        powerbi_csv=not args.no_powerbi_csv,
+        incremental_export=args.incremental_export,
+        output_mode=args.output_mode,
+        workers=args.workers,
+        shard_workers=args.shard_workers
+    )
+
+    with open(args.summary, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    print(json.dumps(summary, ensure_ascii=False))
+    sys.exit(0 if summary['status'] == 'ok' else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Exports Power BI incrémentaux: partitions en ajout seul + manifeste des deltas
+
+Au lieu de réécrire country_ranking.csv et segment_analysis.csv, chaque export
+n'écrit que les lignes nouvelles ou modifiées depuis l'export précédent:
+
+    ../data/powerbi/<table>/run_date=AAAA-MM-JJ/country=<pays>/part-<export>.<format>
+    ../data/powerbi/manifest.json   exports successifs: partitions écrites, inchangées,
+                                    lignes modifiées et clés supprimées
+
+Les régions infranationales sont regroupées dans la partition de leur pays parent
+(country_registry.parent_countries).
+Une actualisation incrémentale ne relit que les partitions listées dans le dernier
+delta. Formats: Parquet (zstd), CSV gzip ou CSV zstd (pyarrow, sans dépendance).
+"""
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from country_registry import PARENT_COLUMN, parent_countries
+
+EXPORT_DIR = '../data/powerbi'
+
+# Format -> (extension, codec)
+EXPORT_FORMATS = {
+    'parquet': ('.parquet', 'zstd'),
+    'csv.gz': ('.csv.gz', 'gzip'),
+    'csv.zst': ('.csv.zst', 'zstd')
+}
+
+# Clé de ligne et colonne de partition de chaque table (None: partition unique)
+EXPORT_TABLES = {
+    'country_ranking': {'key': 'Country', 'partition': 'Country'},
+    'segment_analysis': {'key': 'Segment', 'partition': None}
+}
+
+ALL_PARTITION = '_all'
+
+def partition_labels(df, column):
+    """Partition de chaque ligne: pays (pays parent pour les régions), ou partition unique"""
+    if column is None:
+        return np.full(len(df), ALL_PARTITION, dtype=object)
+    labels = df[column].astype(str).values
+    parents = parent_countries(labels, df.get(PARENT_COLUMN))
+    return np.where(pd.notna(parents), parents, labels)
+
+def row_hashes(df):
+    """Empreinte de chaque ligne (toutes colonnes, types compris)"""
+    return pd.util.hash_pandas_object(df, index=False).values
+
+def write_part(df, path, fmt):
+    """Écrit une partition (fichier temporaire puis renommage)"""
+    codec = EXPORT_FORMATS[fmt][1]
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp_path = path + '.tmp'
+    if fmt == 'parquet':
+        pq.write_table(table, tmp_path, compression=codec)
+    else:
+        with pa.CompressedOutputStream(tmp_path, codec) as sink:
+            pa_csv.write_csv(table, sink)
+    os.replace(tmp_path, path)
+
+class IncrementalExporter:
+    """Export incrémental partitionné (date du run × pays) avec état des empreintes"""
+
+    def __init__(self, export_dir=EXPORT_DIR, fmt='parquet'):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Format inconnu: {fmt} (choix: {list(EXPORT_FORMATS)})")
+        self.export_dir = export_dir
+        self.fmt = fmt
+        self.manifest_path = os.path.join(export_dir, 'manifest.json')
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.manifest = {'exports': []}
+
+    def _state_path(self, table):
+        return os.path.join(self.export_dir, '_state', f'{table}.parquet')
+
+    def _read_state(self, table):
+        """Clé, partition et empreinte de chaque ligne au dernier export"""
+        try:
+            return pd.read_parquet(self._state_path(table))
+        except (FileNotFoundError, OSError):
+            return pd.DataFrame({'Key': pd.Series(dtype=object), 'Partition': pd.Series(dtype=object),
+                                 'Row_Hash': pd.Series(dtype='uint64')})
+
+    def _export_table(self, name, df, export_id, run_date):
+        spec = EXPORT_TABLES[name]
+        keys = df[spec['key']].astype(str).values
+        partitions = partition_labels(df, spec['partition'])
+        hashes = row_hashes(df)
+        state = self._read_state(name)
+
+        # Lignes nouvelles ou modifiées: clé absente ou empreinte différente (une recherche)
+        positions = pd.Index(state['Key'].values).get_indexer(keys)
+        changed = positions < 0
+        changed[~changed] = state['Row_Hash'].values[positions[~changed]] != hashes[~changed]
+        seen = np.zeros(len(state), dtype=bool)
+        seen[positions[positions >= 0]] = True
+        deleted = state['Key'].values[~seen]
+
+        written = []
+        if changed.any():
+            extension = EXPORT_FORMATS[self.fmt][0]
+            codes, labels = pd.factorize(partitions[changed], sort=True)
+            rows = df[changed]
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+            for position, label in enumerate(labels):
+                directory = os.path.join(self.export_dir, name, f'run_date={run_date}',
+                                         f"country={str(label).replace(os.sep, '_')}")
+                os.makedirs(directory, exist_ok=True)
+                path = os.path.join(directory, f'part-{export_id:06d}{extension}')
+                part = rows.iloc[order[bounds[position]:bounds[position + 1]]]
+                write_part(part, path, self.fmt)
+                written.append({'partition': str(label), 'path': os.path.relpath(path, self.export_dir),
+                                'rows': len(part)})
+
+        # Partitions sans changement (ni ligne modifiée ni suppression): à ignorer
+        touched = {entry['partition'] for entry in written}
+        touched.update(state['Partition'].values[~seen])
+        unchanged = sorted(set(partitions) - touched)
+
+        new_state = pd.DataFrame({'Key': keys, 'Partition': partitions, 'Row_Hash': hashes})
+        return new_state, {
+            'rows': len(df),
+            'changed_rows': int(changed.sum()),
+            'deleted_keys': [str(key) for key in deleted],
+            'partitions_written': written,
+            'partitions_unchanged': unchanged
+        }
+
+    def export(self, tables, run_date=None):
+        """Exporte {nom: DataFrame}; renvoie le delta (ajouté au manifeste)"""
+        export_id = self.manifest['exports'][-1]['export_id'] + 1 if self.manifest['exports'] else 1
+        run_date = run_date or time.strftime('%Y-%m-%d')
+        delta = {
+            'export_id': export_id,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'run_date': run_date,
+            'format': self.fmt,
+            'tables': {}
+        }
+        states = {}
+        for name, df in tables.items():
+            states[name], delta['tables'][name] = self._export_table(name, df, export_id, run_date)
+
+        # Manifeste après les partitions: un export interrompu n'y figure pas
+        self.manifest['exports'].append(delta)
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=1, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+        # État en dernier: après une interruption, les lignes sont simplement réexportées
+        for name, state in states.items():
+            path = self._state_path(name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            state.to_parquet(path + '.tmp', index=False)
+            os.replace(path + '.tmp', path)
+        return delta
+
+def print_delta(delta):
+    """Résumé d'un export incrémental"""
+    print(f"   Export incrémental {delta['export_id']} ({delta['format']}, {delta['run_date']}):")
+    for name, table in delta['tables'].items():
+        print(f"   • {name}: {table['changed_rows']}/{table['rows']} lignes modifiées, "
+              f"{len(table['deleted_keys'])} supprimées, "
+              f"{len(table['partitions_written'])} partitions écrites, "
+              f"{len(table['partitions_unchanged'])} inchangées")
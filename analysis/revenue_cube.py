@@ -0,0 +1,183 @@
+"""Cube de revenu pays × segment × année (tableau NumPy dense, axes étiquetés)
+
+Une seule source pour l'analyse par segment et les graphiques: les clients
+adressables et le revenu potentiel de chaque cellule sont calculés en une
+diffusion (comptages × part adressable × ARPU des HYPOTHESES). Les agrégats
+par pays, segment, sous-région et année sont calculés une fois puis lus par index.
+"""
+import numpy as np
+import pandas as pd
+from country_registry import PARENT_COLUMN, load_registry, parent_countries
+
+# Segments clients: (nom, colonne de comptage, ARPU, part adressable)
+SEGMENTS = [
+    ('Banques', 'Banks_Count', 'arpu_bank', None),
+    ('Assurances', 'Insurance_Companies', 'arpu_insurance', None),
+    ('PME', 'SMEs_Count', 'arpu_sme', 'sme_addressable')
+]
+
+# Année des indicateurs de market_data (instantané Banque Mondiale 2024)
+REFERENCE_YEAR = 2024
+
+# Sous-région des pays absents du référentiel
+UNKNOWN_REGION = 'Inconnue'
+
+ROLLUPS = ('country', 'segment', 'region', 'year')
+
+def country_regions(countries, parents=None, registry=None):
+    """Sous-région de chaque pays (ou région infranationale, via son pays parent:
+    country_registry.parent_countries)"""
+    if registry is None:
+        registry = load_registry()
+    resolved = parent_countries(countries, parents, registry)
+    positions = pd.Index(registry.index.astype(str)).get_indexer(resolved)
+    subregions = np.append(registry['Subregion'].astype(str).values, UNKNOWN_REGION)
+    return subregions[positions]
+
+class RevenueCube:
+    """Comptages, clients adressables et revenu (M USD) sur les axes pays × segment × année"""
+
+    def __init__(self, countries, years, counts, hypotheses, regions=None, parents=None):
+        self.countries = pd.Index(countries, name='Country').astype(str)
+        self.segments = pd.Index([name for name, _, _, _ in SEGMENTS], name='Segment')
+        self.years = pd.Index(np.asarray(years, dtype=np.int64), name='Year')
+        self.counts = np.asarray(counts, dtype=float)  # (pays × segment × année)
+        if self.counts.shape != (len(self.countries), len(self.segments), len(self.years)):
+            raise ValueError(f"Dimensions du cube incohérentes: {self.counts.shape}")
+
+        self.hypotheses = hypotheses
+        self.addressable = np.array([1.0 if ratio is None else hypotheses[ratio]
+                                     for _, _, _, ratio in SEGMENTS])
+        self.arpu = np.array([hypotheses[arpu] for _, _, arpu, _ in SEGMENTS])
+
+        # Une diffusion pour tout le cube
+        self.clients = self.counts * self.addressable[None, :, None]
+        self.revenue = self.clients * self.arpu[None, :, None] / 1_000_000
+
+        self._regions = regions
+        self._parents = parents  # pays parent explicite (PARENT_COLUMN), pour les sous-régions
+        self._rollups = {}
+
+    @classmethod
+    def from_market_data(cls, market_data, hypotheses, year=REFERENCE_YEAR, regions=None):
+        """Cube d'une année à partir de market_data (une ligne par pays ou région)"""
+        counts = np.stack([market_data[column].values.astype(float)
+                           for _, column, _, _ in SEGMENTS], axis=1)
+        return cls(market_data['Country'].astype(str).values, [year], counts[:, :, None],
+                   hypotheses, regions, market_data.get(PARENT_COLUMN))
+
+    @classmethod
+    def from_panel(cls, panel, hypotheses, regions=None):
+        """Cube multi-années à partir d'un MarketPanel (PME suivant la population)"""
+        population_m = panel._inputs(panel.raw)['population'] / 1_000_000
+        per_year = {
+            'Banks_Count': np.broadcast_to(panel.banks[:, None], population_m.shape),
+            'Insurance_Companies': np.broadcast_to(panel.insurance[:, None], population_m.shape),
+            'SMEs_Count': np.floor(population_m * 4000)  # 4 PME / 1000 habitants
+        }
+        counts = np.stack([per_year[column] for _, column, _, _ in SEGMENTS], axis=1)
+        return cls(panel.countries, panel.years, counts, hypotheses, regions)
+
+    def _year(self, year):
+        return len(self.years) - 1 if year is None else self.years.get_loc(year)
+
+    def _grouped_counts(self, by):
+        """Comptages sommés par segment (segment × année) ou par sous-région
+        (sous-région × segment × année), calculés une fois"""
+        if by not in self._rollups:
+            counts = np.nan_to_num(self.counts)
+            if by == 'segment':
+                labels, values = self.segments, counts.sum(axis=0)
+            else:
+                if self._regions is None:
+                    self._regions = country_regions(self.countries, self._parents)
+                codes, labels = pd.factorize(np.asarray(self._regions), sort=True)
+                # Une somme pondérée (bincount) par colonne segment × année
+                flat = counts.reshape(len(counts), -1)
+                values = np.stack([np.bincount(codes, flat[:, k], len(labels))
+                                   for k in range(flat.shape[1])], axis=1)
+                values = values.reshape((len(labels),) + counts.shape[1:])
+                labels = pd.Index(labels, name='Region')
+            self._rollups[by] = (labels, values)
+        return self._rollups[by]
+
+    def _scale(self, counts, segment_axis):
+        """Comptages -> (clients, revenu M USD), dans l'ordre de calcul du cube"""
+        shape = [1] * counts.ndim
+        shape[segment_axis] = len(self.segments)
+        clients = counts * self.addressable.reshape(shape)
+        return clients, clients * self.arpu.reshape(shape) / 1_000_000
+
+    def rollup(self, by):
+        """Revenu potentiel (M USD) agrégé, calculé une fois: 'country' (pays × année),
+        'segment' (segment × année), 'region' (sous-région × segment × année), 'year'"""
+        if by not in ROLLUPS:
+            raise ValueError(f"Agrégat inconnu: {by} (choix: {ROLLUPS})")
+        key = ('revenue', by)
+        if key not in self._rollups:
+            if by == 'country':
+                labels, values = self.countries, np.nansum(self.revenue, axis=1)
+            elif by == 'region':
+                labels, counts = self._grouped_counts('region')
+                values = self._scale(counts, 1)[1]
+            else:
+                labels, counts = self._grouped_counts('segment')
+                values = self._scale(counts, 0)[1]
+                if by == 'year':
+                    labels, values = self.years, values.sum(axis=0)
+            self._rollups[key] = (labels, values)
+        return self._rollups[key]
+
+    def value(self, country=None, segment=None, region=None, year=None):
+        """Revenu potentiel (M USD) d'une cellule ou d'un agrégat, lu dans le cube
+        ou les agrégats en cache (dernière année par défaut)"""
+        y = self._year(year)
+        if country is not None:
+            position = self.countries.get_loc(country)
+            if segment is None:
+                return float(self.rollup('country')[1][position, y])
+            return float(self.revenue[position, self.segments.get_loc(segment), y])
+        if region is not None:
+            labels, values = self.rollup('region')
+            revenue = values[labels.get_loc(region), :, y]
+        elif segment is not None:
+            labels, values = self.rollup('segment')
+            revenue = values[:, y]
+        else:
+            return float(self.rollup('year')[1][y])
+        if segment is None:
+            return float(revenue.sum())
+        return float(revenue[self.segments.get_loc(segment)])
+
+    def segment_table(self, year=None):
+        """Potentiel par segment (tous pays) pour une année: clients, ARPU, revenu, part"""
+        y = self._year(year)
+        labels, counts = self._grouped_counts('segment')
+        clients, revenue = self._scale(counts[:, y], 0)
+        segments = pd.DataFrame({
+            'Segment': list(labels),
+            'Total_Clients': clients,
+            'ARPU_USD': [self.hypotheses[arpu] for _, _, arpu, _ in SEGMENTS],
+            'Revenue_Potential_M_USD': revenue
+        })
+        segments['Market_Share_Pct'] = (
+            segments['Revenue_Potential_M_USD'] / segments['Revenue_Potential_M_USD'].sum() * 100
+        )
+        return segments
+
+    def region_table(self, year=None):
+        """Revenu potentiel (M USD) par sous-région et segment pour une année"""
+        y = self._year(year)
+        labels, revenue = self.rollup('region')
+        return pd.DataFrame(revenue[:, :, y], index=labels, columns=self.segments)
+
+    def frame(self, year=None):
+        """Tranche d'une année au format long (Country, Segment, Clients, Revenue_M_USD)"""
+        y = self._year(year)
+        n_countries, n_segments = len(self.countries), len(self.segments)
+        return pd.DataFrame({
+            'Country': np.repeat(self.countries.values, n_segments),
+            'Segment': np.tile(self.segments.values, n_countries),
+            'Clients': self.clients[:, :, y].ravel(),
+            'Revenue_M_USD': self.revenue[:, :, y].ravel()
+        })
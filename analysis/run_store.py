@@ -0,0 +1,254 @@
+"""Historique versionné des résultats (snapshots binaires à largeur fixe, memory-map)
+
+Chaque export ajoute le classement et les segments du run à la fin de fichiers
+binaires (un enregistrement structuré NumPy par ligne), jamais réécrits:
+
+    ../data/runs/ranking_v1.bin    classement (TAM/SAM/SOM, scores, rang)
+    ../data/runs/segments_v1.bin   potentiel par segment
+    ../data/runs/index.json        run id -> horodatage, position et nombre de lignes
+
+Un run ancien se relit par np.memmap (aucun recalcul, aucune copie), et diff()
+compare les rangs de deux runs en une passe vectorisée.
+
+    python run_store.py list
+    python run_store.py show 12
+    python run_store.py diff 11 12
+"""
+import argparse
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+
+RUNS_DIR = '../data/runs'
+
+# Version du format: un changement de colonnes crée de nouveaux fichiers *_v{n}.bin
+SNAPSHOT_VERSION = 1
+
+# Libellés pays / régions (octets UTF-8)
+LABEL_WIDTH = 32
+
+SNAPSHOT_TYPES = {
+    'ranking': np.dtype([
+        ('Country', f'S{LABEL_WIDTH}'),
+        ('Rank', '<i4'),
+        ('TAM_M_USD', '<f8'),
+        ('SAM_M_USD', '<f8'),
+        ('SOM_M_USD', '<f8'),
+        ('Growth_Score', '<f8'),
+        ('Maturity_Score', '<i1'),
+        ('Attractiveness_Score', '<f8')
+    ]),
+    'segments': np.dtype([
+        ('Segment', f'S{LABEL_WIDTH}'),
+        ('Total_Clients', '<f8'),
+        ('ARPU_USD', '<f8'),
+        ('Revenue_Potential_M_USD', '<f8'),
+        ('Market_Share_Pct', '<f8')
+    ])
+}
+
+def _records(df, dtype):
+    """DataFrame -> tableau structuré (libellés trop longs refusés plutôt que tronqués)"""
+    records = np.zeros(len(df), dtype=dtype)
+    for name in dtype.names:
+        if name == 'Rank':
+            continue
+        values = df[name].values
+        if dtype[name].kind == 'S':
+            values = df[name].astype(str).str.encode('utf-8')
+            too_long = values.str.len().values > LABEL_WIDTH
+            if too_long.any():
+                raise ValueError(f"Libellé de plus de {LABEL_WIDTH} octets: {values[too_long].iloc[0]!r}")
+            values = values.values
+        records[name] = values
+    if 'Rank' in dtype.names:
+        records['Rank'] = np.arange(1, len(df) + 1)  # df trié par score décroissant
+    return records
+
+def _country_keys(records):
+    """Clé (pays, occurrence) de chaque ligne d'un snapshot: unique même si un libellé
+    apparaît plusieurs fois"""
+    countries = pd.Series(np.asarray(records['Country']))
+    occurrence = countries.groupby(countries, sort=False).cumcount().values
+    return pd.MultiIndex.from_arrays([countries.values, occurrence])
+
+class RunStore:
+    """Runs successifs: fichiers binaires en ajout seul + index JSON"""
+
+    def __init__(self, runs_dir=RUNS_DIR):
+        self.runs_dir = runs_dir
+        self.index_path = os.path.join(runs_dir, 'index.json')
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                self.index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.index = {'version': SNAPSHOT_VERSION, 'runs': []}
+
+    def _path(self, table):
+        return os.path.join(self.runs_dir, f'{table}_v{SNAPSHOT_VERSION}.bin')
+
+    def _save_index(self):
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=1)
+        os.replace(tmp_path, self.index_path)
+
+    def append(self, ranking, segments, note=None):
+        """Ajoute un run (classement trié + segments); renvoie son id"""
+        os.makedirs(self.runs_dir, exist_ok=True)
+        entry = {
+            'run_id': self.index['runs'][-1]['run_id'] + 1 if self.index['runs'] else 1,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'note': note,
+            'tables': {}
+        }
+        # Conversion complète avant toute écriture: un libellé refusé n'ajoute rien
+        tables = {table: _records(df, SNAPSHOT_TYPES[table])
+                  for table, df in (('ranking', ranking), ('segments', segments))}
+        for table, records in tables.items():
+            path = self._path(table)
+            # Position = taille du fichier (octets orphelins d'un ajout interrompu ignorés)
+            with open(path, 'ab') as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(records.tobytes())
+            entry['tables'][table] = {'offset': offset, 'rows': len(records)}
+        # L'index n'est écrit qu'une fois les données en place
+        self.index['runs'].append(entry)
+        self._save_index()
+        return entry['run_id']
+
+    def runs(self):
+        """Liste des runs (id, horodatage, lignes, note)"""
+        return pd.DataFrame([
+            {'Run': run['run_id'], 'Timestamp': run['timestamp'],
+             'Countries': run['tables']['ranking']['rows'], 'Note': run['note']}
+            for run in self.index['runs']
+        ], columns=['Run', 'Timestamp', 'Countries', 'Note'])
+
+    def _entry(self, run):
+        """Run par id, 'latest', ou horodatage (dernier run à cette date ou avant; une date
+        seule inclut toute la journée)"""
+        runs = self.index['runs']
+        if not runs:
+            raise KeyError("Aucun run enregistré")
+        if run is None or run == 'latest':
+            return runs[-1]
+        if isinstance(run, str) and not run.lstrip('-').isdigit():
+            try:
+                limit = pd.Timestamp(run)
+            except ValueError:
+                raise KeyError(f"Run inconnu: {run} (id, 'latest' ou horodatage)") from None
+            if ':' not in run:
+                # Date seule: jusqu'à la fin de la journée
+                limit = limit.normalize() + pd.Timedelta(days=1) - pd.Timedelta(1)
+            stamps = pd.to_datetime([entry['timestamp'] for entry in runs])
+            earlier = [entry for entry, stamp in zip(runs, stamps) if stamp <= limit]
+            if not earlier:
+                raise KeyError(f"Aucun run avant {run}")
+            return earlier[-1]
+        run = int(run)
+        if run < 0:
+            if -run > len(runs):
+                raise KeyError(f"Run inconnu: {run} ({len(runs)} run(s) enregistré(s))")
+            return runs[run]  # -1 = dernier, -2 = avant-dernier...
+        for entry in runs:
+            if entry['run_id'] == run:
+                return entry
+        raise KeyError(f"Run inconnu: {run}")
+
+    def load(self, run=None, table='ranking'):
+        """Snapshot d'un run en tableau structuré memory-mappé (lecture seule, sans copie)"""
+        location = self._entry(run)['tables'][table]
+        dtype = SNAPSHOT_TYPES[table]
+        if location['rows'] == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(self._path(table), dtype=dtype, mode='r',
+                         offset=location['offset'], shape=(location['rows'],))
+
+    def frame(self, run=None, table='ranking'):
+        """Snapshot d'un run en DataFrame (libellés décodés)"""
+        df = pd.DataFrame(np.asarray(self.load(run, table)))
+        for name, (dtype, _) in SNAPSHOT_TYPES[table].fields.items():
+            if dtype.kind == 'S':
+                df[name] = df[name].str.decode('utf-8')
+        return df
+
+    def diff(self, before, after, moved_only=True):
+        """Évolution des rangs entre deux runs (pays ajoutés/retirés: rang manquant)"""
+        old, new = self.load(before), self.load(after)
+
+        # Une seule recherche par hachage: position de chaque pays du nouveau run dans l'ancien.
+        # Libellés en double: appariés dans l'ordre du classement (1re occurrence avec la 1re...)
+        positions = _country_keys(old).get_indexer(_country_keys(new))
+        found = positions >= 0
+        removed = np.ones(len(old), dtype=bool)
+        removed[positions[found]] = False
+
+        def column(field, values_old, values_new):
+            values = np.full(len(new) + removed.sum(), np.nan)
+            values[:len(new)][found] = values_old[positions[found]]
+            values[len(new):] = values_old[removed]
+            after_values = np.full(len(values), np.nan)
+            after_values[:len(new)] = values_new
+            return values, after_values
+
+        rank_before, rank_after = column('Rank', old['Rank'], new['Rank'])
+        score_before, score_after = column('Attractiveness_Score', old['Attractiveness_Score'],
+                                           new['Attractiveness_Score'])
+        labels = np.concatenate([new['Country'], old['Country'][removed]])
+        rank_change = rank_before - rank_after  # > 0: progression
+
+        keep = slice(None)
+        if moved_only:
+            keep = np.isnan(rank_change) | (rank_change != 0)
+        changes = pd.DataFrame({
+            'Country': pd.Series(labels[keep]).str.decode('utf-8'),
+            'Rank_Before': rank_before[keep],
+            'Rank_After': rank_after[keep],
+            'Rank_Change': rank_change[keep],
+            'Score_Before': score_before[keep],
+            'Score_After': score_after[keep]
+        })
+        changes['Score_Change'] = changes['Score_After'] - changes['Score_Before']
+        return changes.sort_values('Rank_After', na_position='last').reset_index(drop=True)
+
+def print_diff(changes, before, after):
+    """Affiche les pays qui ont changé de rang"""
+    print(f"\n   Évolution du classement: run {before} -> run {after}")
+    if changes.empty:
+        print("   Aucun changement de rang.")
+        return
+    for _, row in changes.iterrows():
+        if np.isnan(row['Rank_Before']):
+            print(f"   + {row['Country']}: nouveau, rang {row['Rank_After']:.0f}")
+        elif np.isnan(row['Rank_After']):
+            print(f"   - {row['Country']}: retiré (rang {row['Rank_Before']:.0f})")
+        else:
+            arrow = '↑' if row['Rank_Change'] > 0 else '↓'
+            print(f"   {arrow} {row['Country']}: {row['Rank_Before']:.0f} -> {row['Rank_After']:.0f} "
+                  f"(score {row['Score_Change']:+.1f})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Historique des runs d'analyse")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help="Liste des runs")
+    show = commands.add_parser('show', help="Classement d'un run")
+    show.add_argument('run', nargs='?', default='latest', help="Id, 'latest' ou horodatage")
+    diff = commands.add_parser('diff', help="Pays ayant changé de rang entre deux runs")
+    diff.add_argument('before', nargs='?', default='-2')
+    diff.add_argument('after', nargs='?', default='latest')
+    args = parser.parse_args()
+
+    store = RunStore()
+    if args.command == 'list':
+        print(store.runs().to_string(index=False))
+    elif args.command == 'show':
+        print(store.frame(args.run).to_string(index=False))
+    else:
+        before, after = store._entry(args.before)['run_id'], store._entry(args.after)['run_id']
+        print_diff(store.diff(before, after), before, after)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Exécution partitionnée par pays: processus de travail + mémoire partagée
+
+La table market_data est découpée en partitions de lignes contiguës, regroupées par
+pays (les régions infranationales restent avec leur pays parent). Les colonnes d'entrée
+sont copiées une fois dans un bloc multiprocessing.shared_memory; chaque processus y
+lit sa tranche et écrit ses résultats dans un second bloc partagé. Seuls des noms de
+blocs et des bornes de lignes transitent entre processus, jamais de DataFrame.
+
+Deux passes:
+    1. métriques dérivées (DERIVED_METRICS), maxima locaux de SAM et Growth_Score
+       (lignes classées), sommes des comptages par segment;
+    2. réduction des maxima dans le processus principal, puis score d'attractivité
+       de chaque tranche avec les maxima globaux.
+Résultats identiques bit à bit au calcul en un seul processus.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from market_model import DERIVED_METRICS, _attractiveness
+from revenue_cube import SEGMENTS
+from country_registry import PARENT_COLUMN, parent_countries
+
+DERIVED_NAMES = [name for name, _, _ in DERIVED_METRICS]
+INPUT_COLUMNS = sorted({col for _, inputs, _ in DERIVED_METRICS for col in inputs
+                        if col not in DERIVED_NAMES} | {'Internet_Penetration_Pct'})
+SEGMENT_COLUMNS = [column for _, column, _, _ in SEGMENTS]
+
+# Colonnes des blocs partagés (entrées + maturité, résultats)
+SHARED_INPUTS = INPUT_COLUMNS + ['Maturity_Score']
+SHARED_OUTPUTS = DERIVED_NAMES + ['Attractiveness_Score']
+
+# Partitions par processus (équilibrage quand les pays n'ont pas la même taille)
+SHARDS_PER_WORKER = 2
+
+class SharedBlock:
+    """Tableau float64 (colonnes × lignes) dans un segment de mémoire partagée"""
+
+    def __init__(self, shape, name=None):
+        self.shape = shape
+        size = max(int(np.prod(shape)) * 8, 1)
+        self.owner = name is None
+        # Processus de travail: même resource_tracker que le processus principal, qui
+        # seul libère le segment (unlink)
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        self.array = np.ndarray(shape, dtype=np.float64, buffer=self.shm.buf)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+def shard_bounds(groups, n_shards):
+    """Ordre des lignes (groupées par pays) et bornes de n_shards tranches contiguës
+    de tailles proches, coupées seulement entre deux pays"""
+    codes, _ = pd.factorize(groups)
+    order = np.argsort(codes, kind='stable')
+    group_ends = np.flatnonzero(np.diff(codes[order])) + 1
+    targets = np.linspace(0, len(codes), n_shards + 1)[1:-1]
+    cuts = group_ends[np.minimum(np.searchsorted(group_ends, targets),
+                                 max(len(group_ends) - 1, 0))] if len(group_ends) else []
+    bounds = np.unique(np.concatenate([[0], cuts, [len(codes)]])).astype(np.int64)
+    return order, list(zip(bounds[:-1], bounds[1:]))
+
+def _columns(block, names, start, stop):
+    """Vues {colonne: tranche} d'un bloc partagé"""
+    return {name: block.array[i, start:stop] for i, name in enumerate(names)}
+
+def _derive_shard(task):
+    """Passe 1: métriques dérivées de la tranche, maxima locaux et sommes par segment"""
+    inputs_name, outputs_name, n_rows, start, stop = task
+    inputs = SharedBlock((len(SHARED_INPUTS), n_rows), inputs_name)
+    outputs = SharedBlock((len(SHARED_OUTPUTS), n_rows), outputs_name)
+    try:
+        data = _columns(inputs, SHARED_INPUTS, start, stop)
+        results = _columns(outputs, SHARED_OUTPUTS, start, stop)
+        for name, _, func in DERIVED_METRICS:
+            results[name][:] = func(data)
+            data[name] = results[name]
+
+        ranked = ~np.isnan(data['Maturity_Score'])
+        maxima = (data['SAM_M_USD'][ranked].max(initial=-np.inf),
+                  data['Growth_Score'][ranked].max(initial=-np.inf))
+        sums = np.array([np.nan_to_num(data[column]).sum() for column in SEGMENT_COLUMNS])
+        return maxima, sums
+    finally:
+        inputs.close()
+        outputs.close()
+
+def _score_shard(task):
+    """Passe 2: score d'attractivité de la tranche avec les maxima globaux"""
+    inputs_name, outputs_name, n_rows, start, stop, max_sam, max_growth = task
+    inputs = SharedBlock((len(SHARED_INPUTS), n_rows), inputs_name)
+    outputs = SharedBlock((len(SHARED_OUTPUTS), n_rows), outputs_name)
+    try:
+        data = _columns(inputs, SHARED_INPUTS, start, stop)
+        data.update(_columns(outputs, DERIVED_NAMES, start, stop))
+        score = outputs.array[SHARED_OUTPUTS.index('Attractiveness_Score'), start:stop]
+        score[:] = _attractiveness(data, max_sam, max_growth)
+        score[np.isnan(data['Maturity_Score'])] = np.nan  # hors classement
+    finally:
+        inputs.close()
+        outputs.close()
+
+def run_sharded(market_data, maturity, workers=None, executor=None):
+    """Métriques dérivées, scores et comptages par segment, calculés par partitions.
+
+    `maturity`: score de maturité de chaque ligne (NaN: pays hors classement).
+    Renvoie (DataFrame des colonnes dérivées + Attractiveness_Score dans l'ordre des
+    lignes, sommes des comptages par segment).
+    """
+    workers = workers or os.cpu_count() or 1
+    n_rows = len(market_data)
+    if workers > 1:
+        labels = market_data['Country'].astype(str).values
+        parents = parent_countries(labels, market_data.get(PARENT_COLUMN))
+        order, shards = shard_bounds(np.where(pd.notna(parents), parents, labels),
+                                     workers * SHARDS_PER_WORKER)
+    else:
+        order, shards = np.arange(n_rows), [(0, n_rows)]  # une seule partition, sans tri
+
+    inputs = SharedBlock((len(SHARED_INPUTS), n_rows))
+    outputs = SharedBlock((len(SHARED_OUTPUTS), n_rows))
+    pool = None
+    try:
+        # Copie unique des entrées, lignes groupées par pays
+        for i, column in enumerate(INPUT_COLUMNS):
+            inputs.array[i] = market_data[column].values[order]
+        inputs.array[-1] = np.asarray(maturity, dtype=float)[order]
+
+        if workers > 1 and executor is None:
+            pool = executor = ProcessPoolExecutor(max_workers=workers)
+        run = executor.map if executor is not None else map
+
+        tasks = [(inputs.name, outputs.name, n_rows, start, stop) for start, stop in shards]
+        partials = list(run(_derive_shard, tasks))
+
+        # Réduction: seules les normalisations globales passent par le processus principal
+        max_sam = max(maxima[0] for maxima, _ in partials)
+        max_growth = max(maxima[1] for maxima, _ in partials)
+        segment_counts = np.sum([sums for _, sums in partials], axis=0)
+
+        list(run(_score_shard, [task + (max_sam, max_growth) for task in tasks]))
+
+        # Retour à l'ordre d'origine des lignes
+        restore = np.empty_like(order)
+        restore[order] = np.arange(n_rows)
+        results = pd.DataFrame({name: outputs.array[i][restore]
+                                for i, name in enumerate(SHARED_OUTPUTS)},
+                               index=market_data.index)
+        return results, segment_counts
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        inputs.close()
+        outputs.close()
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+
+def profile_imports(module, top=15):
+    """Mesure le temps d'import de `module` et de ses dépendances (python -X importtime)"""
+    # Processus neuf: aucun module déjà en cache ne fausse la mesure
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import de {module} impossible:\n{result.stderr[-2000:]}")
+
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings.append({
+            'module': name.strip(),
+            'depth': (len(name) - len(name.lstrip())) // 2,
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000
+        })
+
+    total_ms = next(t['cumulative_ms'] for t in reversed(timings) if t['module'] == module)
+    slowest = sorted(timings, key=lambda t: t['cumulative_ms'], reverse=True)[:top]
+
+    print(f"\n   PROFIL DE DÉMARRAGE: import {module} = {total_ms:.0f} ms\n")
+    print(f"   {'Module':<45} {'Cumulé (ms)':>12} {'Propre (ms)':>12}")
+    for t in slowest:
+        print(f"   {'  ' * t['depth'] + t['module']:<45} {t['cumulative_ms']:>12.1f} {t['self_ms']:>12.1f}")
+    print()
+
+    return total_ms, timings
+
+def check_startup(module, budget_ms=None, top=15):
+    """Profil de démarrage; code de sortie 1 si le budget (ms) est dépassé"""
+    total_ms, _ = profile_imports(module, top)
+    if budget_ms is not None and total_ms > budget_ms:
+        print(f"   Budget de démarrage dépassé: {total_ms:.0f} ms > {budget_ms:.0f} ms\n")
+        return 1
+    return 0
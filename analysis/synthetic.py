@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+from country_registry import load_registry
+from extract_and_build import WORLD_BANK_INDICATORS, build_market_frame
+
+MATURITY_LEVELS = ['High', 'Medium', 'Low']
+FRAMEWORKS = {'High': 'Advanced', 'Medium': 'Developing', 'Low': 'Basic'}
+SERVICES = ['Full_MSSP', 'SOC_SIEM', 'Consulting_SOC', 'Basic_Monitoring', 'Managed_Firewall', 'Incident_Response']
+PRICING_TIERS = ['Premium', 'Mid', 'Budget']
+
+def _row_labels(n_rows, registry):
+    """Noms de pays du référentiel, puis régions (ISO3_Rxxxxxx) au-delà de 54 lignes"""
+    countries = registry.index.tolist()
+    if n_rows <= len(countries):
+        return countries[:n_rows]
+    iso3 = registry['ISO3'].tolist()
+    return [f'{iso3[i % len(iso3)]}_R{i:06d}' for i in range(n_rows)]
+
+def generate_indicators(n_rows, seed=0, registry=None):
+    """Indicateurs synthétiques (unités du modèle + comptages), indexés par Country"""
+    if registry is None:
+        registry = load_registry()
+    rng = np.random.default_rng(seed)
+    population = rng.lognormal(mean=2.5, sigma=0.9, size=n_rows)  # millions
+    return pd.DataFrame({
+        'Population_M': population,
+        'GDP_B_USD': population * rng.uniform(0.5, 5.0, n_rows),
+        'Internet_Penetration_Pct': rng.uniform(10, 95, n_rows).round(1),
+        'Mobile_Penetration_Pct': rng.uniform(50, 160, n_rows).round(1),
+        'Banks_Count': rng.integers(5, 60, n_rows),
+        'Insurance_Companies': rng.integers(5, 50, n_rows)
+    }, index=pd.Index(_row_labels(n_rows, registry), name='Country'))
+
+def generate_market_data(n_rows, seed=0, n_competitors=None, registry=None):
+    """Tables market_data, regulations et competitors synthétiques de n_rows lignes"""
+    rng = np.random.default_rng(seed + 1)
+    market_data = build_market_frame(generate_indicators(n_rows, seed, registry))
+    countries = market_data['Country'].values
+
+    maturity = rng.choice(MATURITY_LEVELS, n_rows)
+    regulations = pd.DataFrame({
+        'Country': countries,
+        'Banking_Regulation': 'Synthetic_Regulation',
+        'Data_Protection_Law': 'Synthetic_Law',
+        'Cybersecurity_Framework': pd.Series(maturity).map(FRAMEWORKS).values,
+        'Compliance_Maturity': maturity,
+        'Penalties_Max_USD': rng.integers(10, 500, n_rows) * 1000
+    })
+
+    if n_competitors is None:
+        n_competitors = max(6, n_rows // 10)
+    competitors = pd.DataFrame({
+        'Company': [f'Provider_{i:06d}' for i in range(n_competitors)],
+        'Country': rng.choice(np.append(countries, 'Regional'), n_competitors),
+        'Services': rng.choice(SERVICES, n_competitors),
+        'Clients_Estimate': rng.integers(5, 200, n_competitors),
+        'Market_Share_Pct': rng.pareto(2.0, n_competitors).round(2) + 0.1,
+        'Pricing_Tier': rng.choice(PRICING_TIERS, n_competitors)
+    })
+
+    return market_data, regulations, competitors
+
+def generate_world_bank_export(path, n_rows, seed=0, years=(2024,), registry=None):
+    """Export DataBank synthétique (une ligne par pays × série), pour extract_world_bank_data.
+
+    Renvoie le dictionnaire nom Banque Mondiale -> nom interne à passer en `countries`.
+    """
+    indicators = generate_indicators(n_rows, seed, registry)
+    units = {
+        'gdp': indicators['GDP_B_USD'].values * 1_000_000_000,
+        'population': indicators['Population_M'].values * 1_000_000,
+        'internet': indicators['Internet_Penetration_Pct'].values,
+        'mobile': indicators['Mobile_Penetration_Pct'].values
+    }
+    countries = indicators.index.values
+    series = list(WORLD_BANK_INDICATORS.items())
+    export = pd.DataFrame({
+        'Country Name': np.repeat(countries, len(series)),
+        'Country Code': np.repeat(countries, len(series)),
+        'Series Name': np.tile([name for name, _ in series], n_rows),
+        'Series Code': np.tile([key for _, key in series], n_rows)
+    })
+    values = np.column_stack([units[key] for _, key in series]).ravel()
+    for offset, year in enumerate(sorted(years)[::-1]):
+        # Années antérieures: croissance de 3% par an à rebours
+        export[f'{year} [YR{year}]'] = values / 1.03 ** offset
+    export = export[list(export.columns[:4]) + sorted(export.columns[4:])]
+    export.to_csv(path, index=False)
+    return dict(zip(countries, countries))
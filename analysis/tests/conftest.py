@@ -0,0 +1,11 @@
+import os
+import sys
+import pytest
+
+ANALYSIS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ANALYSIS_DIR)
+
+@pytest.fixture(autouse=True)
+def analysis_dir(monkeypatch):
+    """Les chemins du projet ('../data') sont relatifs au dossier analysis/"""
+    monkeypatch.chdir(ANALYSIS_DIR)
@@ -0,0 +1,17 @@
+import pandas as pd
+from country_registry import PARENT_COLUMN, parent_countries
+from powerbi_export import partition_labels
+from trendlines import trend_groups
+
+def test_parent_countries_resolves_names_iso3_and_regions():
+    labels = ['Senegal', 'SEN', 'SEN_R000001', 'SEN_Dakar', 'SENX', 'XYZ_R000001']
+    assert list(parent_countries(labels)) == ['Senegal'] * 4 + [None, None]
+
+def test_explicit_parent_column_wins_over_label():
+    df = pd.DataFrame({'Country': ['Senegal', 'Dakar', 'Thiès', 'Mali'],
+                       PARENT_COLUMN: ['', 'SEN', 'Senegal', None]})
+    assert list(partition_labels(df, 'Country')) == ['Senegal', 'Senegal', 'Senegal', 'Mali']
+    assert list(trend_groups(df['Country'], df[PARENT_COLUMN])) == ['Senegal', 'Senegal', 'Senegal', 'Mali']
+
+def test_country_level_data_has_no_trend_groups():
+    assert trend_groups(pd.Series(['Senegal', 'Mali', 'Inconnu'])) is None
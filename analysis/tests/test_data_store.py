@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data_store import MATURITY_TYPE, apply_schema, load_table
+
+def test_integer_columns_widen_to_fit_observed_values():
+    df = apply_schema(pd.DataFrame({'Clients_Estimate': [150, 40_000],
+                                    'Penalties_Max_USD': [50_000, 3_000_000_000],
+                                    'Banks_Count': [29, 12]}))
+    assert df['Clients_Estimate'].dtype == np.int32
+    assert df['Penalties_Max_USD'].dtype == np.int64
+    assert df['Banks_Count'].dtype == np.int16  # type du schéma quand les valeurs y tiennent
+    assert df['Penalties_Max_USD'].iloc[1] == 3_000_000_000
+
+def test_load_table_accepts_large_counts(tmp_path):
+    competitors = pd.DataFrame({'Company': ['A', 'B'], 'Country': ['Senegal', 'Mali'],
+                                'Services': ['SOC', 'SOC'], 'Clients_Estimate': [40_000, 12],
+                                'Market_Share_Pct': [35.5, 4.25], 'Pricing_Tier': ['Premium', 'Mid']})
+    competitors.to_csv(tmp_path / 'competitors.csv', index=False)
+    df = load_table('competitors', data_dir=str(tmp_path), store_dir=str(tmp_path / 'store'))
+    assert df['Clients_Estimate'].tolist() == [40_000, 12]
+    assert df['Market_Share_Pct'].dtype == np.float64
+
+def test_unknown_maturity_level_is_rejected():
+    with pytest.raises(ValueError):
+        apply_schema(pd.DataFrame({'Compliance_Maturity': ['Medium', 'Excellent']}))
+    assert apply_schema(pd.DataFrame({'Compliance_Maturity': ['Medium']}))['Compliance_Maturity'].dtype == MATURITY_TYPE
@@ -0,0 +1,24 @@
+import json
+import os
+import instrumentation
+from instrumentation import Span
+
+def test_output_bytes_counts_declared_files_only(tmp_path, monkeypatch, capfd):
+    trace = tmp_path / 'trace.jsonl'
+    monkeypatch.setenv(instrumentation.TRACE_ENV, str(trace))
+    monkeypatch.setattr(instrumentation, '_sink', None)
+    report, untouched = tmp_path / 'report.txt', tmp_path / 'untouched.txt'
+    untouched.write_text('existant')
+
+    with Span('stage', outputs=[str(report), str(untouched), str(tmp_path / 'absent.txt')]):
+        os.write(1, b'x' * 5000)  # sortie standard: pas un fichier de l'étape
+        report.write_text('r' * 1200)
+    with Span('method'):
+        pass
+    instrumentation._sink.close()
+
+    stage, method = [json.loads(line) for line in trace.read_text().splitlines()]
+    assert stage['output_bytes'] == 1200
+    if stage['process_write_bytes'] is not None:
+        assert stage['process_write_bytes'] >= 6200
+    assert method['output_bytes'] is None
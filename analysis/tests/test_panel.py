@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+from country_registry import load_registry
+from panel import INDICATORS, MarketPanel
+
+def long_table(years, seed=0):
+    """Tableau long (Country, Indicator, Year, Value) avec des trous sur plusieurs années"""
+    rng = np.random.default_rng(seed)
+    countries = load_registry().index[:8]
+    index = pd.MultiIndex.from_product([countries, INDICATORS, years],
+                                       names=['Country', 'Indicator', 'Year'])
+    long = index.to_frame(index=False)
+    long['Value'] = rng.uniform(1, 100, len(long)) * np.where(long['Indicator'] == 'population', 1e6, 1)
+    # Valeurs manquantes, dont deux années de suite pour un pays
+    missing = rng.random(len(long)) < 0.2
+    missing |= (long['Country'] == countries[0]) & (long['Year'] >= years[-2])
+    return long[~missing].reset_index(drop=True)
+
+def assert_same_panel(panel, expected):
+    assert list(panel.countries) == list(expected.countries)
+    np.testing.assert_array_equal(panel.years, expected.years)
+    for key in INDICATORS:
+        np.testing.assert_array_equal(panel.raw[key], expected.raw[key])
+    for name, values in expected.metrics.items():
+        np.testing.assert_allclose(panel.metrics[name], values, rtol=1e-12, equal_nan=True)
+
+def test_add_year_matches_full_rebuild():
+    long = long_table(list(range(2018, 2025)))
+    panel = MarketPanel.from_long(long[long['Year'] < 2024]).add_year(long[long['Year'] == 2024])
+    assert_same_panel(panel, MarketPanel.from_long(long))
+
+def test_add_year_fills_skipped_years():
+    long = long_table(list(range(2018, 2025)), seed=1)
+    panel = MarketPanel.from_long(long[long['Year'] <= 2021]).add_year(long[long['Year'] > 2021])
+    assert_same_panel(panel, MarketPanel.from_long(long))
+
+def test_add_year_rejects_past_years():
+    long = long_table(list(range(2018, 2025)))
+    panel = MarketPanel.from_long(long)
+    with pytest.raises(ValueError):
+        panel.add_year(long[long['Year'] == 2022])
@@ -0,0 +1,23 @@
+import os
+import pipeline
+
+def stale_plan(monkeypatch, touched):
+    """Plan quand `touched` est plus récent que toutes les sorties"""
+    monkeypatch.setattr(pipeline.os.path, 'exists', lambda path: True)
+    monkeypatch.setattr(pipeline.os.path, 'getmtime', lambda path: 2.0 if path == touched else 1.0)
+    return pipeline.plan(pipeline.default_stages())
+
+def test_fresh_outputs_skip_everything(monkeypatch):
+    assert stale_plan(monkeypatch, None) == set()
+
+def test_registry_and_snapshot_rebuild_market_data(monkeypatch):
+    everything = {stage.name for stage in pipeline.default_stages()}
+    for touched in (pipeline.REGISTRY, '../data/world_bank_snapshot.csv'):
+        assert stale_plan(monkeypatch, touched) == everything
+
+def test_registry_readers_list_it_as_input():
+    stages = {stage.name: stage for stage in pipeline.default_stages()}
+    for name in ('build', 'analysis', 'segment_analysis', 'export', 'visualization'):
+        assert pipeline.REGISTRY in stages[name].inputs
+    assert pipeline.REGISTRY not in stages['competitive_analysis'].inputs
+    assert os.path.exists(pipeline.REGISTRY)
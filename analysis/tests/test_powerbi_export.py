@@ -0,0 +1,22 @@
+import os
+import pandas as pd
+from powerbi_export import IncrementalExporter
+
+def test_country_and_its_regions_share_one_partition(tmp_path):
+    ranking = pd.DataFrame({'Country': ['Senegal', 'SEN_R000001', 'SEN_R000002', 'Mali'],
+                            'Attractiveness_Score': [90.0, 80.0, 70.0, 60.0]})
+    exporter = IncrementalExporter(str(tmp_path), fmt='csv.gz')
+    delta = exporter.export({'country_ranking': ranking}, run_date='2026-10-17')
+
+    written = delta['tables']['country_ranking']['partitions_written']
+    assert [(entry['partition'], entry['rows']) for entry in written] == [('Mali', 1), ('Senegal', 3)]
+    assert sorted(os.listdir(tmp_path / 'country_ranking' / 'run_date=2026-10-17')) == [
+        'country=Mali', 'country=Senegal']
+
+    # Seule la partition du pays dont une région change est réécrite
+    ranking.loc[1, 'Attractiveness_Score'] = 85.0
+    delta = IncrementalExporter(str(tmp_path), fmt='csv.gz').export({'country_ranking': ranking},
+                                                                     run_date='2026-10-17')
+    table = delta['tables']['country_ranking']
+    assert [entry['partition'] for entry in table['partitions_written']] == ['Senegal']
+    assert table['partitions_unchanged'] == ['Mali']
@@ -0,0 +1,42 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from run_store import LABEL_WIDTH, RunStore
+
+def ranking(countries, scores):
+    return pd.DataFrame({'Country': countries, 'TAM_M_USD': 1.0, 'SAM_M_USD': 1.0, 'SOM_M_USD': 1.0,
+                         'Growth_Score': 1.0, 'Maturity_Score': 2, 'Attractiveness_Score': scores})
+
+SEGMENTS = pd.DataFrame({'Segment': ['PME'], 'Total_Clients': [1.0], 'ARPU_USD': [1.0],
+                         'Revenue_Potential_M_USD': [1.0], 'Market_Share_Pct': [100.0]})
+
+def test_diff_pairs_duplicate_labels(tmp_path):
+    store = RunStore(str(tmp_path))
+    before = store.append(ranking(['Senegal', 'Mali', 'Senegal'], [90, 80, 70]), SEGMENTS)
+    after = store.append(ranking(['Mali', 'Senegal', 'Senegal', 'Niger'], [95, 90, 70, 60]), SEGMENTS)
+    changes = store.diff(before, after, moved_only=False)
+    assert list(changes['Country']) == ['Mali', 'Senegal', 'Senegal', 'Niger']
+    np.testing.assert_array_equal(changes['Rank_Before'], [2, 1, 3, np.nan])
+    np.testing.assert_array_equal(changes['Rank_After'], [1, 2, 3, 4])
+
+def test_long_label_is_rejected_before_writing(tmp_path):
+    store = RunStore(str(tmp_path))
+    with pytest.raises(ValueError):
+        store.append(ranking(['Senegal', 'x' * (LABEL_WIDTH + 1)], [90, 80]), SEGMENTS)
+    assert not os.listdir(tmp_path)
+
+def test_date_only_lookup_includes_that_day(tmp_path):
+    store = RunStore(str(tmp_path))
+    for _ in range(3):
+        store.append(ranking(['Senegal'], [90]), SEGMENTS)
+    stamps = ['2026-10-15T09:00:00', '2026-10-16T08:30:00', '2026-10-16T17:45:00']
+    for entry, stamp in zip(store.index['runs'], stamps):
+        entry['timestamp'] = stamp
+    assert store._entry('2026-10-16')['run_id'] == 3
+    assert store._entry('2026-10-16T12:00')['run_id'] == 2
+    assert store._entry('2026-10-15')['run_id'] == 1
+    with pytest.raises(KeyError):
+        store._entry('2026-10-14')
+    with pytest.raises(KeyError):
+        store._entry('hier')
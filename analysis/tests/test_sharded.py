@@ -0,0 +1,24 @@
+import subprocess
+import sys
+import pandas as pd
+from market_analysis import MSSPMarketAnalysis
+from synthetic import generate_market_data
+
+def analyse(tables, workers):
+    market_data, regulations, competitors = tables
+    analysis = MSSPMarketAnalysis(market_data=market_data, regulations=regulations,
+                                  competitors=competitors, workers=workers)
+    return analysis.market_data, analysis._ranking(), analysis._segments()
+
+def test_sharded_matches_sequential_with_repeated_and_unranked_countries():
+    market_data, regulations, competitors = generate_market_data(300, n_competitors=6)
+    # Libellé répété (deux lignes pour un même pays) et pays sans réglementation
+    market_data.loc[7, 'Country'] = market_data.loc[3, 'Country']
+    regulations = regulations[regulations['Country'] != market_data.loc[11, 'Country']]
+    tables = (market_data, regulations, competitors)
+    for got, want in zip(analyse(tables, 2), analyse(tables, None)):
+        pd.testing.assert_frame_equal(got, want, check_exact=True)
+
+def test_sharded_does_not_import_market_analysis():
+    code = "import sys, sharded; assert 'market_analysis' not in sys.modules"
+    subprocess.run([sys.executable, '-c', code], check=True)
@@ -0,0 +1,28 @@
+import contextlib
+import io
+import numpy as np
+import pandas as pd
+import pytest
+from data_store import load_table
+from market_analysis import MSSPMarketAnalysis
+
+def simulate(market_data):
+    with contextlib.redirect_stdout(io.StringIO()):
+        analysis = MSSPMarketAnalysis(market_data=market_data)
+        return analysis.simulate(n_draws=20_000, batch_size=5_000, seed=7).set_index(['Country', 'Metric'])
+
+def test_unregulated_country_does_not_change_scores():
+    market_data = load_table('market_data')
+    assert 'Ghana' not in set(load_table('regulations')['Country'].astype(str))
+    ghana = market_data[market_data['Country'] == 'Morocco'].assign(Country='Ghana', Banks_Count=300)
+    with_ghana = pd.concat([market_data, ghana], ignore_index=True)
+
+    expected, results = simulate(market_data), simulate(with_ghana)
+    assert 'Ghana' not in results.index.get_level_values('Country')
+    assert not results.isna().any().any()
+    pd.testing.assert_frame_equal(results, expected)
+
+def test_no_ranked_country_is_rejected():
+    market_data = load_table('market_data').assign(Country='Ghana')
+    with pytest.raises(ValueError):
+        simulate(market_data)
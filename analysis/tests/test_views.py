@@ -0,0 +1,36 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from views import CountryViews
+
+class Tables(CountryViews):
+    def __init__(self):
+        self.market_data = pd.DataFrame({'Country': ['Senegal', 'Mali'], 'Banks_Count': [25, 14]})
+        self.regulations = pd.DataFrame({'Country': ['Senegal'], 'Compliance_Maturity': ['Medium']})
+        self.competitors = pd.DataFrame({'Company': ['A']})
+
+def test_memoized_builds_once_across_threads():
+    tables = Tables()
+    calls = []
+    lock = threading.Lock()
+
+    def build():
+        with lock:
+            calls.append(threading.get_ident())
+        time.sleep(0.05)
+        return len(calls)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: tables.memoized('slow', ('market_data',), build), range(16)))
+    assert len(calls) == 1
+    assert results == [1] * 16
+
+def test_views_are_rebuilt_after_invalidate_and_not_pickled():
+    tables = Tables()
+    first = tables.market_regulations()
+    assert tables.market_regulations() is first
+    tables.invalidate('regulations')
+    assert tables.market_regulations() is not first
+    state = tables.__getstate__()
+    assert '_views' not in state and '_view_locks' not in state
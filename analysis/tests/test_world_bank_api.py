@@ -0,0 +1,134 @@
+import asyncio
+import pytest
+from aiohttp import web
+from world_bank_api import (FetchError, HTTPStatusError, ResponseCache, WorldBankClient,
+                            fetch_world_bank_long)
+
+YEARS = [2023, 2024]
+
+def page(iso3, code, values):
+    """Réponse API v2: [métadonnées, enregistrements]"""
+    return [{'page': 1, 'pages': 1},
+            [{'indicator': {'id': code}, 'countryiso3code': iso3, 'date': str(year), 'value': value}
+             for year, value in zip(YEARS, values)]]
+
+class StubServer:
+    """Serveur local: suite de réponses (statut, corps, en-têtes) par chemin, requêtes comptées"""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.hits = {}
+        self.headers = []
+
+    async def handle(self, request):
+        path = request.path
+        self.hits[path] = self.hits.get(path, 0) + 1
+        self.headers.append(dict(request.headers))
+        queue = self.responses.get(path, [(404, None, {})])
+        status, body, headers = queue[min(self.hits[path], len(queue)) - 1]
+        if body is None:
+            return web.Response(status=status, headers=headers)
+        return web.json_response(body, status=status, headers=headers)
+
+    async def run(self, coroutine_factory):
+        app = web.Application()
+        app.router.add_get('/{tail:.*}', self.handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            return await coroutine_factory(f'http://127.0.0.1:{port}')
+        finally:
+            await runner.cleanup()
+
+def client(base_url, tmp_path, **options):
+    options.setdefault('backoff', 0)
+    return WorldBankClient(base_url=base_url, cache=ResponseCache(str(tmp_path / 'cache')), **options)
+
+def fetch(server, tmp_path, **options):
+    async def run(base_url):
+        wb = client(base_url, tmp_path, **options)
+        return await wb.fetch(['SEN'], ['SP.POP.TOTL'], YEARS), wb.stats
+    return asyncio.run(server.run(run))
+
+PATH = '/country/SEN/indicator/SP.POP.TOTL'
+
+def test_permanent_error_is_not_retried(tmp_path):
+    server = StubServer({PATH: [(404, {'error': 'not found'}, {})]})
+    with pytest.raises(HTTPStatusError) as error:
+        fetch(server, tmp_path, retries=3)
+    assert error.value.status == 404
+    assert server.hits[PATH] == 1
+
+def test_server_error_is_retried(tmp_path):
+    body = page('SEN', 'SP.POP.TOTL', [17.0e6, 17.5e6])
+    server = StubServer({PATH: [(503, None, {}), (200, body, {})]})
+    records, stats = fetch(server, tmp_path, retries=3)
+    assert [record['value'] for record in records] == [17.0e6, 17.5e6]
+    assert server.hits[PATH] == 2 and stats['retries'] == 1
+
+def test_retries_exhausted(tmp_path):
+    server = StubServer({PATH: [(500, None, {})]})
+    with pytest.raises(FetchError):
+        fetch(server, tmp_path, retries=2)
+    assert server.hits[PATH] == 3
+
+def test_304_without_cached_body_refetches(tmp_path):
+    body = page('SEN', 'SP.POP.TOTL', [1.0, 2.0])
+    server = StubServer({PATH: [(304, None, {}), (200, body, {})]})
+    records, _ = fetch(server, tmp_path, retries=1)
+    assert len(records) == 2
+    assert 'If-None-Match' not in server.headers[-1]
+
+def test_etag_revalidation_uses_cache(tmp_path):
+    body = page('SEN', 'SP.POP.TOTL', [1.0, 2.0])
+    server = StubServer({PATH: [(200, body, {'ETag': '"v1"'}), (304, None, {})]})
+
+    async def run(base_url):
+        await client(base_url, tmp_path).fetch(['SEN'], ['SP.POP.TOTL'], YEARS)
+        # TTL nul: la deuxième lecture revalide l'entrée par ETag au lieu de la retélécharger
+        wb = client(base_url, tmp_path)
+        wb.cache.ttl = 0
+        return await wb.fetch(['SEN'], ['SP.POP.TOTL'], YEARS), wb.stats
+    records, stats = asyncio.run(server.run(run))
+    assert len(records) == 2 and stats['revalidated'] == 1
+    assert server.headers[-1]['If-None-Match'] == '"v1"'
+
+def test_recorded_fixtures_replay(tmp_path):
+    codes = ['NY.GDP.MKTP.CD', 'SP.POP.TOTL', 'IT.NET.USER.ZS', 'IT.CEL.SETS.P2']
+    server = StubServer({f'/country/SEN/indicator/{code}': [(200, page('SEN', code, [i, i + 1.0]), {})]
+                         for i, code in enumerate(codes, 1)})
+    record_dir = tmp_path / 'fixtures'
+
+    async def record(base_url):
+        wb = client(base_url, tmp_path, record_dir=str(record_dir))
+        return await asyncio.to_thread(fetch_world_bank_long, YEARS, {'Senegal': 'Senegal'},
+                                       None, wb)
+    recorded = asyncio.run(server.run(record))
+
+    # Rejeu sans réseau: même tableau long
+    replayed = fetch_world_bank_long(YEARS, {'Senegal': 'Senegal'},
+                                     client=WorldBankClient(fixtures_dir=str(record_dir)))
+    assert len(recorded) == 8
+    assert recorded.equals(replayed)
+
+def test_touch_never_leaves_partial_metadata(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path))
+    url = 'http://example/api'
+    cache.put(url, {'x': 1}, etag='"v1"')
+    _, meta = cache.get(url)
+
+    def interrupted(content, f):
+        f.write('{"url": ')
+        raise OSError("arrêt pendant l'écriture")
+    monkeypatch.setattr('world_bank_api.json.dump', interrupted)
+    with pytest.raises(OSError):
+        cache.touch(url, meta)
+    monkeypatch.undo()
+
+    body, current = cache.get(url)
+    assert body == {'x': 1} and current == meta
+    cache.touch(url, meta)
+    assert cache.get(url)[1]['fetched_at'] >= meta['fetched_at']
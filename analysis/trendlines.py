@@ -0,0 +1,117 @@
+"""Droites de tendance par moindres carrés ordinaires (forme fermée, NumPy)
+
+Remplace trendline='ols' de plotly (statsmodels, réajusté à chaque rendu): pente,
+ordonnée à l'origine et R² de chaque groupe sont calculés en une passe de sommes
+(np.bincount), gardés dans le store à côté des données (table trendline_fit, avec
+l'empreinte des entrées) et exportés pour Power BI.
+"""
+import hashlib
+import numpy as np
+import pandas as pd
+from country_registry import PARENT_COLUMN, parent_countries
+from data_store import read_table, write_table
+
+TRENDLINE_TABLE = 'trendline_fit'
+
+# Variables du graphique pénétration internet vs dépenses cyber
+TREND_X = 'Internet_Penetration_Pct'
+TREND_Y = 'Cybersecurity_Spending_M_USD'
+
+# Droite sur l'ensemble des points (toujours en première ligne)
+ALL_GROUPS = 'All'
+
+def trend_groups(countries, parents=None):
+    """Groupe de chaque ligne: pays parent des régions (country_registry.parent_countries),
+    None si aucune région (données par pays: un point par pays, une seule droite globale)"""
+    labels = pd.Series(countries, dtype=object).astype(str).values
+    resolved = parent_countries(labels, parents)
+    is_region = pd.notna(resolved) & (resolved != labels)
+    if not is_region.any():
+        return None
+    # Lignes hors référentiel: leur propre groupe (un point, pas de droite)
+    return np.where(pd.notna(resolved), resolved, labels)
+
+def fit_ols(x, y, groups=None):
+    """Moindres carrés y = a·x + b, globalement et par groupe: N, pente, ordonnée,
+    R², étendue de x. Lignes NaN ignorées; moins de 2 points ou x constant -> NaN"""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = ~(np.isnan(x) | np.isnan(y))
+
+    if groups is None:
+        labels = pd.Index([ALL_GROUPS])
+        codes = np.zeros(valid.sum(), dtype=np.int64)
+    else:
+        codes, labels = pd.factorize(np.asarray(groups)[valid], sort=True)
+        labels = pd.Index([ALL_GROUPS]).append(pd.Index(labels))
+        codes = np.concatenate([np.zeros(valid.sum(), dtype=np.int64), codes + 1])
+    x, y = x[valid], y[valid]
+    if groups is not None:
+        # Chaque point compte pour la droite globale (code 0) et pour son groupe
+        x, y = np.concatenate([x, x]), np.concatenate([y, y])
+
+    size = len(labels)
+    n = np.bincount(codes, minlength=size).astype(float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Sommes centrées (deux passes): stables même pour de grandes valeurs de x, y
+        mean_x = np.bincount(codes, x, size) / n
+        mean_y = np.bincount(codes, y, size) / n
+        dx, dy = x - mean_x[codes], y - mean_y[codes]
+        sxx = np.bincount(codes, dx * dx, size)
+        sxy = np.bincount(codes, dx * dy, size)
+        syy = np.bincount(codes, dy * dy, size)
+
+        fitted = (n >= 2) & (sxx > 0)
+        slope = np.where(fitted, sxy / sxx, np.nan)
+        intercept = np.where(fitted, mean_y - slope * mean_x, np.nan)
+        r2 = np.where(fitted & (syy > 0), sxy * sxy / (sxx * syy), np.nan)
+
+    x_min = np.full(size, np.nan)
+    x_max = np.full(size, np.nan)
+    if len(x):
+        np.fmin.at(x_min, codes, x)
+        np.fmax.at(x_max, codes, x)
+
+    return pd.DataFrame({
+        'Group': labels.astype(str),
+        'N': n.astype(np.int64),
+        'Slope': slope,
+        'Intercept': intercept,
+        'R2': r2,
+        'X_Min': x_min,
+        'X_Max': x_max
+    })
+
+def fingerprint(df, x, y):
+    """Empreinte des colonnes utilisées par l'ajustement"""
+    digest = hashlib.sha256(f'{x}|{y}'.encode())
+    columns = ['Country', x, y] + ([PARENT_COLUMN] if PARENT_COLUMN in df.columns else [])
+    digest.update(pd.util.hash_pandas_object(df[columns], index=False).values.tobytes())
+    return digest.hexdigest()[:16]
+
+def trendline_fit(df, x=TREND_X, y=TREND_Y):
+    """Ajustement de y en fonction de x (colonnes de df), relu du store si les entrées
+    n'ont pas changé, sinon recalculé et enregistré"""
+    key = fingerprint(df, x, y)
+    try:
+        cached = read_table(TRENDLINE_TABLE)
+    except FileNotFoundError:
+        cached = None
+    if cached is not None and len(cached) and (cached['Fingerprint'] == key).all():
+        return cached
+
+    fit = fit_ols(df[x].values, df[y].values, trend_groups(df['Country'], df.get(PARENT_COLUMN)))
+    fit.insert(0, 'X', x)
+    fit.insert(1, 'Y', y)
+    fit['Fingerprint'] = key
+    write_table(TRENDLINE_TABLE, fit)
+    return fit
+
+def line_points(fit):
+    """Segments (X_Min -> X_Max) des groupes ajustés, séparés par None: une seule trace"""
+    fit = fit[fit['Slope'].notna()]
+    xs = np.column_stack([fit['X_Min'], fit['X_Max']])
+    ys = xs * fit['Slope'].values[:, None] + fit['Intercept'].values[:, None]
+    gaps = np.full((len(fit), 1), None, dtype=object)
+    return (np.hstack([xs.astype(object), gaps]).ravel().tolist(),
+            np.hstack([ys.astype(object), gaps]).ravel().tolist())
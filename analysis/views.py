@@ -0,0 +1,87 @@
+import threading
+from data_store import index_by_country
+from market_model import HYPOTHESES
+from revenue_cube import RevenueCube
+
+TABLES = ('market_data', 'regulations', 'competitors')
+
+# Création des caches et verrous par clé (instantané, jamais pendant un calcul)
+_MEMO_LOCK = threading.Lock()
+
+def _table_property(name):
+    """Attribut de table: toute nouvelle affectation invalide les vues qui en dépendent"""
+    def get(self):
+        return self.__dict__[name]
+
+    def set(self, value):
+        self.__dict__[name] = value
+        self.invalidate(name)
+
+    return property(get, set)
+
+class CountryViews:
+    """Vues jointes par pays et résultats d'étapes pures, calculés une fois et partagés.
+
+    Une entrée est recalculée quand une table dont elle dépend est réaffectée, change
+    de forme ou de colonnes, ou après invalidate() (modification des valeurs en place).
+    """
+
+    market_data = _table_property('market_data')
+    regulations = _table_property('regulations')
+    competitors = _table_property('competitors')
+
+    def invalidate(self, table=None):
+        """Invalide les entrées qui dépendent de `table` (toutes si None)"""
+        versions = self.__dict__.setdefault('_versions', {})
+        for name in TABLES if table is None else (table,):
+            versions[name] = versions.get(name, 0) + 1
+
+    def _token(self, tables):
+        versions = self.__dict__.setdefault('_versions', {})
+        return tuple(
+            (name, versions.get(name, 0), id(df), df.shape, tuple(df.columns))
+            for name, df in ((name, self.__dict__[name]) for name in tables)
+        )
+
+    def memoized(self, key, tables, build, extra=()):
+        """Résultat de build() mis en cache tant que `tables` et `extra` sont inchangés.
+
+        Sûr entre threads (étapes du pipeline en parallèle sur le même objet): un verrou
+        par clé, une vue demandée par deux threads n'est construite qu'une fois.
+        """
+        with _MEMO_LOCK:
+            cache = self.__dict__.setdefault('_views', {})
+            lock = self.__dict__.setdefault('_view_locks', {}).setdefault(key, threading.Lock())
+        with lock:
+            token = (self._token(tables), extra)
+            entry = cache.get(key)
+            if entry is None or entry[0] != token:
+                entry = cache[key] = (token, build())
+            return entry[1]
+
+    def market_regulations(self):
+        """market_data ⋈ regulations (jointure interne), indexée par pays.
+
+        Vue partagée: ne pas la modifier en place (copy() avant d'ajouter des colonnes).
+        """
+        def build():
+            view = self.market_data.join(index_by_country(self.regulations),
+                                         on='Country', how='inner')
+            # Index = pays, la colonne Country reste disponible pour l'affichage/export
+            view.index = view['Country'].astype(str).values
+            return view
+
+        return self.memoized('market_regulations', ('market_data', 'regulations'), build)
+
+    def revenue_cube(self):
+        """Cube pays × segment × année (étape pure, mise en cache sur market_data et HYPOTHESES)"""
+        return self.memoized('revenue_cube', ('market_data',),
+                             lambda: RevenueCube.from_market_data(self.market_data, HYPOTHESES),
+                             extra=tuple(HYPOTHESES.items()))
+
+    def __getstate__(self):
+        # Les vues ne partent pas vers les processus de rendu (recalculées si besoin)
+        state = self.__dict__.copy()
+        state.pop('_views', None)
+        state.pop('_view_locks', None)
+        return state
@@ -1,36 +1,181 @@
+import argparse
+import hashlib
+import os
+import sys
+import time
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import warnings
+from importlib.metadata import version
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from chart_cache import ChartCache
+from instrumentation import trace_methods
+from startup_profile import check_startup
+from country_registry import PARENT_COLUMN
+from data_store import load_table, category_lookup
+from views import CountryViews
+from market_model import HYPOTHESES
+from trendlines import ALL_GROUPS, TREND_X, TREND_Y, line_points, trend_groups, trendline_fit
 warnings.filterwarnings('ignore')
 
-# Configuration
-plt.style.use('seaborn-v0_8-whitegrid')
-sns.set_palette("Set2")
+CHARTS_DIR = '../images/charts'
 
-class MSSPVisualizations:
+# Niveau de maturité réglementaire sur l'axe des x (1 = faible, 3 = élevé)
+MATURITY_LEVEL = {
+    'High': 3, 'Advanced': 3,
+    'Medium': 2, 'Developing': 2,
+    'Low': 1, 'Basic': 1
+}
+
+# Modes de sortie HTML (plotly.js toujours local, jamais de CDN)
+OUTPUT_MODES = ['inline', 'shared', 'bundle']
+
+BUNDLE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Étude de Marché MSSP - Afrique Francophone</title>
+<script type="text/javascript">{plotlyjs}</script>
+</head>
+<body>
+{charts}
+</body>
+</html>
+"""
+
+def _render_chart(viz, name):
+    """Exécute un plot_* (dans un processus du pool) et mesure son temps"""
+    start = time.perf_counter()
+    viz._fragments = {}
+    try:
+        getattr(viz, name)()
+        error = None
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+    # En mode bundle, le fragment HTML revient au processus principal
+    return name, time.perf_counter() - start, error, list(viz._fragments.values())
+
+def _render_failed(name, exc):
+    """Résultat d'un graphique dont la tâche n'a pas abouti (sérialisation, processus perdu)"""
+    return name, 0.0, f"{type(exc).__name__}: {exc}", []
+
+@trace_methods(include=('__init__',))
+class MSSPVisualizations(CountryViews):
     """Génère toutes les visualisations pour l'étude de marché"""
     
-    def __init__(self):
+    # Graphiques indépendants, rendus par generate_all_charts
+    CHARTS = [
+        'plot_market_size_comparison',
+        'plot_country_attractiveness',
+        'plot_segment_revenue_potential',
+        'plot_competitive_landscape',
+        'plot_regulatory_maturity',
+        'plot_internet_penetration_vs_spending',
+        'plot_dashboard_overview'
+    ]
+    
+    # Fichier produit par chaque graphique
+    CHART_FILES = {
+        'plot_market_size_comparison': 'market_size_comparison.html',
+        'plot_country_attractiveness': 'country_attractiveness.html',
+        'plot_segment_revenue_potential': 'segment_revenue_potential.html',
+        'plot_competitive_landscape': 'competitive_landscape.html',
+        'plot_regulatory_maturity': 'regulatory_maturity.html',
+        'plot_internet_penetration_vs_spending': 'internet_vs_spending.html',
+        'plot_dashboard_overview': 'dashboard_overview.html'
+    }
+    
+    # Colonnes lues par chaque graphique (clé du cache)
+    CHART_INPUTS = {
+        'plot_market_size_comparison': {
+            'market_data': ['Country', 'IT_Market_M_USD']
+        },
+        'plot_country_attractiveness': {
+            'ranking': ['Country', 'Attractiveness_Score']
+        },
+        'plot_segment_revenue_potential': {
+            'market_data': ['Country', 'Banks_Count', 'Insurance_Companies', 'SMEs_Count']
+        },
+        'plot_competitive_landscape': {
+            'competitors': ['Company', 'Services', 'Clients_Estimate', 'Market_Share_Pct', 'Pricing_Tier']
+        },
+        'plot_regulatory_maturity': {
+            'market_data': ['Country', 'IT_Market_M_USD'],
+            'regulations': ['Country', 'Compliance_Maturity', 'Penalties_Max_USD']
+        },
+        'plot_internet_penetration_vs_spending': {
+            'market_data': ['Country', 'Internet_Penetration_Pct', 'Cybersecurity_Spending_M_USD',
+                            'Population_M', 'GDP_B_USD', 'Banks_Count']
+        },
+        'plot_dashboard_overview': {
+            'market_data': ['Country', 'IT_Market_M_USD', 'Cybersecurity_Spending_M_USD', 'Banks_Count',
+                            'Insurance_Companies', 'Internet_Penetration_Pct']
+        }
+    }
+    
+    def __init__(self, output_mode='shared'):
         """Charge les données"""
+        if output_mode not in OUTPUT_MODES:
+            raise ValueError(f"Mode de sortie inconnu: {output_mode} (choix: {OUTPUT_MODES})")
+        self.output_mode = output_mode
+        self._fragments = {}
+        
         print("  Chargement des données pour visualisation...")
-        self.market_data = pd.read_csv('../data/market_data.csv')
-        self.regulations = pd.read_csv('../data/regulations.csv')
-        self.competitors = pd.read_csv('../data/competitors.csv')
+        self.market_data = load_table('market_data')
+        self.regulations = load_table('regulations')
+        self.competitors = load_table('competitors')
         
         try:
-            self.ranking = pd.read_csv('../data/country_ranking.csv')
-        except:
+            self.ranking = load_table('country_ranking')
+        except FileNotFoundError:
             print("   Exécutez d'abord market_analysis.py pour générer country_ranking.csv")
             self.ranking = None
         
         print("   Données chargées!\n")
     
+    def _chart_inputs(self, name):
+        """Colonnes lues par un graphique (CHART_INPUTS), plus le pays parent des régions
+        (PARENT_COLUMN) quand market_data le fournit"""
+        inputs = dict(self.CHART_INPUTS[name])
+        if 'market_data' in inputs and PARENT_COLUMN in self.market_data.columns:
+            inputs['market_data'] = inputs['market_data'] + [PARENT_COLUMN]
+        return inputs
+    
+    def _for_chart(self, name):
+        """Copie allégée envoyée à un processus de rendu: seulement les colonnes du graphique
+        (CHART_INPUTS), pas toutes les tables"""
+        viz = MSSPVisualizations.__new__(MSSPVisualizations)
+        viz.output_mode = self.output_mode
+        viz._fragments = {}
+        inputs = self._chart_inputs(name)
+        for table in ('market_data', 'regulations', 'competitors', 'ranking'):
+            df = getattr(self, table)
+            setattr(viz, table, None if df is None or table not in inputs else df[inputs[table]])
+        return viz
+    
+    def _save(self, fig, filename):
+        """Écrit un graphique selon le mode de sortie"""
+        if self.output_mode == 'bundle':
+            # Gardé en mémoire, écrit une seule fois par write_bundle
+            self._fragments[filename] = fig.to_html(full_html=False, include_plotlyjs=False)
+        elif self.output_mode == 'shared':
+            # plotly.min.js copié une fois dans le dossier, référencé par chaque page
+            fig.write_html(os.path.join(CHARTS_DIR, filename), include_plotlyjs='directory')
+        else:
+            fig.write_html(os.path.join(CHARTS_DIR, filename))
+    
+    def write_bundle(self, fragments, filename='mssp_report.html'):
+        """Écrit tous les graphiques dans une seule page avec une copie de plotly.js"""
+        from plotly.offline import get_plotlyjs
+        charts = "\n".join(f'<div class="chart">{fragment}</div>' for fragment in fragments)
+        path = os.path.join(CHARTS_DIR, filename)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(BUNDLE_TEMPLATE.format(plotlyjs=get_plotlyjs(), charts=charts))
+        return path
+    
     def plot_market_size_comparison(self):
         """Compare la taille des marchés (TAM)"""
+        import plotly.graph_objects as go  # import à la demande (démarrage rapide)
         print("   Génération: Comparaison de la taille des marchés...")
         
         fig = go.Figure()
@@ -70,13 +215,14 @@ class MSSPVisualizations:
             height=500
         )
         
-        fig.write_html('../images/charts/market_size_comparison.html')
+        self._save(fig, 'market_size_comparison.html')
         print("       Sauvegardé: market_size_comparison.html\n")
         
         return fig
 
     def plot_country_attractiveness(self):
         """Score d'attractivité des pays"""
+        import plotly.express as px
         print("   Génération: Score d'attractivité des pays...")
         
         if self.ranking is not None:
@@ -98,7 +244,7 @@ class MSSPVisualizations:
                 height=500
             )
             
-            fig.write_html('../images/charts/country_attractiveness.html')
+            self._save(fig, 'country_attractiveness.html')
             print("   !! Sauvegardé: country_attractiveness.html\n")
             
             return fig
@@ -108,29 +254,20 @@ class MSSPVisualizations:
 
     def plot_segment_revenue_potential(self):
         """Potentiel de revenu par segment"""
+        import plotly.express as px
         print("   Génération: Potentiel de revenu par segment...")
         
-        # Créer des données de démonstration pour les segments
-        segments_data = []
-        for _, row in self.market_data.iterrows():
-            country = row['Country']
-            # Estimation du potentiel par segment 
-            segments_data.extend([
-                {'Country': country, 'Segment': 'Banques', 'Revenue_Potential': row['Banks_Count'] * 0.1},
-                {'Country': country, 'Segment': 'Assurances', 'Revenue_Potential': row['Insurance_Companies'] * 0.08},
-                {'Country': country, 'Segment': 'PME', 'Revenue_Potential': row['SMEs_Count'] * 0.001}
-            ])
-        
-        segments_df = pd.DataFrame(segments_data)
+        # Tranche pays × segment du cube de revenu (mêmes ARPU que l'analyse)
+        segments_df = self.revenue_cube().frame()
         
         fig = px.bar(
             segments_df,
             x='Country',
-            y='Revenue_Potential',
+            y='Revenue_M_USD',
             color='Segment',
             title='Potentiel de Revenu MSSP par Segment Client',
             labels={
-                'Revenue_Potential': 'Potentiel de Revenu (M USD)',
+                'Revenue_M_USD': 'Potentiel de Revenu (M USD)',
                 'Country': 'Pays',
                 'Segment': 'Segment Client'
             },
@@ -142,13 +279,14 @@ class MSSPVisualizations:
             height=500
         )
         
-        fig.write_html('../images/charts/segment_revenue_potential.html')
+        self._save(fig, 'segment_revenue_potential.html')
         print("       Sauvegardé: segment_revenue_potential.html\n")
         
         return fig
 
     def plot_competitive_landscape(self):
         """Paysage concurrentiel"""
+        import plotly.express as px
         print("   Génération: Paysage concurrentiel...")
         
         # Scatter plot: Market Share vs Clients
@@ -177,40 +315,45 @@ class MSSPVisualizations:
             height=500
         )
         
-        fig.write_html('../images/charts/competitive_landscape.html')
+        self._save(fig, 'competitive_landscape.html')
         print("       Sauvegardé: competitive_landscape.html\n")
         
         return fig
 
     def plot_regulatory_maturity(self):
         """Maturité réglementaire par pays"""
+        import plotly.express as px
         print("   Génération: Maturité réglementaire...")
         
-        reg_data = self.market_data.merge(
-            self.regulations[['Country', 'Compliance_Maturity', 'Penalties_Max_USD']], 
-            on='Country'
-        )
+        # Vue market_data ⋈ regulations partagée (copie de la sélection, modifiable)
+        view = self.market_regulations()
+        columns = ['Country', 'IT_Market_M_USD', 'Compliance_Maturity', 'Penalties_Max_USD']
+        reg_data = view[columns + ([PARENT_COLUMN] if PARENT_COLUMN in view.columns else [])].copy()
         
-        # Map maturity to numeric
-        maturity_map = {
-            'High': 3, 'Advanced': 3,
-            'Medium': 2, 'Developing': 2,
-            'Low': 1, 'Basic': 1
-        }
-        reg_data['Maturity_Numeric'] = reg_data['Compliance_Maturity'].map(maturity_map)
+        # Map maturity to numeric (codes de catégorie -> niveaux)
+        reg_data['Maturity_Numeric'] = category_lookup(reg_data['Compliance_Maturity'], MATURITY_LEVEL)
+        
+        # Régions: une couleur par pays parent plutôt qu'une trace par région
+        groups = trend_groups(reg_data['Country'], reg_data.get(PARENT_COLUMN))
+        color, hover_name = 'Country', None
+        if groups is not None:
+            reg_data['Trend_Group'] = groups
+            color, hover_name = 'Trend_Group', 'Country'
         
         fig = px.scatter(
             reg_data,
             x='Maturity_Numeric',
             y='IT_Market_M_USD',  
             size='Penalties_Max_USD',
-            color='Country',
+            color=color,
+            hover_name=hover_name,
             hover_data=['Compliance_Maturity', 'Penalties_Max_USD'],
             title='Maturité Réglementaire vs Potentiel de Marché',
             labels={
                 'Maturity_Numeric': 'Niveau de Maturité',
                 'IT_Market_M_USD': 'Marché IT (M USD)',
-                'Country': 'Pays'
+                'Country': 'Pays',
+                'Trend_Group': 'Pays'
             }
         )
         
@@ -224,44 +367,75 @@ class MSSPVisualizations:
             height=500
         )
         
-        fig.write_html('../images/charts/regulatory_maturity.html')
+        self._save(fig, 'regulatory_maturity.html')
         print("       Sauvegardé: regulatory_maturity.html\n")
         
         return fig
 
+    def _trendline(self):
+        """Droites de tendance internet vs dépenses cyber (store, recalculées si les données changent)"""
+        return self.memoized('trendline', ('market_data',), lambda: trendline_fit(self.market_data))
+
     def plot_internet_penetration_vs_spending(self):
         """Corrélation pénétration internet vs dépenses cyber"""
+        import plotly.express as px
+        import plotly.graph_objects as go
         print("   Génération: Internet vs Dépenses Cybersécurité...")
         
+        # Régions: une couleur (et une droite) par pays plutôt qu'une trace par région
+        data = self.market_data
+        groups = trend_groups(data['Country'], data.get(PARENT_COLUMN))
+        color = 'Country'
+        if groups is not None:
+            data = data.assign(Trend_Group=groups)
+            color = 'Trend_Group'
+        
         fig = px.scatter(
-            self.market_data,
-            x='Internet_Penetration_Pct',
-            y='Cybersecurity_Spending_M_USD',
+            data,
+            x=TREND_X,
+            y=TREND_Y,
             size='Population_M',
-            color='Country',
+            color=color,
+            hover_name='Country',
             hover_data=['GDP_B_USD', 'Banks_Count'],
             title='Pénétration Internet vs Dépenses Cybersécurité',
             labels={
                 'Internet_Penetration_Pct': 'Pénétration Internet (%)',
                 'Cybersecurity_Spending_M_USD': 'Dépenses Cybersécurité (M USD)',
                 'Population_M': 'Population (M)',
-                'Country': 'Pays'
-            },
-            trendline='ols'
+                'Country': 'Pays',
+                'Trend_Group': 'Pays'
+            }
         )
         
+        # Droites précalculées (moindres carrés, forme fermée): aucun ajustement au rendu
+        fit = self._trendline()
+        overall = fit[fit['Group'] == ALL_GROUPS]
+        by_group = fit[fit['Group'] != ALL_GROUPS]
+        if len(by_group) and by_group['Slope'].notna().any():
+            x, y = line_points(by_group)
+            fig.add_trace(go.Scatter(x=x, y=y, mode='lines', name='Tendance par pays',
+                                     line=dict(color='gray', width=1)))
+        if overall['Slope'].notna().any():
+            x, y = line_points(overall)
+            r2 = overall['R2'].iloc[0]
+            fig.add_trace(go.Scatter(x=x, y=y, mode='lines', name=f'Tendance OLS (R² = {r2:.2f})',
+                                     line=dict(color='black', dash='dash')))
+        
         fig.update_layout(
             template='plotly_white',
             height=500
         )
         
-        fig.write_html('../images/charts/internet_vs_spending.html')
+        self._save(fig, 'internet_vs_spending.html')
         print("       Sauvegardé: internet_vs_spending.html\n")
         
         return fig
 
     def plot_dashboard_overview(self):
         """Tableau de bord récapitulatif"""
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
         print("  Génération: Dashboard récapitulatif complet...")
         
         # Créer subplots
@@ -317,34 +491,167 @@ class MSSPVisualizations:
             template='plotly_white'
         )
         
-        fig.write_html('../images/charts/dashboard_overview.html')
+        self._save(fig, 'dashboard_overview.html')
         print("       Sauvegardé: dashboard_overview.html\n")
         
         return fig
 
-    def generate_all_charts(self):
-        """Génère tous les graphiques"""
+    def _chart_key(self, name):
+        """Clé de cache d'un graphique: ses colonnes d'entrée + ses paramètres"""
+        inputs = {}
+        for table, columns in self._chart_inputs(name).items():
+            df = getattr(self, table)
+            inputs[table] = None if df is None else df[columns]
+        params = {'chart': name, 'output_mode': self.output_mode, 'plotly': version('plotly'),
+                  'hypotheses': HYPOTHESES}
+        return ChartCache.key(inputs, params, getattr(type(self), name))
+    
+    def generate_all_charts(self, workers=None, use_cache=True):
+        """Génère tous les graphiques (en parallèle sur `workers` processus)"""
         print("\n" + "  " * 35)
         print("   GÉNÉRATION DE TOUTES LES VISUALISATIONS")
         print("  " * 35 + "\n")
         
-        self.plot_market_size_comparison()
-        self.plot_country_attractiveness()
-        self.plot_segment_revenue_potential()
-        self.plot_competitive_landscape()
-        self.plot_regulatory_maturity()
-        self.plot_internet_penetration_vs_spending()
-        self.plot_dashboard_overview()
-        
-        print("   Toutes les visualisations ont été générées!")
+        start = time.perf_counter()
+        cache = ChartCache(os.path.join(CHARTS_DIR, '.cache')) if use_cache else None
+        keys = {name: self._chart_key(name) for name in self.CHARTS} if cache else {}
+        shared_js = [os.path.join(CHARTS_DIR, 'plotly.min.js')] if self.output_mode == 'shared' else []
+        
+        # 1. Graphiques dont les entrées n'ont pas changé: repris du cache
+        fragments, pending = {}, []
+        for name in self.CHARTS:
+            if cache is None:
+                pending.append(name)
+                continue
+            
+            if self.output_mode == 'bundle':
+                blob = cache.lookup(keys[name], '.frag.html')
+                if blob:
+                    with open(blob, encoding='utf-8') as f:
+                        fragments[name] = [f.read()]
+                    continue
+            else:
+                path = os.path.join(CHARTS_DIR, self.CHART_FILES[name])
+                if cache.is_published(path, keys[name], shared_js):
+                    # Sortie confirmée à jour (pour les contrôles par date du pipeline)
+                    os.utime(path)
+                    continue
+                blob = cache.lookup(keys[name])
+                if blob and all(os.path.exists(p) for p in shared_js):
+                    cache.publish(keys[name], blob, path)
+                    continue
+            pending.append(name)
+        
+        # 2. Rendu des graphiques modifiés
+        if workers is None:
+            workers = min(len(pending), os.cpu_count() or 1)
+        
+        results = []
+        if workers <= 1 or len(pending) <= 1:
+            results = [_render_chart(self, name) for name in pending]
+        else:
+            # Chaque graphique est indépendant: un échec n'arrête pas les autres
+            broken = []
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(_render_chart, self._for_chart(name), name): name
+                           for name in pending}
+                for future in as_completed(futures):
+                    try:
+                        results.append(future.result())
+                    except BrokenProcessPool:
+                        broken.append(futures[future])
+                    except Exception as exc:
+                        results.append(_render_failed(futures[future], exc))
+            
+            # Processus perdu: le pool entier est inutilisable, chaque graphique touché est
+            # relancé seul dans son propre processus (un plantage n'atteint que lui)
+            for name in broken:
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    try:
+                        results.append(pool.submit(_render_chart, self._for_chart(name), name).result())
+                    except Exception as exc:
+                        results.append(_render_failed(name, exc))
+        
+        # 3. Mise en cache des nouveaux rendus
+        for name, _, error, parts in results:
+            fragments[name] = parts
+            if cache is None or error is not None:
+                continue
+            if self.output_mode == 'bundle':
+                for part in parts:
+                    cache.store_text(keys[name], part, '.frag.html')
+            else:
+                path = os.path.join(CHARTS_DIR, self.CHART_FILES[name])
+                if os.path.exists(path):
+                    cache.store_file(keys[name], path)
+                    cache.mark_published(path, keys[name])
+        
+        rows = [(name, seconds, error, 'ok' if error is None else 'échec')
+                for name, seconds, error, _ in results]
+        rows += [(name, 0.0, None, 'cache') for name in self.CHARTS if name not in pending]
+        report = pd.DataFrame(rows, columns=['Chart', 'Seconds', 'Error', 'Status'])
+        report = report.set_index('Chart').loc[self.CHARTS].reset_index()
+        
+        if self.output_mode == 'bundle':
+            path = os.path.join(CHARTS_DIR, 'mssp_report.html')
+            bundle_key = hashlib.sha256(''.join(keys.values()).encode()).hexdigest()
+            if cache is None or pending or not cache.is_published(path, bundle_key):
+                self.write_bundle([part for name in self.CHARTS for part in fragments.get(name, [])])
+                if cache is not None and report['Error'].isna().all():
+                    cache.mark_published(path, bundle_key)
+        
+        if cache is not None:
+            evicted = cache.evict()
+            cache.save()
+        total = time.perf_counter() - start
+        
+        print(f"   Temps de rendu ({workers} processus, total {total:.2f}s):")
+        for _, row in report.iterrows():
+            print(f"   • {row['Chart']}: {row['Seconds']:.2f}s [{row['Status']}]")
+            if row['Error'] is not None:
+                print(f"      {row['Error']}")
+        if cache is not None:
+            print(f"   Cache: {len(self.CHARTS) - len(pending)} repris, "
+                  f"{len(pending)} régénérés, {evicted} entrées évincées")
+        print()
+        
+        if self.output_mode == 'bundle':
+            print("   Page unique: mssp_report.html\n")
+        
+        failed = report[report['Error'].notna()]
+        if len(failed):
+            print(f"   {len(failed)} graphique(s) en échec, les autres ont été générés.")
+        else:
+            print("   Toutes les visualisations ont été générées!")
         print("   Emplacement: /images/charts/")
         print("\n   Vous pouvez ouvrir les fichiers .html dans votre navigateur")
         print("   ou les intégrer dans votre rapport PDF.\n")
+        
+        return report
+
+def parse_args(argv=None):
+    """Options de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Visualisations de l'étude de marché MSSP")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="Affiche le temps d'import par module puis quitte")
+    parser.add_argument('--startup-budget-ms', type=float, default=None,
+                        help="Avec --profile-startup: échoue si l'import dépasse ce budget")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Nombre de processus de rendu (défaut: un par graphique)")
+    parser.add_argument('--output-mode', choices=OUTPUT_MODES, default='shared',
+                        help="inline, shared (plotly.js partagé) ou bundle (page unique)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Régénère tous les graphiques sans consulter le cache")
+    return parser.parse_args(argv)
 
 def main():
     """Fonction principale"""
-    viz = MSSPVisualizations()
-    viz.generate_all_charts()
+    args = parse_args()
+    if args.profile_startup:
+        sys.exit(check_startup('visualization', args.startup_budget_ms))
+    
+    viz = MSSPVisualizations(args.output_mode)
+    viz.generate_all_charts(workers=args.workers, use_cache=not args.no_cache)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,259 @@
+"""Téléchargement asynchrone des indicateurs via l'API Banque Mondiale (v2)
+
+Remplace le téléchargement manuel sur databank.worldbank.org: les requêtes
+pays × indicateur (plage d'années) partent en parallèle, limitées par un sémaphore,
+sur une session HTTP unique, avec reprises (backoff exponentiel) sur erreurs
+réseau, 429 et 5xx; les autres statuts d'erreur (400, 404...) échouent sans reprise.
+Les réponses sont gardées sur disque (TTL + revalidation ETag).
+
+Sans réseau: `fixtures_dir` rejoue des réponses enregistrées (`record_dir` les
+enregistre), `base_url` peut pointer vers un serveur local de test.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+import pandas as pd
+from country_registry import iso3_codes, load_registry, world_bank_names
+from extract_and_build import WORLD_BANK_INDICATORS
+
+API_URL = 'https://api.worldbank.org/v2'
+CACHE_DIR = '../data/cache/world_bank'
+CACHE_TTL = 24 * 3600  # s
+
+# Code de série API -> nom de série DataBank (WORLD_BANK_INDICATORS)
+INDICATOR_CODES = {
+    'NY.GDP.MKTP.CD': 'GDP (current US$)',
+    'SP.POP.TOTL': 'Population, total',
+    'IT.NET.USER.ZS': 'Individuals using the Internet (% of population)',
+    'IT.CEL.SETS.P2': 'Mobile cellular subscriptions (per 100 people)'
+}
+
+# Statuts HTTP qui justifient une nouvelle tentative
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+class FetchError(RuntimeError):
+    """Réponse impossible à obtenir (après reprises) ou absente des fixtures"""
+
+class HTTPStatusError(FetchError):
+    """Réponse HTTP en erreur; reprise seulement si le statut est dans RETRY_STATUS"""
+
+    def __init__(self, status, url):
+        super().__init__(f"HTTP {status} pour {url}")
+        self.status = status
+
+class ResponseCache:
+    """Cache disque des réponses: corps JSON + métadonnées (ETag, date de téléchargement)"""
+
+    def __init__(self, cache_dir=CACHE_DIR, ttl=CACHE_TTL):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]
+        return (os.path.join(self.cache_dir, f'{key}.json'),
+                os.path.join(self.cache_dir, f'{key}.meta.json'))
+
+    def get(self, url):
+        """(corps, métadonnées) ou (None, None)"""
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, encoding='utf-8') as f:
+                return json.load(f), meta
+        except (OSError, ValueError):
+            return None, None
+
+    def is_fresh(self, meta):
+        return meta is not None and time.time() - meta['fetched_at'] < self.ttl
+
+    @staticmethod
+    def _write(path, content):
+        """Écriture atomique (fichier temporaire puis renommage): un lecteur ou un arrêt
+        brutal ne laisse jamais un fichier à moitié écrit"""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(content, f)
+        os.replace(tmp_path, path)
+
+    def put(self, url, body, etag=None):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        body_path, meta_path = self._paths(url)
+        # Corps d'abord, puis métadonnées: une entrée n'est valide qu'une fois complète
+        self._write(body_path, body)
+        self._write(meta_path, {'url': url, 'etag': etag, 'fetched_at': time.time()})
+
+    def touch(self, url, meta):
+        """Réponse 304: le contenu en cache redevient frais"""
+        _, meta_path = self._paths(url)
+        self._write(meta_path, dict(meta, fetched_at=time.time()))
+
+def fixture_name(iso3, code, page):
+    """Nom de fichier d'une réponse enregistrée"""
+    return f'{iso3}_{code}_p{page}.json'
+
+class WorldBankClient:
+    """Client asynchrone: sémaphore + session aiohttp partagée + cache + reprises"""
+
+    def __init__(self, base_url=API_URL, concurrency=8, retries=4, backoff=0.5, timeout=30,
+                 cache=None, fixtures_dir=None, record_dir=None):
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache = ResponseCache() if cache is None else cache
+        self.fixtures_dir = fixtures_dir
+        self.record_dir = record_dir
+        self.stats = {'requests': 0, 'cache': 0, 'revalidated': 0, 'retries': 0}
+
+    def url(self, iso3, code, years, page=1):
+        first, last = min(years), max(years)
+        return (f'{self.base_url}/country/{iso3}/indicator/{code}'
+                f'?format=json&date={first}:{last}&per_page=1000&page={page}')
+
+    async def _get(self, session, semaphore, url):
+        """GET avec cache (TTL/ETag) et backoff exponentiel"""
+        import aiohttp
+
+        cached, meta = self.cache.get(url)
+        if self.cache.is_fresh(meta):
+            self.stats['cache'] += 1
+            return cached
+
+        headers = {}
+        if meta and meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+
+        for attempt in range(self.retries + 1):
+            delay = None
+            try:
+                async with semaphore:
+                    self.stats['requests'] += 1
+                    async with session.get(url, headers=headers) as response:
+                        if response.status == 304:
+                            if cached is not None:
+                                self.stats['revalidated'] += 1
+                                self.cache.touch(url, meta)
+                                return cached
+                            # 304 sans corps en cache: nouvelle requête non conditionnelle
+                            headers = {}
+                            delay = 0
+                            raise HTTPStatusError(response.status, url)
+                        if response.status in RETRY_STATUS:
+                            retry_after = response.headers.get('Retry-After', '')
+                            delay = float(retry_after) if retry_after.isdigit() else None
+                            raise HTTPStatusError(response.status, url)
+                        if not 200 <= response.status < 300:
+                            raise HTTPStatusError(response.status, url)
+                        body = await response.json(content_type=None)
+                        self.cache.put(url, body, response.headers.get('ETag'))
+                        return body
+            except (aiohttp.ClientError, asyncio.TimeoutError, FetchError) as exc:
+                # Erreur permanente (400, 404...): inutile de réessayer
+                if isinstance(exc, HTTPStatusError) and exc.status not in RETRY_STATUS | {304}:
+                    raise
+                if attempt == self.retries:
+                    raise FetchError(f"Échec après {self.retries + 1} tentatives: {url} ({exc})")
+                self.stats['retries'] += 1
+                if delay is None:
+                    delay = self.backoff * 2 ** attempt * (1 + random.random())
+                await asyncio.sleep(delay)
+
+    def _fixture(self, iso3, code, page):
+        path = os.path.join(self.fixtures_dir, fixture_name(iso3, code, page))
+        if not os.path.exists(path):
+            raise FetchError(f"Fixture absente: {path}")
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _record(self, iso3, code, page, body):
+        os.makedirs(self.record_dir, exist_ok=True)
+        with open(os.path.join(self.record_dir, fixture_name(iso3, code, page)), 'w',
+                  encoding='utf-8') as f:
+            json.dump(body, f)
+
+    async def _series(self, session, semaphore, iso3, code, years):
+        """Toutes les pages d'une série pays × indicateur -> enregistrements bruts"""
+        records, page, pages = [], 1, 1
+        while page <= pages:
+            if self.fixtures_dir:
+                body = self._fixture(iso3, code, page)
+            else:
+                body = await self._get(session, semaphore, self.url(iso3, code, years, page))
+                if self.record_dir:
+                    self._record(iso3, code, page, body)
+            # Réponse API: [métadonnées, enregistrements] (ou [{"message": ...}] en erreur)
+            if not isinstance(body, list) or len(body) < 2 or body[1] is None:
+                if isinstance(body, list) and body and 'message' in body[0]:
+                    raise FetchError(f"{iso3}/{code}: {body[0]['message']}")
+                break
+            pages = int(body[0].get('pages', 1))
+            records.extend(body[1])
+            page += 1
+        return records
+
+    async def fetch(self, iso3_list, codes, years):
+        """Enregistrements de toutes les séries, téléchargées en parallèle"""
+        pairs = [(iso3, code) for iso3 in iso3_list for code in codes]
+        if self.fixtures_dir:
+            # Rejeu des réponses enregistrées: ni réseau ni session HTTP
+            results = await asyncio.gather(*(self._series(None, None, iso3, code, years)
+                                             for iso3, code in pairs))
+            return [record for series in results for record in series]
+
+        import aiohttp  # seulement pour le téléchargement réel
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            results = await asyncio.gather(*(self._series(session, semaphore, iso3, code, years)
+                                             for iso3, code in pairs))
+        return [record for series in results for record in series]
+
+def fetch_world_bank_long(years=range(2015, 2025), countries=None, registry=None, client=None):
+    """Indicateurs via l'API, au format long de stream_world_bank_long
+    (Country, Indicator, Year, Value) pour MarketPanel ou create_market_data_with_real_data"""
+    if registry is None:
+        registry = load_registry()
+    if countries is None:
+        countries = world_bank_names(registry)
+    names = set(countries.values())
+    iso3_to_country = {iso3: country for country, iso3 in iso3_codes(registry).items()
+                       if country in names}
+
+    client = WorldBankClient() if client is None else client
+    years = list(years)
+    records = asyncio.run(client.fetch(sorted(iso3_to_country), list(INDICATOR_CODES), years))
+
+    indicators = {code: WORLD_BANK_INDICATORS[name] for code, name in INDICATOR_CODES.items()}
+    rows = [
+        (iso3_to_country.get(record.get('countryiso3code')),
+         indicators.get(record['indicator']['id']), int(record['date']), record['value'])
+        for record in records
+        if record.get('value') is not None and str(record.get('date', '')).isdigit()
+    ]
+    long = pd.DataFrame(rows, columns=['Country', 'Indicator', 'Year', 'Value'])
+    long = long.dropna(subset=['Country', 'Indicator'])
+    long = long[long['Year'].isin(years)]
+    return pd.DataFrame({
+        'Country': long['Country'].astype(pd.CategoricalDtype(sorted(names))),
+        'Indicator': long['Indicator'].astype(
+            pd.CategoricalDtype(list(WORLD_BANK_INDICATORS.values()))),
+        'Year': long['Year'].astype('int16'),
+        'Value': long['Value'].astype('float64')
+    }).reset_index(drop=True)
+
+def latest_indicators(long, year):
+    """Dernière valeur connue jusqu'à `year` par pays × indicateur (ex.: internet publié
+    avec un an de retard) -> tableau pays × indicateurs"""
+    recent = long[long['Year'] <= year].sort_values('Year')
+    wide = recent.pivot_table(index='Country', columns='Indicator', values='Value',
+                              aggfunc='last', observed=True)
+    wide.columns = wide.columns.astype(str)
+    wide.index = wide.index.astype(str)
+    return wide.reindex(columns=list(WORLD_BANK_INDICATORS.values()))